@@ -1,6 +1,7 @@
-def main():
-    print("Hello from quantum-schedulers!")
+import sys
+
+from src.qschedulers.cli import main
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+Scheduler Scaling Benchmark
+---------------------------
+Measures how long schedulers take to place a batch of tasks as the cluster
+grows, on synthetic fleets from ``src.qschedulers.cloud.fleet``. Every
+scheduler is run once to warm the transpile and estimate caches, then timed
+on the same batch.
+
+Run with:
+    python -m src.Experiments.Benchmarks.scheduler_scaling [--sizes 10 100 1000]
+"""
+
+import argparse
+import json
+import sys
+import time
+
+DEFAULT_SIZES = [10, 100, 1000]
+DEFAULT_SCHEDULERS = ["RoundRobinScheduler", "SEFScheduler", "HierarchicalScheduler"]
+
+
+def run_benchmark(
+    sizes: list[int] = DEFAULT_SIZES,
+    schedulers: list[str] = DEFAULT_SCHEDULERS,
+    n_tasks: int = 50,
+    n_profiles: int = 8,
+    seed: int = 1234,
+) -> list[dict]:
+    import simpy
+
+    from src.qschedulers import schedulers as scheduler_module
+    from src.qschedulers.cloud.fleet import generate_fleet
+    from src.qschedulers.datasets.mqtbench_loader import get_benchmark_circuit
+    from src.qschedulers.cloud.qtask import QuantumTask
+
+    names = ["ghz", "qft", "graphstate", "dj", "wstate"]
+    tasks = [
+        QuantumTask(id=i, circuit=get_benchmark_circuit(names[i % len(names)], 3 + i % 6))
+        for i in range(n_tasks)
+    ]
+
+    results = []
+    for size in sizes:
+        nodes = generate_fleet(simpy.Environment(), size, n_profiles=n_profiles, seed=seed)
+        for name in schedulers:
+            scheduler = getattr(scheduler_module, name)()
+            scheduler.schedule(tasks, nodes)
+            t0 = time.perf_counter()
+            scheduler.schedule(tasks, nodes)
+            elapsed = time.perf_counter() - t0
+            results.append(
+                {
+                    "scheduler": name,
+                    "nodes": size,
+                    "tasks": n_tasks,
+                    "ms": elapsed * 1000.0,
+                    "us_per_task": elapsed * 1e6 / n_tasks,
+                }
+            )
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Scheduling time versus cluster size on synthetic fleets.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="fleet sizes")
+    parser.add_argument("--schedulers", nargs="+", default=DEFAULT_SCHEDULERS, help="scheduler class names")
+    parser.add_argument("--tasks", type=int, default=50, help="tasks per batch")
+    parser.add_argument("--profiles", type=int, default=8, help="backend profiles per fleet")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.sizes, args.schedulers, args.tasks, args.profiles)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'scheduler':24} {'nodes':>7} {'tasks':>6} {'ms':>10} {'us/task':>10}")
+        for r in results:
+            print(f"{r['scheduler']:24} {r['nodes']:>7} {r['tasks']:>6} {r['ms']:10.2f} {r['us_per_task']:10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
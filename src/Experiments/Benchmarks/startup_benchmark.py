@@ -0,0 +1,88 @@
+"""
+Startup Benchmark
+-----------------
+Measures the import time of the scheduling package entry points in fresh
+interpreters and checks it against a per-module budget. Also reports which
+heavy dependencies each import pulls in, so an eager import that sneaks back
+in shows up even when it happens to be fast on the current machine.
+
+Run with:
+    python -m src.Experiments.Benchmarks.startup_benchmark [--repeat N]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# module -> import-time budget in milliseconds
+IMPORT_BUDGETS_MS = {
+    "src.qschedulers.schedulers": 50,
+    "src.qschedulers.schedulers.round_robin": 50,
+    "src.qschedulers.cloud.orchestrator": 150,
+    "src.Experiments.ExperimentsHandler": 200,
+}
+
+HEAVY_MODULES = ["qiskit", "qiskit_ibm_runtime", "mqt.bench", "pandas", "matplotlib", "numpy"]
+
+_PROBE = """
+import sys, time, json
+t0 = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - t0) * 1000.0
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(json.dumps({{"ms": elapsed, "heavy": heavy}}))
+"""
+
+
+def measure_import(module: str, repeat: int = 5) -> dict:
+    """
+    Import ``module`` in ``repeat`` fresh interpreters and return the median
+    import time in milliseconds and the heavy modules it loaded.
+    """
+    samples = []
+    heavy = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        probe = json.loads(out.stdout.strip().splitlines()[-1])
+        samples.append(probe["ms"])
+        heavy = probe["heavy"]
+    return {"module": module, "ms": statistics.median(samples), "heavy": heavy}
+
+
+def run_benchmark(budgets: dict[str, float] = IMPORT_BUDGETS_MS, repeat: int = 5) -> list[dict]:
+    results = []
+    for module, budget in budgets.items():
+        result = measure_import(module, repeat=repeat)
+        result["budget_ms"] = budget
+        result["ok"] = result["ms"] <= budget
+        results.append(result)
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Import-time budget check for qschedulers.")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per module")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(repeat=args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'module':45} {'median ms':>10} {'budget':>8}  heavy imports")
+        for r in results:
+            flag = "" if r["ok"] else "  <-- over budget"
+            heavy = ", ".join(r["heavy"]) or "-"
+            print(f"{r['module']:45} {r['ms']:10.1f} {r['budget_ms']:8.0f}  {heavy}{flag}")
+    return 0 if all(r["ok"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
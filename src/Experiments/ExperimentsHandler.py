@@ -3,40 +3,82 @@ from src.qschedulers.cloud.orchestrator import Orchestrator
 from src.qschedulers.cloud.qnode import QuantumNode
 from src.qschedulers.cloud.qtask import QuantumTask
 
-from mqt.bench import get_benchmark, BenchmarkLevel
-
-from qiskit_ibm_runtime.fake_provider import *
+from src.qschedulers.cloud.backends import get_backend
+from src.qschedulers.datasets.mqtbench_loader import get_benchmark_circuit
+from src.qschedulers.evaluation.sinks import read_results, write_results
+from src.qschedulers.evaluation.streaming import MetricsAggregator
+from src.qschedulers.utils.checkpoint import CheckpointManifest, reuse_transpilations
+from src.qschedulers.utils.transpilation import bind_template, parameterize
 
 import simpy as sp
 
 import csv
-import pandas as pd
-import matplotlib.pyplot as plt
 from datetime import datetime
+import logging
 import os
+from typing import TYPE_CHECKING
 
-import numpy as np
-from qiskit import QuantumCircuit
 import re
 
 from src.logger_config import setup_logger
-logger = setup_logger()
+logger = logging.getLogger(__name__)
+
+# pandas, matplotlib, numpy, qiskit and MQT Bench are imported inside the
+# methods that need them, so a plain run does not pay for plotting or
+# benchmark generation at import time.
+if TYPE_CHECKING:
+    from qiskit import QuantumCircuit
 
 class ExperimentsHandler():
     """
     simple run some task on some node and return results
     """
-    def __init__(self):
+    def __init__(self, checkpoint_dir=None):
+        setup_logger()
         self.env = sp.Environment()
         self.results = {}
+        # Latency sketches of every run, per scheduler and backend
+        self.metrics = MetricsAggregator()
+        # With a checkpoint directory, runs given a checkpoint_key are saved
+        # there as they complete and skipped when the sweep is rerun
+        self.checkpoint = None
+        if checkpoint_dir:
+            self.checkpoint = CheckpointManifest(checkpoint_dir)
+            reuse_transpilations(checkpoint_dir)
 
 
-    def run(self, scheduler, Qtasks, Qnodes):
-        orch = Orchestrator(self.env, scheduler, Qnodes)
+    def run(self, scheduler, Qtasks, Qnodes, shots=1024, checkpoint_key=None, **orchestrator_options):
+        """
+        Run the tasks through an Orchestrator and store the results under the
+        scheduler's class name. Extra keyword arguments (e.g. ``preemption``)
+        are passed to the Orchestrator.
+
+        ``checkpoint_key`` names this experiment cell (e.g. from
+        ``cell_key(scheduler=..., workload=..., seed=...)``). If the handler has
+        a checkpoint directory and the cell already completed, its saved
+        results are loaded instead of running it again.
+        """
+        scheduler_name = scheduler.__class__.__name__
+        if self.checkpoint is not None and checkpoint_key is not None:
+            entry = self.checkpoint.get(checkpoint_key)
+            if entry is not None:
+                logger.info(f"Cell {checkpoint_key} ({scheduler_name}) already completed, loading {entry['path']}")
+                self.results[scheduler_name] = read_results(entry["path"], "jsonl")
+                for row in self.results[scheduler_name]:
+                    self.metrics.record(scheduler_name, row)
+                return self.results[scheduler_name]
+
+        orchestrator_options.setdefault("metrics", self.metrics)
+        orch = Orchestrator(self.env, scheduler, Qnodes, shots=shots, **orchestrator_options)
         orch.submit(Qtasks)
         self.env.run()
-        scheduler_name = scheduler.__class__.__name__
         self.results[scheduler_name] = orch.get_results()
+
+        if self.checkpoint is not None and checkpoint_key is not None:
+            path = os.path.join(self.checkpoint.directory, f"{scheduler_name}_{checkpoint_key}.jsonl")
+            os.makedirs(self.checkpoint.directory, exist_ok=True)
+            write_results(self.results[scheduler_name], path, "jsonl")
+            self.checkpoint.mark_complete(checkpoint_key, {"scheduler": scheduler_name, "path": path})
         return self.results[scheduler_name]
 
     def export_result_to_csv(self, scheduler_name):
@@ -49,6 +91,9 @@ class ExperimentsHandler():
                 writer.writerows(self.results[scheduler_name])
 
     def make_plot(self, schedulers, save_dir="plots"):
+        import pandas as pd
+        import matplotlib.pyplot as plt
+
         base_dir = os.path.dirname(os.path.abspath(__file__))
         plots_path = os.path.join(base_dir, save_dir)
         os.makedirs(plots_path, exist_ok=True)
@@ -80,11 +125,50 @@ class ExperimentsHandler():
 
         logger.info(f"✅ Plot saved successfully at:\n{filepath}")
 
+        self.make_tail_latency_plot(schedulers, save_dir=save_dir)
+
+    def make_tail_latency_plot(self, schedulers, save_dir="plots"):
+        """
+        Plot p50/p95/p99/max waiting and turnaround time per scheduler from
+        the streaming latency sketches.
+        """
+        import pandas as pd
+        import matplotlib.pyplot as plt
+
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        plots_path = os.path.join(base_dir, save_dir)
+        os.makedirs(plots_path, exist_ok=True)
+
+        names = {scheduler.__class__.__name__ for scheduler in schedulers}
+        rows = [
+            r for r in self.metrics.summary()
+            if r["scheduler"] in names and r["backend"] == "*"
+        ]
+        if not rows:
+            return
+        df = pd.DataFrame(rows)
+
+        fig, axes = plt.subplots(1, 2, figsize=(12, 5))
+        for ax, metric in zip(axes, ("waiting_time", "turnaround_time")):
+            tail = df[df["metric"] == metric].set_index("scheduler")[["p50", "p95", "p99", "max"]]
+            tail.T.plot(kind="bar", ax=ax, width=0.7)
+            ax.set_title(f"{metric} percentiles")
+            ax.set_ylabel("Time")
+            ax.grid(axis='y', linestyle="--", alpha=0.6)
+        plt.tight_layout()
+
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        filepath = os.path.join(plots_path, f"tail_latency_{timestamp}.png")
+        plt.savefig(filepath, dpi=300)
+        plt.close(fig)
+
+        logger.info(f"✅ Tail latency plot saved successfully at:\n{filepath}")
+
 
     def get_test_QNodes(self):
         qnodes = [
-            QuantumNode(self.env, FakeHanoiV2(), name="Hanoi"),
-            QuantumNode(self.env, FakeBrisbane(), name="Brisbane"),
+            QuantumNode(self.env, get_backend("Hanoi"), name="Hanoi"),
+            QuantumNode(self.env, get_backend("Brisbane"), name="Brisbane"),
         ]
         return qnodes
 
@@ -97,21 +181,32 @@ class ExperimentsHandler():
         These "Fake" backends are simulation stubs provided by Qiskit
         to emulate real IBM Quantum hardware, useful for testing
         distributed or federated quantum scheduling without access
-        to actual quantum machines.
+        to actual quantum machines. Backends come from the shared
+        registry, so repeated calls reuse the same parsed instances.
 
         Returns:
             list[QuantumNode]: A list containing five QuantumNode instances,
             each initialized with a different fake backend and unique name.
         """
         qnodes = [
-            QuantumNode(self.env, FakeAuckland(), name="Auckland"),  # 27-qubit simulated backend
-            QuantumNode(self.env, FakeHanoiV2(), name="Hanoi"),  # 27-qubit simulator (variant)
-            QuantumNode(self.env, FakeKolkataV2(), name="Kolkata"),  # 27-qubit simulator (variant)
-            QuantumNode(self.env, FakeBrisbane(), name="Brisbane"),  # 127-qubit simulated backend
-            QuantumNode(self.env, FakeSherbrooke(), name="Sherbrooke")  # 127-qubit simulated backend
+            QuantumNode(self.env, get_backend("Auckland"), name="Auckland"),  # 27-qubit simulated backend
+            QuantumNode(self.env, get_backend("Hanoi"), name="Hanoi"),  # 27-qubit simulator (variant)
+            QuantumNode(self.env, get_backend("Kolkata"), name="Kolkata"),  # 27-qubit simulator (variant)
+            QuantumNode(self.env, get_backend("Brisbane"), name="Brisbane"),  # 127-qubit simulated backend
+            QuantumNode(self.env, get_backend("Sherbrooke"), name="Sherbrooke")  # 127-qubit simulated backend
         ]
         return qnodes
 
+    def create_synthetic_fleet(self, n_nodes: int = 100, n_profiles: int = 8, seed: int = 1234):
+        """
+        Create a fleet of ``n_nodes`` synthetic QuantumNodes over
+        ``n_profiles`` seeded heavy-hex/grid/line backend profiles; nodes of
+        one profile share a backend and its calibration tables.
+        """
+        from src.qschedulers.cloud.fleet import generate_fleet
+
+        return generate_fleet(self.env, n_nodes, n_profiles=n_profiles, seed=seed)
+
     def create_quantum_task_with_different_quantum_benchmark_algorithm(
             self,
             n_tasks: int = 100,
@@ -145,6 +240,7 @@ class ExperimentsHandler():
         Returns:
             list[QuantumTask]: A list of generated quantum tasks with Poisson-distributed arrivals.
         """
+        import numpy as np
 
         rng = np.random.default_rng(seed)
 
@@ -222,7 +318,7 @@ class ExperimentsHandler():
         tasks = []
 
         # --- Light padding to approximate pre-transpilation depth without changing logic meaning ---
-        def _pad_to_depth(circ: QuantumCircuit, target_depth: int) -> QuantumCircuit:
+        def _pad_to_depth(circ: "QuantumCircuit", target_depth: int) -> "QuantumCircuit":
             """Increase circuit depth via barriers + tiny RX layers (no semantic change)."""
             try:
                 current = circ.depth()
@@ -281,11 +377,7 @@ class ExperimentsHandler():
                 attempts += 1
                 size_try = _enforce_rules(benchmark_name, circuit_size)
                 try:
-                    circuit = get_benchmark(
-                        benchmark_name,
-                        level=BenchmarkLevel.ALG,
-                        circuit_size=size_try
-                    )
+                    circuit = get_benchmark_circuit(str(benchmark_name), size_try)
                     success = True
                 except ValueError as e:
                     circuit_size = _adapt_from_error(str(e), size_try)
@@ -297,7 +389,7 @@ class ExperimentsHandler():
                 # Last resort: pick a permissive algorithm and small size
                 fallback = rng.choice(["qft", "ghz", "graphstate"])
                 size_try = _enforce_rules(fallback, circuit_size)
-                circuit = get_benchmark(fallback, level=BenchmarkLevel.ALG, circuit_size=size_try)
+                circuit = get_benchmark_circuit(str(fallback), size_try)
                 benchmark_name = fallback  # record actual algo used
 
             # Depth padding (skip for heavy circuits if pad_heavy is False)
@@ -315,26 +407,126 @@ class ExperimentsHandler():
 
         return tasks
 
+    def create_hybrid_workflow_tasks(
+            self,
+            n_workflows: int = 10,
+            iterations: int = 5,
+            fan_out: int = 1,
+            seed: int = 1234,
+            lam: float = 0.6,  # Poisson arrival rate of workflows
+            min_qubits: int = 2,
+            max_qubits: int = 10,
+    ):
+        """
+        Create hybrid variational workflows (VQE / QAOA style). Each workflow
+        runs ``iterations`` rounds of one ansatz; a round consists of
+        ``fan_out`` independent circuit evaluations that all depend on every
+        circuit of the previous round, as the classical optimizer needs all
+        of them before choosing the next parameters. Every round binds new
+        angles to the ansatz, so rounds differ only in parameter values.
+
+        Returns:
+            list[QuantumTask]: Tasks with predecessors and a workflow_id;
+            the first round of each workflow arrives by a Poisson process.
+        """
+        import numpy as np
+
+        rng = np.random.default_rng(seed)
+        # Separate stream, so the angles do not change the sampled workflows
+        angle_rng = np.random.default_rng([seed, 1])
+        ansatz_pool = ["vqe_real_amp", "vqe_su2", "vqe_two_local", "qaoa"]
+        inter_arrivals = rng.exponential(1.0 / lam, size=max(0, n_workflows - 1))
+        arrival_times = np.concatenate([[0.0], np.cumsum(inter_arrivals)]) if n_workflows > 0 else np.array([])
+
+        tasks = []
+        for workflow_id in range(n_workflows):
+            ansatz = str(rng.choice(ansatz_pool))
+            size = int(rng.integers(min_qubits, max_qubits + 1))
+            template, angles = parameterize(get_benchmark_circuit(ansatz, size))
+            previous = []
+            for _ in range(iterations):
+                # The optimizer's update of the parameters for this round
+                angles = [a + step for a, step in zip(angles, angle_rng.normal(0.0, 0.1, size=len(angles)))]
+                circuit = bind_template(template, angles)
+                current = []
+                for _ in range(fan_out):
+                    task_id = len(tasks)
+                    tasks.append(
+                        QuantumTask(
+                            id=task_id,
+                            circuit=circuit,
+                            arrival_time=float(arrival_times[workflow_id]),
+                            predecessors=list(previous),
+                            workflow_id=workflow_id,
+                        )
+                    )
+                    current.append(task_id)
+                previous = current
+        return tasks
+
+    def create_multi_tenant_tasks(self, tenants: dict, seed: int = 1234):
+        """
+        Merge the workloads of several tenants into one task list.
+
+        ``tenants`` maps a tenant name to its workload: either the arguments
+        of create_quantum_task_with_different_quantum_benchmark_algorithm, or
+        a burst of one benchmark given by ``algorithm`` and ``circuit_size``
+        with ``n_tasks`` and ``lam``. ``start_time`` (default 0) delays a
+        tenant's arrivals, e.g.
+
+            {"batch": {"algorithm": "qft", "circuit_size": 6, "n_tasks": 500, "lam": 50.0},
+             "interactive": {"n_tasks": 50, "lam": 0.5, "max_qubits": 8}}
+
+        Returns:
+            list[QuantumTask]: Tenant-tagged tasks ordered by arrival, with ids
+            renumbered from 0.
+        """
+        import numpy as np
+
+        rng = np.random.default_rng(seed)
+        tasks = []
+        for tenant, spec in tenants.items():
+            spec = dict(spec)
+            start_time = float(spec.pop("start_time", 0.0))
+            tenant_seed = int(rng.integers(2**31))
+            if "algorithm" in spec:
+                circuit = get_benchmark_circuit(spec["algorithm"], int(spec["circuit_size"]))
+                n_tasks = int(spec.get("n_tasks", 100))
+                gaps = np.random.default_rng(tenant_seed).exponential(1.0 / spec.get("lam", 0.6), size=n_tasks)
+                arrivals = np.concatenate([[0.0], np.cumsum(gaps[:-1])]) if n_tasks else []
+                generated = [QuantumTask(id=0, circuit=circuit, arrival_time=float(t)) for t in arrivals]
+            else:
+                generated = self.create_quantum_task_with_different_quantum_benchmark_algorithm(seed=tenant_seed, **spec)
+            for task in generated:
+                task.tenant = tenant
+                task.arrival_time += start_time
+            tasks.extend(generated)
+
+        tasks.sort(key=lambda t: t.arrival_time)
+        for i, task in enumerate(tasks):
+            task.id = i
+        return tasks
+
     def get_test_ready_tasks(self):
         tasks = [
             QuantumTask(
                 id=0,
-                circuit=get_benchmark("ghz", level=BenchmarkLevel.ALG, circuit_size=5),
+                circuit=get_benchmark_circuit("ghz", 5),
                 arrival_time=0,
             ),
             QuantumTask(
                 id=1,
-                circuit=get_benchmark("qft", level=BenchmarkLevel.ALG, circuit_size=10),
+                circuit=get_benchmark_circuit("qft", 10),
                 arrival_time=1,
             ),
             QuantumTask(
                 id=2,
-                circuit=get_benchmark("ghz", level=BenchmarkLevel.ALG, circuit_size=30),
+                circuit=get_benchmark_circuit("ghz", 30),
                 arrival_time=1,
             ),
             QuantumTask(
                 id=3,
-                circuit=get_benchmark("qft", level=BenchmarkLevel.ALG, circuit_size=5),
+                circuit=get_benchmark_circuit("qft", 5),
                 arrival_time=5,
             ),
         ]
@@ -4,8 +4,10 @@ from src.qschedulers.cloud.qnode import QuantumNode
 from src.qschedulers.cloud.qtask import QuantumTask
 from src.qschedulers.schedulers.sef import SEFScheduler
 from src.qschedulers.cloud.orchestrator import Orchestrator
+from src.logger_config import setup_logger
 
 if __name__ == "__main__":
+    setup_logger()
     from qiskit_ibm_runtime.fake_provider import FakeHanoiV2, FakeBrisbane
 
     # Environment
@@ -3,7 +3,6 @@ import logging.config
 import os
 
 LOG_DIR = os.path.join(os.path.dirname(__file__), '..', 'logs')
-os.makedirs(LOG_DIR, exist_ok=True)
 LOG_FILE = os.path.join(LOG_DIR, 'project.log')
 
 LOGGING_CONFIG = {
@@ -34,11 +33,25 @@ LOGGING_CONFIG = {
     },
 }
 
+_configured = False
+
+
 def setup_logger():
-    logging.config.dictConfig(LOGGING_CONFIG)
+    """
+    Configure console and file logging once per process and return the root logger.
+
+    Library modules only call ``logging.getLogger(__name__)``; entry points
+    (scripts, ExperimentsHandler, the CLI) call ``setup_logger()`` so that
+    importing the package has no logging side effects.
+    """
+    global _configured
+    if not _configured:
+        os.makedirs(LOG_DIR, exist_ok=True)
+        logging.config.dictConfig(LOGGING_CONFIG)
+        _configured = True
     return logging.getLogger()
 
-# Usage example in your modules:
+# Usage example in your entry points:
 # from logger_config import setup_logger
 # logger = setup_logger()
 # logger.info("This is an info message")
\ No newline at end of file
@@ -0,0 +1,423 @@
+"""
+Command-line Runner
+-------------------
+``qsched`` runs a scenario described by a JSON or TOML config file:
+
+    {
+        "name": "scenario1",
+        "cluster": "five_node",
+        "workload": {"type": "random", "n_tasks": 100, "lam": 0.6},
+        "schedulers": ["RoundRobinScheduler", {"name": "FANScheduler", "shots": 1024}],
+        "seeds": [1234, 1235],
+        "shots": 1024,
+        "orchestrator": {"preemption": true}
+    }
+
+``cluster`` is "test" (Hanoi + Brisbane), "five_node" (27 to 127 qubits), a
+list of {"name": ..., "backend": ...} entries naming registry backends, or
+{"fleet": {"n_nodes": 1000, "n_profiles": 8, "seed": 1}} for a synthetic fleet
+(arguments of ``generate_fleet``).
+``workload`` is one of
+    {"type": "random", ...}   arguments of create_quantum_task_with_different_quantum_benchmark_algorithm
+    {"type": "test"}          the fixed four-task test workload
+    {"type": "workflows", ...}  arguments of create_hybrid_workflow_tasks (VQE/QAOA chains)
+    {"type": "tenants", "tenants": {...}}  arguments of create_multi_tenant_tasks
+    {"type": "tasks", "tasks": [...]}  task specs (a top-level "tasks" list works too)
+    {"type": "trace", "path": "trace.jsonl"}  a task trace file
+    {"type": "store", "path": "tasks.qcs"}  a circuit store, circuits loaded on demand
+
+``orchestrator`` holds extra keyword arguments for the Orchestrator. Every
+(scheduler, seed) pair is one experiment cell, run in its own SimPy
+environment; ``--workers`` runs cells in parallel processes. The latency
+sketches of all cells are merged into ``latency.json`` in the output directory.
+``--trace-dir`` additionally writes each cell's timeline as a Chrome Trace /
+Perfetto JSON file and a per-node utilization series. A cell's files are
+named ``<Scheduler>_seed<N>``, with a short hash of the scheduler's
+arguments after the name when the spec has any (``<Scheduler>-<hash>_seed<N>``).
+
+A "federation" entry {"regions": [{"name": "eu", "cluster": ...}, ...],
+"latency": ..., "forward_threshold": ...} instead splits the cluster into
+regions simulated in parallel processes that forward tasks to each other
+(arguments of ``FederatedSimulation``; a region's scheduler defaults to the
+cell's). Tasks enter at the region named by their "region" field.
+
+A "screen" entry {"arrival_rate": ..., "arrival_rates": [...], "policies": [...]}
+(all optional) writes ``<stem>_screen.json`` next to each cell's results: the
+analytic queueing prediction of the run from its own assignments, compared
+with the simulated waits, plus a screen of the named policies at
+``arrival_rates`` (arguments of ``simulation_report`` in
+``evaluation/queueing.py``).
+
+``qsched serve CONFIG`` instead keeps the config's cluster and first
+scheduler loaded in a local service that schedules task specs sent as JSON
+lines over TCP (see ``src/qschedulers/service.py``).
+
+With ``--checkpoint-dir`` every completed cell is recorded in a manifest
+there; rerunning the same command skips completed cells and, unless
+``--transpile-cache`` says otherwise, reuses the transpilations cached in the
+checkpoint directory.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any
+
+from src.logger_config import setup_logger
+from src.qschedulers.evaluation.sinks import SINK_FORMATS, write_results
+from src.qschedulers.scenario import build_cluster, build_scheduler, build_workload, configure_worker
+
+logger = logging.getLogger(__name__)
+
+
+def load_config(path: str) -> dict[str, Any]:
+    if path.endswith(".toml"):
+        import tomllib
+
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def run_cell(config: dict[str, Any], scheduler_spec: Any, seed: int, options: dict[str, Any]) -> dict[str, Any]:
+    """
+    Run one (scheduler, seed) cell and write its results. Returns a summary row.
+    """
+    from src.Experiments.ExperimentsHandler import ExperimentsHandler
+    from src.qschedulers.evaluation.metrics import latency_by_tenant, workflow_makespans
+
+    exp = ExperimentsHandler()
+    scheduler = build_scheduler(scheduler_spec)
+    scheduler_name = scheduler.__class__.__name__
+    tasks = build_workload(exp, config, seed)
+    federated = bool(config.get("federation"))
+    nodes = [] if federated else build_cluster(exp, config.get("cluster"))
+
+    orchestrator_options = dict(config.get("orchestrator", {}))
+    executor = None
+    if options.get("aer_workers") and not federated:
+        from src.qschedulers.cloud.aer_executor import AerExecutor
+
+        executor = orchestrator_options["executor"] = AerExecutor(max_workers=options["aer_workers"])
+    prefetcher = None
+    if options.get("prefetch_workers") and not federated:
+        from src.qschedulers.cloud.prefetch import TranspilePrefetcher
+
+        prefetcher = orchestrator_options["prefetcher"] = TranspilePrefetcher(
+            window=options["prefetch_window"],
+            max_workers=options["prefetch_workers"],
+            transpile_cache=options.get("transpile_cache"),
+        )
+    recorder = None
+    if options.get("trace_dir") and not federated:
+        from src.qschedulers.cloud.tracing import TimelineRecorder
+
+        recorder = orchestrator_options["trace"] = TimelineRecorder()
+
+    logger.info(f"Running cell {scheduler_name} seed={seed} with {len(tasks)} tasks on {len(nodes)} nodes")
+    try:
+        if federated:
+            results = run_federated(config, scheduler_spec, tasks, orchestrator_options, options)
+        else:
+            results = exp.run(scheduler, tasks, nodes, shots=config.get("shots", 1024), **orchestrator_options)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        if prefetcher is not None:
+            prefetcher.shutdown()
+
+    os.makedirs(options["output_dir"], exist_ok=True)
+    stem = cell_stem(scheduler_spec, scheduler_name, seed)
+    path = os.path.join(options["output_dir"], f"{stem}.{options['sink']}")
+    write_results(results, path, options["sink"])
+
+    if config.get("screen"):
+        if federated:
+            logger.warning("The screen section is not supported for federated cells, skipping it")
+        else:
+            from src.qschedulers.evaluation.queueing import simulation_report
+
+            report = simulation_report(tasks, nodes, results, shots=config.get("shots", 1024), **config["screen"])
+            with open(os.path.join(options["output_dir"], f"{stem}_screen.json"), "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+
+    if recorder is not None:
+        os.makedirs(options["trace_dir"], exist_ok=True)
+        stem = os.path.join(options["trace_dir"], stem)
+        recorder.save_chrome_trace(f"{stem}.trace.json")
+        finish = max((r["finish_time"] for r in results), default=0.0)
+        recorder.save_utilization(
+            f"{stem}_utilization.{options['sink']}", options["trace_bin"] or max(finish, 1e-9) / 100, options["sink"]
+        )
+
+    ok = [r for r in results if r["status"] == "success"]
+    # Mean makespan over workflows whose tasks all succeeded
+    workflows = {k: w for k, w in workflow_makespans(results).items() if w["failed"] == 0}
+    return {
+        "scheduler": scheduler_name,
+        "seed": seed,
+        "tasks": len(results),
+        "failed": len(results) - len(ok),
+        "mean_waiting_time": sum(r["waiting_time"] for r in ok) / len(ok) if ok else None,
+        "mean_turnaround_time": sum(r["turnaround_time"] for r in ok) / len(ok) if ok else None,
+        "mean_scheduling_overhead": sum(r["scheduling_overhead"] for r in ok) / len(ok) if ok else None,
+        "mean_workflow_makespan": (
+            sum(w["makespan"] for w in workflows.values()) / len(workflows) if workflows else None
+        ),
+        "path": path,
+        "tenants": (
+            latency_by_tenant(results, orchestrator_options.get("tenant_weights"))
+            if any(r.get("tenant") is not None for r in results)
+            else None
+        ),
+        "metrics": exp.metrics.to_dict(),
+    }
+
+
+def cell_stem(scheduler_spec: Any, scheduler_name: str, seed: int) -> str:
+    """
+    File name stem of a cell's outputs. A scheduler spec with arguments adds
+    a short hash of them, so two configurations of one scheduler class do not
+    overwrite each other's files.
+    """
+    from src.qschedulers.utils.checkpoint import cell_key
+
+    kwargs = {} if isinstance(scheduler_spec, str) else {k: v for k, v in scheduler_spec.items() if k != "name"}
+    suffix = f"-{cell_key(**kwargs)[:8]}" if kwargs else ""
+    return f"{scheduler_name}{suffix}_seed{seed}"
+
+
+def run_federated(
+    config: dict[str, Any],
+    scheduler_spec: Any,
+    tasks: list[Any],
+    orchestrator_options: dict[str, Any],
+    options: dict[str, Any],
+) -> list[dict[str, Any]]:
+    """Run one cell's tasks across the regions of ``config["federation"]``."""
+    from src.qschedulers.cloud.federation import FederatedSimulation
+
+    spec = dict(config["federation"])
+    regions = [{"scheduler": scheduler_spec, **region} for region in spec.pop("regions")]
+    if options.get("aer_workers") or options.get("trace_dir") or options.get("prefetch_workers"):
+        logger.warning(
+            "--aer-workers, --trace-dir and --prefetch-workers are not supported for federated runs; ignoring them"
+        )
+    federation = FederatedSimulation(
+        regions,
+        shots=config.get("shots", 1024),
+        orchestrator_options=orchestrator_options,
+        transpile_cache=options.get("transpile_cache"),
+        benchmark_cache=options.get("benchmark_cache"),
+        **spec,
+    )
+    return federation.run(tasks)
+
+
+def scenario_cell_key(config: dict[str, Any], scheduler_spec: Any, seed: int, options: dict[str, Any]) -> str:
+    """Checkpoint key of a cell: everything in the config its results depend on."""
+    from src.qschedulers.utils.checkpoint import cell_key
+
+    return cell_key(
+        scheduler=scheduler_spec,
+        seed=seed,
+        workload=config.get("workload"),
+        tasks=config.get("tasks"),
+        cluster=config.get("cluster"),
+        shots=config.get("shots", 1024),
+        orchestrator=config.get("orchestrator", {}),
+        sink=options["sink"],
+        # Only federated cells carry the key, so existing checkpoints stay valid
+        **({"federation": config["federation"]} if config.get("federation") else {}),
+        **({"screen": config["screen"]} if config.get("screen") else {}),
+    )
+
+
+def run_scenario(config: dict[str, Any], options: dict[str, Any]) -> list[dict[str, Any]]:
+    cells = [(spec, seed) for spec in config.get("schedulers", ["RoundRobinScheduler"]) for seed in config.get("seeds", [1234])]
+    rows: list[dict[str, Any] | None] = [None] * len(cells)
+
+    manifest = None
+    keys = [None] * len(cells)
+    if options.get("checkpoint_dir"):
+        from src.qschedulers.utils.checkpoint import CheckpointManifest
+
+        manifest = CheckpointManifest(options["checkpoint_dir"])
+        for i, (spec, seed) in enumerate(cells):
+            keys[i] = scenario_cell_key(config, spec, seed, options)
+            entry = None if options.get("fresh") else manifest.get(keys[i])
+            if entry is not None:
+                logger.info(f"Skipping completed cell {entry['scheduler']} seed={seed} ({keys[i]})")
+                rows[i] = entry
+    pending = [i for i, row in enumerate(rows) if row is None]
+
+    def complete(i: int, row: dict[str, Any]):
+        rows[i] = row
+        if manifest is not None:
+            manifest.mark_complete(keys[i], row)
+
+    workers = options["workers"]
+    if workers <= 1 or len(pending) <= 1:
+        for i in pending:
+            complete(i, run_cell(config, *cells[i], options))
+        return rows
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=configure_worker,
+        initargs=(options["transpile_cache"], options["benchmark_cache"]),
+    ) as pool:
+        futures = {pool.submit(run_cell, config, *cells[i], options): i for i in pending}
+        # Checkpoint each cell as soon as it finishes, in whatever order
+        for future in as_completed(futures):
+            complete(futures[future], future.result())
+    return rows
+
+
+def merge_metrics(rows: list[dict[str, Any]]):
+    """Merge the latency sketches returned by every cell."""
+    from src.qschedulers.evaluation.streaming import MetricsAggregator
+
+    merged = None
+    for row in rows:
+        cell = MetricsAggregator.from_dict(row["metrics"])
+        if merged is None:
+            merged = cell
+        else:
+            merged.merge(cell)
+    return merged if merged is not None else MetricsAggregator()
+
+
+def _print_summary(rows: list[dict[str, Any]]):
+    workflows = any(r.get("mean_workflow_makespan") is not None for r in rows)
+    overheads = any(r.get("mean_scheduling_overhead") for r in rows)
+    extra = (f" {'sched overhead':>15}" if overheads else "") + (f" {'workflow makespan':>18}" if workflows else "")
+    print(f"{'scheduler':24} {'seed':>6} {'tasks':>6} {'failed':>6} {'mean wait':>12} {'mean turnaround':>16}{extra}  output")
+    for r in rows:
+        wait = f"{r['mean_waiting_time']:.6f}" if r["mean_waiting_time"] is not None else "-"
+        tat = f"{r['mean_turnaround_time']:.6f}" if r["mean_turnaround_time"] is not None else "-"
+        extra = ""
+        if overheads:
+            overhead = r.get("mean_scheduling_overhead")
+            extra += f" {overhead:>15.6f}" if overhead is not None else f" {'-':>15}"
+        if workflows:
+            makespan = r.get("mean_workflow_makespan")
+            extra += f" {makespan:>18.6f}" if makespan is not None else f" {'-':>18}"
+        print(f"{r['scheduler']:24} {r['seed']:>6} {r['tasks']:>6} {r['failed']:>6} {wait:>12} {tat:>16}{extra}  {r['path']}")
+
+
+def _print_tenants(rows: list[dict[str, Any]]):
+    print(f"\n{'scheduler':24} {'seed':>6} {'tenant':16} {'tasks':>6} {'mean wait':>12} {'p95 wait':>12} {'throughput':>12} {'share':>7} {'entitled':>8}")
+    for r in rows:
+        for tenant, s in (r.get("tenants") or {}).items():
+            print(
+                f"{r['scheduler']:24} {r['seed']:>6} {str(tenant):16} {s['count']:>6} {s['mean_waiting_time']:>12.6f} "
+                f"{s['p95_waiting_time']:>12.6f} {s['throughput']:>12.4f} {s['service_share']:>7.3f} {s['entitled_share']:>8.3f}"
+            )
+
+
+def _print_latency(summary: list[dict[str, Any]]):
+    print(f"\n{'scheduler':24} {'metric':16} {'p50':>12} {'p95':>12} {'p99':>12} {'max':>12}")
+    for r in summary:
+        if r["backend"] == "*":
+            print(
+                f"{r['scheduler']:24} {r['metric']:16} {r['p50']:>12.6f} {r['p95']:>12.6f} "
+                f"{r['p99']:>12.6f} {r['max']:>12.6f}"
+            )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="qsched", description="Quantum task scheduling experiments.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="run a scenario config")
+    run.add_argument("config", help="scenario config file (.json or .toml)")
+    run.add_argument("-w", "--workers", type=int, default=1, help="parallel worker processes (default: 1)")
+    run.add_argument("--transpile-cache", default=None, help="directory for cached transpiled circuits")
+    run.add_argument("--benchmark-cache", default=None, help="directory for cached MQT Bench circuits")
+    run.add_argument("--sink", choices=SINK_FORMATS, default="csv", help="result file format (default: csv)")
+    run.add_argument("--trace-dir", default=None, help="write Perfetto traces and node utilization here")
+    run.add_argument("--trace-bin", type=float, default=None, help="utilization bin width (default: 1%% of the run)")
+    run.add_argument("--aer-workers", type=int, default=0, help="also run tasks on noisy Aer simulators in N processes")
+    run.add_argument("--prefetch-workers", type=int, default=0, help="transpile upcoming tasks ahead in N processes")
+    run.add_argument("--prefetch-window", type=int, default=32, help="tasks transpiled ahead at most (default: 32)")
+    run.add_argument("--checkpoint-dir", default=None, help="record completed cells here and skip them on rerun")
+    run.add_argument("--fresh", action="store_true", help="rerun all cells even if checkpointed")
+    run.add_argument("-o", "--output-dir", default=None, help="result directory (default: config 'output_dir' or ./results)")
+
+    serve = sub.add_parser("serve", help="serve a scenario's cluster and scheduler over TCP")
+    serve.add_argument("config", help="scenario config file (.json or .toml)")
+    serve.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    serve.add_argument("--port", type=int, default=8765, help="port to listen on (default: 8765)")
+    serve.add_argument("-w", "--workers", type=int, default=1, help="scheduling worker processes (default: 1)")
+    serve.add_argument("--max-batch", type=int, default=64, help="most tasks per micro-batch (default: 64)")
+    serve.add_argument("--max-delay", type=float, default=0.05, help="longest wait to fill a batch, in seconds (default: 0.05)")
+    serve.add_argument("--transpile-cache", default=None, help="directory for cached transpiled circuits")
+    serve.add_argument("--benchmark-cache", default=None, help="directory for cached MQT Bench circuits")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.command == "run":
+        config = load_config(args.config)
+        options = {
+            "workers": args.workers,
+            "transpile_cache": args.transpile_cache,
+            "benchmark_cache": args.benchmark_cache,
+            "sink": args.sink,
+            "trace_dir": args.trace_dir,
+            "trace_bin": args.trace_bin,
+            "checkpoint_dir": args.checkpoint_dir,
+            "aer_workers": args.aer_workers,
+            "prefetch_workers": args.prefetch_workers,
+            "prefetch_window": args.prefetch_window,
+            "fresh": args.fresh,
+            "output_dir": args.output_dir or config.get("output_dir", "results"),
+        }
+        configure_worker(options["transpile_cache"], options["benchmark_cache"])
+        if options["checkpoint_dir"]:
+            from src.qschedulers.utils.checkpoint import reuse_transpilations
+
+            # Resumed cells (and pool workers) reuse the checkpointed transpiles
+            options["transpile_cache"] = reuse_transpilations(options["checkpoint_dir"])
+        rows = run_scenario(config, options)
+        _print_summary(rows)
+        if any(r.get("tenants") for r in rows):
+            _print_tenants(rows)
+
+        metrics = merge_metrics(rows)
+        # Every cell may have been resumed, with nothing written yet
+        os.makedirs(options["output_dir"], exist_ok=True)
+        with open(os.path.join(options["output_dir"], "latency.json"), "w", encoding="utf-8") as f:
+            json.dump({"summary": metrics.summary(), "sketches": metrics.to_dict()}, f, indent=2)
+        _print_latency(metrics.summary())
+
+    elif args.command == "serve":
+        import asyncio
+
+        from src.qschedulers.service import SchedulingService
+
+        setup_logger()
+        service = SchedulingService(
+            load_config(args.config),
+            max_workers=args.workers,
+            max_batch_size=args.max_batch,
+            max_delay=args.max_delay,
+            transpile_cache=args.transpile_cache,
+            benchmark_cache=args.benchmark_cache,
+        )
+        try:
+            asyncio.run(service.serve_forever(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""
+Backend Registry
+----------------
+Lazily constructed, shared backend instances and their derived calibration tables.
+
+Fake backends parse large JSON snapshots when first used, and the calibration
+tables derived from them (gate error map, readout errors, layout index) are
+needed by every node, scheduler and task. The registry builds each backend on
+first use, hands the same instance to every caller in the process, and can
+pickle the parsed backend together with its tables to a snapshot directory so
+later runs and spawned worker processes start warm. Forked workers inherit
+the parent's registry as is.
+"""
+
+import importlib
+import logging
+import os
+import pickle
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from src.qschedulers.datasets.calibration_utils import (
+    get_gate_error_map,
+    get_readout_error_map,
+)
+from src.qschedulers.datasets.layout_index import LayoutIndex
+
+logger = logging.getLogger(__name__)
+
+FAKE_PROVIDER_MODULE = "qiskit_ibm_runtime.fake_provider"
+SNAPSHOT_ENV_VAR = "QSCHED_BACKEND_CACHE"
+
+# Short names used by the experiment helpers -> fake provider class names
+DEFAULT_BACKENDS = {
+    "Auckland": "FakeAuckland",
+    "Hanoi": "FakeHanoiV2",
+    "Kolkata": "FakeKolkataV2",
+    "Brisbane": "FakeBrisbane",
+    "Sherbrooke": "FakeSherbrooke",
+}
+
+
+@dataclass
+class CalibrationTables:
+    """
+    Calibration-derived tables shared by every node using the same backend.
+    """
+
+    err_map: dict
+    readout_map: dict[int, float]
+    layout_index: LayoutIndex
+
+
+class BackendRegistry:
+    """
+    Registry of named backends, constructed lazily and shared per process.
+    """
+
+    def __init__(self, snapshot_dir: str | None = None):
+        self.snapshot_dir = snapshot_dir
+        self._factories: dict[str, Callable[[], Any]] = {}
+        self._backends: dict[str, Any] = {}
+        self._tables: dict[str, CalibrationTables] = {}
+        for name, class_name in DEFAULT_BACKENDS.items():
+            self.register(name, _fake_backend_factory(class_name))
+
+    def register(self, name: str, factory: Callable[[], Any]):
+        """Register a zero-argument factory that builds the backend ``name``."""
+        self._factories[name] = factory
+        self._backends.pop(name, None)
+
+    def names(self) -> list[str]:
+        return list(self._factories)
+
+    def get(self, name: str) -> Any:
+        """
+        Return the shared backend instance for ``name``.
+
+        ``name`` is a registered short name (e.g. "Brisbane") or the class name
+        of any backend in the fake provider (e.g. "FakeTorino").
+        """
+        backend = self._backends.get(name)
+        if backend is not None:
+            return backend
+
+        snapshot = self._load_snapshot(name)
+        if snapshot is not None:
+            backend, tables = snapshot
+            if tables is not None:
+                self._tables[backend.name] = tables
+        else:
+            factory = self._factories.get(name) or _fake_backend_factory(name)
+            logger.debug(f"Constructing backend {name}")
+            backend = factory()
+
+        self._backends[name] = backend
+        return backend
+
+    def name_of(self, backend: Any) -> str:
+        """
+        Name under which ``get`` returns ``backend``: its registered name if
+        it was obtained from this registry, else its class name (which ``get``
+        resolves through the fake provider).
+        """
+        for name, instance in self._backends.items():
+            if instance is backend:
+                return name
+        return type(backend).__name__
+
+    def calibration(self, backend: Any) -> CalibrationTables:
+        """
+        Return the calibration tables of a backend (instance or registered
+        name), computing them once per backend.
+        """
+        if isinstance(backend, str):
+            backend = self.get(backend)
+        key = _backend_key(backend)
+        tables = self._tables.get(key)
+        if tables is None:
+            err_map = get_gate_error_map(backend)
+            readout_map = get_readout_error_map(backend)
+            tables = CalibrationTables(
+                err_map=err_map,
+                readout_map=readout_map,
+                layout_index=LayoutIndex.from_calibration(
+                    err_map, readout_map, getattr(backend, "num_qubits", None)
+                ),
+            )
+            self._tables[key] = tables
+        return tables
+
+    def save_snapshot(self, name: str) -> str | None:
+        """
+        Pickle the parsed backend ``name`` and its calibration tables into the
+        snapshot directory. Returns the snapshot path, or None when no
+        snapshot directory is configured.
+        """
+        if not self.snapshot_dir:
+            return None
+        backend = self.get(name)
+        tables = self.calibration(backend)
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        path = self._snapshot_path(name)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump((backend, tables), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        logger.debug(f"Saved backend snapshot {path}")
+        return path
+
+    def warm(self, names: list[str] | None = None):
+        """
+        Construct the given backends (default: all registered) with their
+        calibration tables, saving snapshots when a directory is configured.
+        """
+        for name in names or self.names():
+            self.calibration(self.get(name))
+            if self.snapshot_dir and not os.path.exists(self._snapshot_path(name)):
+                self.save_snapshot(name)
+
+    def _snapshot_path(self, name: str) -> str:
+        return os.path.join(self.snapshot_dir, f"{name}.pkl")
+
+    def _load_snapshot(self, name: str):
+        if not self.snapshot_dir:
+            return None
+        path = self._snapshot_path(name)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable backend snapshot {path}: {e}")
+            return None
+
+
+def _fake_backend_factory(class_name: str) -> Callable[[], Any]:
+    def factory():
+        module = importlib.import_module(FAKE_PROVIDER_MODULE)
+        try:
+            backend_cls = getattr(module, class_name)
+        except AttributeError:
+            raise KeyError(f"Unknown backend: {class_name}") from None
+        return backend_cls()
+
+    return factory
+
+
+def _backend_key(backend: Any) -> str:
+    return getattr(backend, "name", None) or str(id(backend))
+
+
+default_registry = BackendRegistry(snapshot_dir=os.environ.get(SNAPSHOT_ENV_VAR))
+
+
+def get_backend(name: str) -> Any:
+    """Return the shared backend ``name`` from the default registry."""
+    return default_registry.get(name)
+
+
+def get_calibration(backend: Any) -> CalibrationTables:
+    """Return the shared calibration tables of a backend from the default registry."""
+    return default_registry.calibration(backend)
+
+
+def node_calibration(qnode: Any) -> CalibrationTables:
+    """
+    Current calibration of a node: its own tables once a calibration
+    timeline has recalibrated it, else its backend's shared tables.
+    """
+    calibration = getattr(qnode, "calibration", None)
+    return calibration if calibration is not None else get_calibration(qnode.backend)
@@ -0,0 +1,163 @@
+"""
+Calibration Timeline
+--------------------
+Time-varying calibration of QuantumNodes.
+
+Real devices drift and are recalibrated every few hours, while the backend
+registry reads calibration once from static backends. A calibration timeline
+is a list of ``CalibrationSnapshot`` updates, each applied to one node (or to
+every node of a backend) at a simulated time. A snapshot only lists the gate
+and readout entries that changed, e.g. as a JSON line:
+
+    {"time": 3600, "node": "Hanoi",
+     "gates": [{"gate": "cx", "qubits": [0, 1], "error": 0.012, "length": 4.1e-7}],
+     "readout": {"3": 0.021}}
+
+``VersionedCalibration`` holds a node's tables on top of the shared registry
+tables: entries are copied only when a snapshot touches the node, every
+applied snapshot bumps the node's version, and ``apply`` returns the physical
+qubits it affected, so cached estimates that do not use those qubits stay
+valid. Layouts are kept: the node keeps its backend's layout index and only
+error rates change. The orchestrator sets it as ``qnode.calibration``, which
+``backends.node_calibration`` returns to schedulers and estimators.
+"""
+
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any
+
+from src.qschedulers.cloud.backends import CalibrationTables
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CalibrationSnapshot:
+    time: float
+    # QuantumNode name, or a backend name to update every node of that backend
+    node: str
+    # (gate name, qubits) -> {"error": ..., "length": ...}; missing fields keep their value
+    gates: dict[tuple[str, tuple[int, ...]], dict[str, float]] = field(default_factory=dict)
+    # qubit -> readout error
+    readout: dict[int, float] = field(default_factory=dict)
+
+    def qubits(self) -> set[int]:
+        """Physical qubits whose calibration this snapshot changes."""
+        affected = set(self.readout)
+        for _, qubits in self.gates:
+            affected.update(qubits)
+        return affected
+
+    @classmethod
+    def from_dict(cls, spec: dict[str, Any]) -> "CalibrationSnapshot":
+        gates = {}
+        for entry in spec.get("gates") or []:
+            values = {k: float(entry[k]) for k in ("error", "length") if entry.get(k) is not None}
+            gates[(str(entry["gate"]).lower(), tuple(int(q) for q in entry["qubits"]))] = values
+        return cls(
+            time=float(spec["time"]),
+            node=str(spec["node"]),
+            gates=gates,
+            readout={int(q): float(e) for q, e in (spec.get("readout") or {}).items()},
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "time": self.time,
+            "node": self.node,
+            "gates": [{"gate": g, "qubits": list(q), **v} for (g, q), v in self.gates.items()],
+            "readout": {str(q): e for q, e in self.readout.items()},
+        }
+
+
+def load_calibration_timeline(path: str) -> list[CalibrationSnapshot]:
+    """Load snapshots from a JSON-lines file (or a JSON list), sorted by time."""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    stripped = text.lstrip()
+    if stripped.startswith("["):
+        specs = json.loads(stripped)
+    else:
+        specs = [json.loads(line) for line in text.splitlines() if line.strip()]
+    return sorted((CalibrationSnapshot.from_dict(spec) for spec in specs), key=lambda s: s.time)
+
+
+def save_calibration_timeline(snapshots: list[CalibrationSnapshot], path: str) -> str:
+    with open(path, "w", encoding="utf-8") as f:
+        for snapshot in snapshots:
+            f.write(json.dumps(snapshot.to_dict()) + "\n")
+    return path
+
+
+def generate_drift_timeline(
+    qnodes: list[Any],
+    interval: float,
+    horizon: float,
+    fraction: float = 0.2,
+    drift: float = 0.3,
+    seed: int = 1234,
+) -> list[CalibrationSnapshot]:
+    """
+    Synthetic drift: every ``interval`` up to ``horizon``, each node
+    rescales the two-qubit gate errors and readout errors of a random
+    ``fraction`` of its qubits by log-normal factors of spread ``drift``.
+    """
+    import numpy as np
+
+    from src.qschedulers.cloud.backends import get_calibration
+
+    rng = np.random.default_rng(seed)
+    snapshots = []
+    steps = int(horizon // interval)
+    for step in range(1, steps + 1):
+        for qnode in qnodes:
+            base = get_calibration(qnode.backend)
+            num_qubits = qnode.backend.num_qubits
+            chosen = set(rng.choice(num_qubits, size=max(1, int(fraction * num_qubits)), replace=False).tolist())
+            gates = {}
+            for (gate, qubits), values in base.err_map.items():
+                if len(qubits) == 2 and chosen.intersection(qubits) and values.get("error") is not None:
+                    gates[(gate, qubits)] = {"error": min(values["error"] * rng.lognormal(0.0, drift), 0.5)}
+            readout = {
+                q: min(base.readout_map[q] * rng.lognormal(0.0, drift), 0.5) for q in chosen if q in base.readout_map
+            }
+            snapshots.append(
+                CalibrationSnapshot(time=step * interval, node=qnode.name or qnode.backend.name, gates=gates, readout=readout)
+            )
+    return snapshots
+
+
+class VersionedCalibration:
+    """
+    Copy-on-write calibration tables of one node with a version counter; it
+    has the attributes of ``CalibrationTables``.
+    """
+
+    def __init__(self, base: CalibrationTables):
+        self.base = base
+        self.version = 0
+        self.err_map = base.err_map
+        self.readout_map = base.readout_map
+        self.layout_index = base.layout_index
+
+    def apply(self, snapshot: CalibrationSnapshot) -> set[int]:
+        """Apply ``snapshot``, bump the version and return the affected qubits."""
+        if snapshot.gates:
+            err_map = dict(self.err_map)
+            for key, values in snapshot.gates.items():
+                err_map[key] = {**err_map.get(key, {"error": None, "length": None}), **values}
+            self.err_map = err_map
+        if snapshot.readout:
+            self.readout_map = {**self.readout_map, **snapshot.readout}
+        self.version += 1
+        return snapshot.qubits()
+
+
+def used_qubits(circuit: Any) -> frozenset[int]:
+    """Physical qubits a transpiled circuit acts on (barriers excluded)."""
+    qubits = set()
+    for inst in circuit.data:
+        if inst.operation.name != "barrier":
+            qubits.update(circuit.find_bit(q).index for q in inst.qubits)
+    return frozenset(qubits)
@@ -0,0 +1,413 @@
+"""
+Federation
+----------
+Federated multi-region simulation across worker processes.
+
+Each region is a group of qnodes with its own scheduler, Orchestrator and
+``simpy.Environment``, simulated in its own process. Regions exchange tasks
+over a modeled network: forwarding a task from region ``a`` to ``b`` delays
+its arrival by ``latency[a][b]``.
+
+The regions are kept causally consistent with a conservative time-window
+protocol. The lookahead ``L`` is the smallest inter-region latency, so
+anything a region sends during the window ``[T, T + L)`` arrives at or
+after ``T + L``. A coordinator repeatedly delivers the tasks arriving in the
+next window to their regions, lets every region simulate that window in
+parallel, and collects finished rows, rejected tasks and load summaries.
+Windows in which nothing happens are skipped by starting the next window at
+the earliest pending event of any region or message.
+
+A task enters the federation at its home region (``QuantumTask.region``).
+The coordinator forwards it on arrival when no node of the home region is
+wide enough or, with ``forward_threshold``, when the home region's shortest
+predicted wait exceeds the threshold and another region is expected to
+start it sooner including the network delay. A region's load is its
+shortest predicted wait at the end of the previous window plus the expected
+service time of the tasks routed to it since then or still in flight to it,
+spread over its nodes. The coordinator estimates a task's service time at a
+region from the circuit's depth, its shots and the region's mean two-qubit
+gate time, scaled by the ratio of estimated to predicted service time of the
+tasks the region has finished. A task rejected by a region's admission
+control is forwarded too, up to ``max_hops`` times. Tasks of one region are
+scheduled in per-window batches, so workflow dependencies are not tracked
+across windows.
+"""
+
+import dataclasses
+import heapq
+import logging
+import math
+import multiprocessing
+import time
+from typing import Any
+
+from src.qschedulers.cloud.qtask import QuantumTask
+
+logger = logging.getLogger(__name__)
+
+# Layer time of a region whose calibration lists no two-qubit gate lengths
+DEFAULT_LAYER_TIME = 300e-9
+
+
+class RegionSimulator:
+    """One region's environment, nodes and orchestrator, advanced window by window."""
+
+    def __init__(self, spec: dict[str, Any], shots: int = 1024, orchestrator_options: dict[str, Any] | None = None):
+        import simpy
+
+        from src.Experiments.ExperimentsHandler import ExperimentsHandler
+        from src.qschedulers.cloud.backends import node_calibration
+        from src.qschedulers.scenario import build_cluster, build_scheduler
+        from src.qschedulers.cloud.orchestrator import Orchestrator
+
+        self.name = spec["name"]
+        exp = ExperimentsHandler()
+        self.env = exp.env = simpy.Environment()
+        self.nodes = build_cluster(exp, spec.get("cluster"))
+        for node in self.nodes:
+            node.region = self.name
+        # Mean two-qubit gate time of the region, the duration of one layer
+        # in the coordinator's service time estimates
+        lengths = [
+            values["length"]
+            for node in self.nodes
+            for (_, qubits), values in node_calibration(node).err_map.items()
+            if len(qubits) == 2 and values.get("length")
+        ]
+        self.layer_time = sum(lengths) / len(lengths) if lengths else DEFAULT_LAYER_TIME
+        scheduler = build_scheduler(spec.get("scheduler", "RoundRobinScheduler"))
+        self.orchestrator = Orchestrator(self.env, scheduler, self.nodes, shots=shots, **(orchestrator_options or {}))
+        self._reported = 0
+
+    def advance(self, until: float, inbound: list[QuantumTask]) -> tuple[list[dict], dict[str, Any]]:
+        """
+        Deliver ``inbound`` tasks (absolute arrival times within the window)
+        and simulate up to ``until``. Returns the rows finished in the window
+        and the region's load summary at ``until``.
+        """
+        if inbound:
+            start = min(task.arrival_time for task in inbound)
+            if start > self.env.now:
+                self._run_until(start)
+            # Orchestrator arrival times are relative to the time of submission
+            now = self.env.now
+            self.orchestrator.submit(
+                [dataclasses.replace(task, arrival_time=max(0.0, task.arrival_time - now)) for task in inbound]
+            )
+        if math.isinf(until):
+            self.env.run()
+        elif until > self.env.now:
+            self._run_until(until)
+
+        rows = self.orchestrator.results[self._reported:]
+        self._reported = len(self.orchestrator.results)
+        return rows, self.summary()
+
+    def summary(self) -> dict[str, Any]:
+        """
+        Shortest predicted wait, node count, widest node, layer time and time
+        of the next pending event.
+        """
+        loads = self.orchestrator.get_node_loads()
+        return {
+            "min_wait": min(loads.values()) if loads else math.inf,
+            "nodes": len(self.nodes),
+            "max_qubits": max((node.backend.num_qubits for node in self.nodes), default=0),
+            "layer_time": self.layer_time,
+            "next_event": self._next_event(),
+        }
+
+    def _run_until(self, until: float):
+        self.env.run(until=until)
+        # run(until=...) stops by rescheduling its stop event at ``now``, with
+        # no callbacks left and ahead of any other event due now; process it
+        # so that peek() only reports pending work
+        if self.env.peek() <= self.env.now:
+            self.env.step()
+
+    def _next_event(self) -> float:
+        return self.env.peek()
+
+
+def _region_main(conn, spec, shots, orchestrator_options, transpile_cache, benchmark_cache):
+    """Worker process: serve ("advance", until, tasks) requests until ("stop",)."""
+    from src.qschedulers.scenario import configure_worker
+
+    try:
+        configure_worker(transpile_cache, benchmark_cache)
+        region = RegionSimulator(spec, shots, orchestrator_options)
+        conn.send(("ready", region.summary()))
+    except Exception as e:
+        logger.exception(f"Region {spec.get('name')} failed to start")
+        conn.send(("error", repr(e)))
+        conn.close()
+        return
+    while True:
+        message = conn.recv()
+        if message[0] == "stop":
+            break
+        try:
+            conn.send(("ok", *region.advance(message[1], message[2])))
+        except Exception as e:
+            logger.exception(f"Region {region.name} failed")
+            conn.send(("error", repr(e)))
+    conn.close()
+
+
+class FederatedSimulation:
+    def __init__(
+        self,
+        regions: list[dict[str, Any]],
+        latency: float | dict[str, dict[str, float]] = 0.05,
+        shots: int = 1024,
+        orchestrator_options: dict[str, Any] | None = None,
+        forward_threshold: float | None = None,
+        max_hops: int = 2,
+        processes: bool = True,
+        transpile_cache: str | None = None,
+        benchmark_cache: str | None = None,
+    ):
+        """
+        Args:
+            regions: Region specs {"name", "cluster", "scheduler"}, where
+                cluster and scheduler take the CLI config formats.
+            latency: One latency for every pair of regions, or
+                {from: {to: seconds}}; missing pairs use the largest given.
+            forward_threshold: Forward a task on arrival when its home
+                region's shortest predicted wait exceeds this (None: only
+                forward tasks the home region cannot fit or rejects).
+            processes: Simulate regions in worker processes (False runs
+                them one after another in this process, for debugging).
+        """
+        if not regions:
+            raise ValueError("A federation needs at least one region")
+        self.regions = regions
+        self.names = [spec["name"] for spec in regions]
+        if len(set(self.names)) != len(self.names):
+            raise ValueError(f"Region names must be unique: {self.names}")
+        self.latency = latency
+        self.shots = shots
+        self.orchestrator_options = orchestrator_options or {}
+        self.forward_threshold = forward_threshold
+        self.max_hops = max_hops
+        self.processes = processes
+        self.transpile_cache = transpile_cache
+        self.benchmark_cache = benchmark_cache
+        pairs = [self._latency(a, b) for a in self.names for b in self.names if a != b]
+        # A lone region has no traffic and is simulated in one window
+        self.lookahead = min(pairs) if pairs else math.inf
+        if self.lookahead <= 0:
+            raise ValueError("Inter-region latencies must be positive for the conservative protocol")
+        self.stats = {"windows": 0, "forwarded": 0, "wall_time": 0.0}
+
+    def run(self, tasks: list[QuantumTask]) -> list[dict[str, Any]]:
+        """Simulate ``tasks`` across the federation and return all result rows."""
+        started = time.perf_counter()
+        handles = {}
+        try:
+            self._start_regions(handles)
+            rows = self._coordinate(tasks, handles)
+        finally:
+            self._stop_regions(handles)
+        self.stats["wall_time"] = time.perf_counter() - started
+        logger.info(
+            f"Federated run of {len(tasks)} tasks over {len(self.names)} regions: "
+            f"{self.stats['windows']} windows, {self.stats['forwarded']} forwarded"
+        )
+        return rows
+
+    def _coordinate(self, tasks: list[QuantumTask], handles: dict[str, Any]) -> list[dict[str, Any]]:
+        # (delivery time, sequence, destination, task) of tasks in flight or not yet arrived
+        pending = []
+        # Task id -> {"task", "origin", "arrival", "hops", "network_delay", "routed"}
+        meta = {}
+        for i, task in enumerate(tasks):
+            home = task.region if task.region in self.names else self.names[i % len(self.names)]
+            meta[task.id] = {"task": task, "origin": home, "arrival": task.arrival_time, "hops": 0, "network_delay": 0.0}
+            heapq.heappush(pending, (task.arrival_time, task.id, home, False))
+
+        summaries = {name: self._summary(handles, name) for name in self.names}
+        # Expected service time routed to each region in the current window,
+        # and forwarded to it but not yet delivered
+        self._routed = {name: 0.0 for name in self.names}
+        self._inflight = {name: 0.0 for name in self.names}
+        # Region -> (sum, count) of estimated over predicted service times
+        self._service_scale = {name: (0.0, 0) for name in self.names}
+        rows = []
+        while True:
+            start = min([pending[0][0] if pending else math.inf] + [s["next_event"] for s in summaries.values()])
+            if math.isinf(start):
+                break
+            # A lone region has no traffic and runs to completion in one window
+            end = start + self.lookahead
+
+            inbound = {name: [] for name in self.names}
+            while pending and pending[0][0] < end:
+                at, task_id, region, routed = heapq.heappop(pending)
+                entry = meta[task_id]
+                if routed:
+                    self._inflight[region] -= entry.pop("inflight")
+                else:
+                    target = self._route(entry, region, summaries)
+                    if target != region:
+                        self._forward(pending, entry, region, target, at, summaries)
+                        continue
+                self._routed[region] += self._service_estimate(entry, region, summaries)
+                inbound[region].append(dataclasses.replace(entry["task"], arrival_time=at))
+
+            results = self._advance(handles, end, inbound)
+            self.stats["windows"] += 1
+            # The new summaries include everything routed in the window
+            self._routed = {name: 0.0 for name in self.names}
+            for name, (_, summary) in results.items():
+                summaries[name] = summary
+            for name, (region_rows, _) in results.items():
+                for row in region_rows:
+                    entry = meta[row["task_id"]]
+                    if row["status"] == "success" and row["exec_time_est"]:
+                        self._learn_service(entry, name, row["exec_time_est"], summaries)
+                    if row["status"] == "rejected" and entry["hops"] < self.max_hops:
+                        target = self._route(entry, name, summaries, exclude=name)
+                        if target is not None and target != name:
+                            # Rejected during this window, so no earlier than its start
+                            self._forward(pending, entry, name, target, max(row["arrival_time"], start), summaries)
+                            continue
+                    rows.append(self._finish_row(row, name, entry))
+        return rows
+
+    def _route(self, entry, region, summaries, exclude=None) -> str | None:
+        """Region expected to start the task soonest when it arrives at ``region``."""
+        width = entry["task"].circuit.num_qubits
+        fits = [n for n in self.names if summaries[n]["max_qubits"] >= width and n != exclude]
+        if exclude is None:
+            if region in fits and (
+                self.forward_threshold is None or self._load(region, summaries) <= self.forward_threshold
+            ):
+                return region
+            if entry["hops"] >= self.max_hops:
+                return region
+        if not fits:
+            return region if exclude is None else None
+        return min(
+            fits,
+            key=lambda n: self._load(n, summaries) + (self._latency(region, n) if n != region else 0.0),
+        )
+
+    def _load(self, region: str, summaries) -> float:
+        """Expected wait at ``region``, including work routed or in flight to it since its summary."""
+        summary = summaries[region]
+        return summary["min_wait"] + (self._routed[region] + self._inflight[region]) / max(summary["nodes"], 1)
+
+    def _service_estimate(self, entry, region, summaries) -> float:
+        total, count = self._service_scale[region]
+        scale = total / count if count else 1.0
+        return self._layers(entry) * summaries[region]["layer_time"] * scale
+
+    def _learn_service(self, entry, region, exec_time, summaries):
+        predicted = self._layers(entry) * summaries[region]["layer_time"]
+        if predicted > 0:
+            total, count = self._service_scale[region]
+            self._service_scale[region] = (total + exec_time / predicted, count + 1)
+
+    def _layers(self, entry) -> float:
+        """Circuit layers the task executes over all its shots."""
+        if "layers" not in entry:
+            task = entry["task"]
+            entry["layers"] = task.circuit.depth() * (task.shots or self.shots)
+        return entry["layers"]
+
+    def _forward(self, pending, entry, source, target, at, summaries):
+        delay = self._latency(source, target)
+        entry["hops"] += 1
+        entry["network_delay"] += delay
+        entry["inflight"] = self._service_estimate(entry, target, summaries)
+        self._inflight[target] += entry["inflight"]
+        self.stats["forwarded"] += 1
+        heapq.heappush(pending, (at + delay, entry["task"].id, target, True))
+
+    def _finish_row(self, row: dict[str, Any], region: str, entry: dict[str, Any]) -> dict[str, Any]:
+        row = dict(row)
+        # Latency is measured from the arrival at the home region
+        row["arrival_time"] = entry["arrival"]
+        if row["finish_time"] >= 0:
+            row["turnaround_time"] = row["finish_time"] - entry["arrival"]
+        row["region"] = region
+        row["origin_region"] = entry["origin"]
+        row["hops"] = entry["hops"]
+        row["network_delay"] = entry["network_delay"]
+        return row
+
+    def _latency(self, a: str, b: str) -> float:
+        if isinstance(self.latency, (int, float)):
+            return float(self.latency)
+        given = self.latency.get(a, {}).get(b)
+        if given is None:
+            given = self.latency.get(b, {}).get(a)
+        if given is None:
+            given = max(v for row in self.latency.values() for v in row.values())
+        return float(given)
+
+    def _start_regions(self, handles: dict[str, Any]):
+        """
+        Start every region into ``handles``, which holds the regions started
+        so far if one of them fails, for ``_stop_regions`` to clean up.
+        """
+        args = (self.shots, self.orchestrator_options)
+        if not self.processes:
+            for spec in self.regions:
+                handles[spec["name"]] = RegionSimulator(spec, *args)
+            return
+        # Fresh interpreters: forking after Qiskit has started its thread
+        # pools can deadlock the children
+        context = multiprocessing.get_context("spawn")
+        for spec in self.regions:
+            parent, child = context.Pipe()
+            process = context.Process(
+                target=_region_main,
+                args=(child, spec, *args, self.transpile_cache, self.benchmark_cache),
+                daemon=True,
+            )
+            process.start()
+            handles[spec["name"]] = (process, parent)
+        for name, (process, conn) in list(handles.items()):
+            try:
+                reply = conn.recv()
+            except EOFError:
+                raise RuntimeError(f"Region {name} exited during startup") from None
+            if reply[0] == "error":
+                raise RuntimeError(f"Region {name} failed to start: {reply[1]}")
+            handles[name] = (process, conn, reply[1])
+
+    def _summary(self, handles, name) -> dict[str, Any]:
+        """Load summary of a region before the first window."""
+        if not self.processes:
+            return handles[name].summary()
+        return handles[name][2]
+
+    def _advance(self, handles, until, inbound) -> dict[str, tuple[list[dict], dict]]:
+        if not self.processes:
+            return {name: region.advance(until, inbound[name]) for name, region in handles.items()}
+        # Every region simulates the window concurrently
+        for name, (_, conn, _) in handles.items():
+            conn.send(("advance", until, inbound[name]))
+        results = {}
+        for name, (_, conn, _) in handles.items():
+            reply = conn.recv()
+            if reply[0] == "error":
+                raise RuntimeError(f"Region {name} failed: {reply[1]}")
+            results[name] = (reply[1], reply[2])
+        return results
+
+    def _stop_regions(self, handles):
+        if not self.processes:
+            return
+        # Handles of regions still starting up have no summary yet
+        for process, conn, *_ in handles.values():
+            try:
+                conn.send(("stop",))
+            except (BrokenPipeError, OSError):
+                pass
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+                process.join()
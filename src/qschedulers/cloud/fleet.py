@@ -0,0 +1,201 @@
+"""
+Fleet
+-----
+Synthetic backend fleets for scale testing.
+
+A fleet is built from a small number of backend profiles. Each profile is a
+``GenericBackendV2`` on a parameterized topology (heavy-hex, grid or line)
+whose gate, readout and duration calibration is drawn from seeded log-normal
+distributions, with a per-profile quality factor so profiles differ from one
+another. Profiles are registered in the backend registry, and every node of a
+profile shares its backend instance and calibration tables, so a
+thousand-node fleet costs a handful of backends plus the nodes themselves.
+Profile names carry the fleet seed and, for a non-default calibration
+distribution, a digest of it, so differently drawn fleets never share a
+registry entry.
+"""
+
+import hashlib
+import logging
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from src.qschedulers.cloud.backends import BackendRegistry, default_registry
+from src.qschedulers.cloud.qnode import QuantumNode
+
+logger = logging.getLogger(__name__)
+
+TOPOLOGIES = ("heavy_hex", "grid", "line")
+
+# Size parameter choices per topology: heavy-hex code distance (19, 57 and
+# 115 qubits), grid (rows, columns), line length
+TOPOLOGY_SIZES = {
+    "heavy_hex": [3, 5, 7],
+    "grid": [(4, 4), (5, 6), (8, 8)],
+    "line": [16, 27, 40],
+}
+
+BASIS_GATES = ["ecr", "id", "rz", "sx", "x"]
+
+
+@dataclass
+class CalibrationDistribution:
+    """Medians and log-normal spreads of a profile's calibration."""
+
+    single_qubit_error: float = 2.5e-4
+    two_qubit_error: float = 8e-3
+    readout_error: float = 1.5e-2
+    single_qubit_duration: float = 3.5e-8
+    two_qubit_duration: float = 5.3e-7
+    readout_duration: float = 1.2e-6
+    # Log-normal sigma of per-qubit/per-edge values around the profile median
+    spread: float = 0.5
+    # Log-normal sigma of the per-profile quality factor scaling all errors
+    profile_spread: float = 0.3
+
+
+@dataclass
+class BackendProfile:
+    name: str
+    topology: str
+    size: Any
+    seed: int
+
+
+def coupling_map_for(topology: str, size: Any):
+    from qiskit.transpiler import CouplingMap
+
+    if topology == "heavy_hex":
+        return CouplingMap.from_heavy_hex(int(size))
+    if topology == "grid":
+        rows, cols = size
+        return CouplingMap.from_grid(int(rows), int(cols))
+    if topology == "line":
+        return CouplingMap.from_line(int(size))
+    raise ValueError(f"Unknown topology {topology!r}, expected one of {TOPOLOGIES}")
+
+
+def build_backend(profile: BackendProfile, calibration: CalibrationDistribution | None = None):
+    """
+    Build the ``GenericBackendV2`` of a profile and overwrite its Target with
+    calibration drawn from ``calibration`` (seeded by the profile).
+    """
+    import numpy as np
+    from qiskit.providers.fake_provider import GenericBackendV2
+    from qiskit.transpiler import InstructionProperties
+
+    calibration = calibration or CalibrationDistribution()
+    coupling_map = coupling_map_for(profile.topology, profile.size)
+    backend = GenericBackendV2(
+        coupling_map.size(),
+        basis_gates=BASIS_GATES,
+        coupling_map=coupling_map,
+        seed=profile.seed,
+    )
+    backend.name = profile.name
+
+    rng = np.random.default_rng(profile.seed)
+    quality = rng.lognormal(0.0, calibration.profile_spread)
+
+    def draw(median: float, scale: float = 1.0) -> float:
+        return float(median * scale * rng.lognormal(0.0, calibration.spread))
+
+    target = backend.target
+    for name in target.operation_names:
+        if name in ("ecr",):
+            error, duration = calibration.two_qubit_error, calibration.two_qubit_duration
+        elif name in ("sx", "x", "id"):
+            error, duration = calibration.single_qubit_error, calibration.single_qubit_duration
+        elif name == "measure":
+            error, duration = calibration.readout_error, calibration.readout_duration
+        else:
+            continue
+        for qargs in target.qargs_for_operation_name(name) or ():
+            props = InstructionProperties(
+                error=min(draw(error, quality), 0.5),
+                duration=draw(duration),
+            )
+            target.update_instruction_properties(name, qargs, props)
+    return backend
+
+
+def calibration_tag(calibration: CalibrationDistribution | None) -> str:
+    """Short digest of a non-default calibration distribution ("" for the default)."""
+    if calibration is None or calibration == CalibrationDistribution():
+        return ""
+    return hashlib.sha1(repr(sorted(asdict(calibration).items())).encode()).hexdigest()[:8]
+
+
+def generate_profiles(
+    n_profiles: int = 8,
+    seed: int = 1234,
+    topologies: tuple[str, ...] = TOPOLOGIES,
+    prefix: str = "synthetic",
+    calibration: CalibrationDistribution | None = None,
+) -> list[BackendProfile]:
+    """
+    Draw ``n_profiles`` (topology, size) profiles with their own seeds. The
+    fleet seed and the calibration tag are part of each profile name, so
+    fleets with different seeds or calibration distributions never share
+    registry entries.
+    """
+    import numpy as np
+
+    tag = calibration_tag(calibration)
+    fleet = f"{seed}_{tag}" if tag else str(seed)
+    rng = np.random.default_rng(seed)
+    profiles = []
+    for i in range(n_profiles):
+        topology = str(rng.choice(topologies))
+        sizes = TOPOLOGY_SIZES[topology]
+        size = sizes[int(rng.integers(len(sizes)))]
+        profiles.append(
+            BackendProfile(
+                name=f"{prefix}{fleet}_{topology}_{i}",
+                topology=topology,
+                size=size,
+                seed=int(rng.integers(2**31)),
+            )
+        )
+    return profiles
+
+
+def generate_fleet(
+    env: Any,
+    n_nodes: int,
+    n_profiles: int = 8,
+    seed: int = 1234,
+    topologies: tuple[str, ...] = TOPOLOGIES,
+    calibration: CalibrationDistribution | None = None,
+    registry: BackendRegistry = default_registry,
+) -> list[QuantumNode]:
+    """
+    Create ``n_nodes`` QuantumNodes spread round-robin over ``n_profiles``
+    synthetic backend profiles. Each profile's backend is built once and
+    registered in ``registry`` under the profile name; nodes are named
+    ``<profile>-<index>``. ``calibration`` may also be given as a dict of
+    ``CalibrationDistribution`` fields (as in a JSON cluster spec).
+    """
+    if isinstance(calibration, dict):
+        calibration = CalibrationDistribution(**calibration)
+    profiles = generate_profiles(min(n_profiles, max(n_nodes, 1)), seed, topologies, calibration=calibration)
+    backends = []
+    for profile in profiles:
+        if profile.name not in registry.names():
+            backend = build_backend(profile, calibration)
+            registry.register(profile.name, lambda backend=backend: backend)
+        backend = registry.get(profile.name)
+        # Build the shared calibration tables once, before nodes use them
+        registry.calibration(backend)
+        backends.append(backend)
+
+    width = len(str(max(n_nodes - 1, 0)))
+    nodes = []
+    for i in range(n_nodes):
+        profile, backend = profiles[i % len(profiles)], backends[i % len(profiles)]
+        nodes.append(QuantumNode(env, backend, name=f"{profile.name}-{i:0{width}d}"))
+    logger.info(
+        f"Generated a fleet of {n_nodes} nodes over {len(profiles)} profiles "
+        f"({', '.join(f'{p.name}:{b.num_qubits}q' for p, b in zip(profiles, backends))})"
+    )
+    return nodes
@@ -4,18 +4,54 @@ Orchestrator
 Coordinates tasks, schedulers, and quantum nodes inside a qsimpy environment.
 """
 
+import logging
+import math
+import time
+from collections import OrderedDict, deque
+from collections.abc import Callable
+
 import simpy.core as sp
 import simpy
-from qiskit import transpile
 
 from src.qschedulers.cloud.qtask import QuantumTask
 from src.qschedulers.cloud.qnode import QuantumNode
+from src.qschedulers.cloud.aer_executor import AerExecutor
+from src.qschedulers.cloud.calibration_timeline import (
+    CalibrationSnapshot,
+    VersionedCalibration,
+    load_calibration_timeline,
+    used_qubits,
+)
+from src.qschedulers.cloud.shot_splitting import plan_shot_chunks
+from src.qschedulers.cloud.cutting import DEFAULT_MAX_CUTS, CutPlan, cut_circuit
+from src.qschedulers.cloud.fair_share import WeightedFairQueue
+from src.qschedulers.cloud.prefetch import TranspilePrefetcher
+from src.qschedulers.cloud.tracing import TimelineRecorder
+from src.qschedulers.cloud.workflow import topological_order
 from src.qschedulers.schedulers.base import Scheduler
-from src.qschedulers.datasets.calibration_utils import get_gate_error_map
-from src.qschedulers.evaluation.metrics import estimate_fidelity_and_time
-from src.logger_config import setup_logger
+from src.qschedulers.cloud.backends import get_calibration, node_calibration
+from src.qschedulers.evaluation.metrics import (
+    estimate_fidelity_and_time,
+    latency_by_priority,
+    latency_by_tenant,
+    workflow_makespans,
+)
+from src.qschedulers.evaluation.streaming import MetricsAggregator
+from src.qschedulers.utils.transpilation import template_key, transpile_for_backend
+
+logger = logging.getLogger(__name__)
+
+ADMISSION_POLICIES = ("reject", "redirect", "defer")
+
+
+class _Stolen(Exception):
+    """Raised out of ``_occupy`` when an idle node takes over a queued task."""
+
+    def __init__(self, thief: QuantumNode, waiting_time: float):
+        super().__init__(thief)
+        self.thief = thief
+        self.waiting_time = waiting_time
 
-logger = setup_logger()
 
 class Orchestrator:
     def __init__(
@@ -24,93 +60,981 @@ class Orchestrator:
         scheduler: Scheduler,
         qnodes: list[QuantumNode],
         shots: int = 1024,
+        preemption: bool = False,
+        split_shots: bool = False,
+        min_chunk_shots: int = 128,
+        max_chunks: int | None = None,
+        circuit_cutting: bool = False,
+        max_cuts: int = DEFAULT_MAX_CUTS,
+        metrics: MetricsAggregator | None = None,
+        trace: TimelineRecorder | None = None,
+        executor: AerExecutor | None = None,
+        max_queue: int | None = None,
+        sla: float | None = None,
+        admission: str = "reject",
+        max_deferrals: int = 10,
+        defer_interval: float | None = None,
+        work_stealing: bool = False,
+        fair_share: bool = False,
+        tenant_weights: dict[str, float] | None = None,
+        decision_latency: str | float | Callable[[QuantumTask, list[QuantumNode]], float] | None = None,
+        decision_time_scale: float = 1.0,
+        calibration_timeline: list[CalibrationSnapshot] | str | None = None,
+        prefetcher: TranspilePrefetcher | None = None,
     ):
+        if admission not in ADMISSION_POLICIES:
+            raise ValueError(f"Unknown admission policy {admission!r}, expected one of {ADMISSION_POLICIES}")
+        if not (
+            decision_latency is None
+            or decision_latency == "measured"
+            or callable(decision_latency)
+            or (isinstance(decision_latency, (int, float)) and not isinstance(decision_latency, bool))
+        ):
+            raise ValueError(
+                f"Unknown decision_latency {decision_latency!r}, expected 'measured', seconds or a callable"
+            )
         self.env = env
         self.scheduler = scheduler
         self.qnodes = qnodes
         self.shots = shots
+        # If True, a more urgent task interrupts a running one, which is
+        # requeued with its remaining service time.
+        self.preemption = preemption
+        # If True, a task's shots are split into chunks run in parallel on
+        # every feasible node that can finish its share early enough.
+        self.split_shots = split_shots
+        self.min_chunk_shots = min_chunk_shots
+        self.max_chunks = max_chunks
+        # If True, a task wider than its node is cut into fragments that fit
+        # and run in parallel across the cluster.
+        self.circuit_cutting = circuit_cutting
+        self.max_cuts = max_cuts
         self.results = []
+        # Streaming latency percentiles; pass a shared aggregator to pool
+        # several runs into one set of sketches.
+        self.metrics = metrics if metrics is not None else MetricsAggregator()
+        # Optional timeline of arrivals, queueing and execution per node
+        self.trace = trace
+        # Optional noisy-simulation pool; tasks also get real counts and a
+        # measured fidelity, while simulated time still uses the estimates
+        self.executor = executor
+        # Task id -> future of its noisy simulation
+        self._executions = {}
+        # Admission control: a node whose queue holds max_queue tasks, or
+        # whose predicted wait exceeds the SLA, does not admit a new task,
+        # which is then rejected, redirected to another node that admits it,
+        # or deferred and retried (rejected after max_deferrals attempts).
+        self.max_queue = max_queue
+        self.sla = sla
+        self.admission = admission
+        self.max_deferrals = max_deferrals
+        # Delay between deferred attempts; by default the time until the
+        # node is expected to be back within its SLA
+        self.defer_interval = defer_interval
+        # If True, an idle node takes over a task that is queued, but not
+        # yet started, on a busier node when it can finish it sooner.
+        self.work_stealing = work_stealing
+        self.counters = {"rejected": 0, "redirected": 0, "deferred": 0, "steals": 0}
+        # Task id -> (task, node, steal event, queue priority) of stealable queued tasks
+        self._waiting = {}
+        # If True, tasks of the same priority class are served in weighted
+        # fair-queueing order between tenants at every node, instead of in
+        # request order (weights default to 1).
+        self.fair_share = fair_share
+        self.tenant_weights = dict(tenant_weights or {})
+        self._fair_queues = (
+            {id(q): WeightedFairQueue(self.tenant_weights) for q in qnodes} if fair_share else {}
+        )
+        # Scheduling decision cost charged to simulated time: None (decisions
+        # are free), "measured" (wall time of scheduler.schedule, per task
+        # from the "decision_times" metadata when the scheduler reports it,
+        # else split evenly, times decision_time_scale), a constant number of
+        # seconds per decision, or a cost model f(task, qnodes) -> seconds.
+        # Decisions are made one at a time, in arrival order, by a single
+        # scheduler, so expensive policies also make tasks queue for it.
+        self.decision_latency = decision_latency
+        self.decision_time_scale = decision_time_scale
+        self._decider = simpy.Resource(env, capacity=1) if decision_latency is not None else None
+        # Task id -> cost of its scheduling decision
+        self._decision_times = {}
+        # Task id -> time from arrival to dispatch (queueing for and making the decision)
+        self._overheads = {}
+        # Calibration snapshots (or a timeline file) applied to nodes at
+        # their simulated times. Each node then has versioned tables
+        # (qnode.calibration), and an update invalidates only the cached
+        # estimates of circuits using a recalibrated qubit, here and in the
+        # scheduler (update_calibration); they are recomputed on next use
+        # from the cached transpilation (layouts are kept, error rates are
+        # refreshed).
+        if isinstance(calibration_timeline, str):
+            calibration_timeline = load_calibration_timeline(calibration_timeline)
+        if calibration_timeline:
+            # The timeline starts from the backends' shared tables
+            for qnode in qnodes:
+                qnode.calibration = None
+        # Node key -> estimate keys cached for it, and estimate key -> the
+        # physical qubits the transpiled circuit uses
+        self._node_estimates = {}
+        self._estimate_qubits = {}
+        self.calibration_stats = {"snapshots": 0, "invalidated": 0, "kept": 0}
+        self._track_calibration = bool(calibration_timeline)
+        if calibration_timeline:
+            self.env.process(self._apply_calibrations(sorted(calibration_timeline, key=lambda s: s.time)))
+        # (circuit key, node name) -> (fidelity, per-shot time, swaps) or the error, where
+        # the circuit key is the task id, (task id, fragment) or a variational template key
+        self._estimates = {}
+        # Task id -> circuit key; instances of one variational template share their estimates
+        self._circuit_keys = {}
+        # Expected time at which each node has worked off its queue
+        self._busy_until = {id(q): 0.0 for q in qnodes}
+        # Task id -> event triggered with the task's status when it finishes
+        self._done = {}
+        # Task id -> queue position from the scheduler's "queue_ranks"
+        # metadata, used after the task's own priority to order node queues
+        self._queue_ranks = {}
+        # Optional transpile pool: assigned (task, node) pairs are transpiled
+        # and estimated in arrival order, at most prefetcher.window ahead,
+        # and a task takes its result when it is estimated after admission
+        self.prefetcher = prefetcher
+        # (task, node) pairs not yet sent to the pool
+        self._prefetch_queue = deque()
+        # Estimate key -> (arrival rank, future, task id) of results in flight or not yet used
+        self._prefetched = OrderedDict()
+        # Task id -> (node key, transpiled circuit) prefetched for the
+        # noisy-simulation pool, used by _execute instead of transpiling again;
+        # held from the task's estimate until its row is recorded
+        self._prefetched_circuits = {}
+        # Arrival rank of the last pair sent to the pool and of the last result taken
+        self._prefetch_sent = 0
+        self._prefetch_taken = 0
+        self.prefetch_stats = {"submitted": 0, "ready": 0, "waited": 0, "wait_time": 0.0, "evicted": 0, "failed": 0}
 
     def submit(self, tasks: list[QuantumTask]):
         logger.info(f"Submitting {len(tasks)} tasks")
         logger.info("Calling scheduler.schedule(...) now")
+        started = time.perf_counter()
         result = self.scheduler.schedule(tasks, self.qnodes)
-        logger.info("scheduler.schedule returned")
+        elapsed = time.perf_counter() - started
+        logger.info(f"scheduler.schedule returned after {elapsed:.3f}s")
+        if self.decision_latency is not None:
+            self._decision_times.update(self._decision_costs(tasks, result, elapsed))
+        # Rejects cyclic dependencies before anything is started
+        topological_order(tasks)
+        for task in tasks:
+            self._done[task.id] = self.env.event()
+        for task_index, rank in (result.get("metadata", {}).get("queue_ranks") or {}).items():
+            self._queue_ranks[tasks[task_index].id] = rank
         assignments = result["assignments"]
+        if self.prefetcher is not None:
+            self._plan_prefetch([(tasks[task_id], qnode) for task_id, qnode in assignments if qnode])
         for task_id, qnode in assignments:
             task = tasks[task_id]
             self.env.process(self._run_task(task, qnode))
 
+    def _plan_prefetch(self, assigned: list[tuple[QuantumTask, QuantumNode]]):
+        """Queue assigned (task, node) pairs for the prefetcher in arrival order."""
+        self.prefetcher.start([q.backend for q in self.qnodes])
+        self._prefetch_queue.extend(sorted(assigned, key=lambda pair: pair[0].arrival_time))
+        self._fill_prefetch()
+
+    def _fill_prefetch(self):
+        """Send queued pairs to the pool while the window has room."""
+        while self._prefetch_queue:
+            if len(self._prefetched) >= self.prefetcher.window and not self._evict_prefetched():
+                break
+            task, qnode = self._prefetch_queue.popleft()
+            self._prefetch_sent += 1
+            key = (self._circuit_key(task), qnode.name or id(qnode))
+            if key in self._estimates or key in self._prefetched:
+                continue
+            keep_circuit = self._track_calibration or self.executor is not None
+            future = self.prefetcher.submit(task.circuit, qnode.backend, keep_circuit=keep_circuit)
+            if future is not None:
+                self._prefetched[key] = (self._prefetch_sent, future, task.id)
+                self.prefetch_stats["submitted"] += 1
+
+    def _evict_prefetched(self) -> bool:
+        """
+        Drop a finished result that arrived before the last one taken (its
+        task was rejected, redirected or is still held back), freeing its
+        slot in the window. Returns False when there is none.
+        """
+        for key, (rank, future, _) in self._prefetched.items():
+            if rank < self._prefetch_taken and future.done():
+                del self._prefetched[key]
+                self.prefetch_stats["evicted"] += 1
+                return True
+        return False
+
+    def _take_prefetched(self, key, task_id=None) -> tuple | None:
+        """
+        The prefetched (transpiled circuit, one-shot estimate) of ``key``,
+        waiting for it if it is still running, or None if it was not
+        prefetched or the prefetch failed.
+        """
+        entry = self._prefetched.pop(key, None)
+        if entry is None:
+            return None
+        rank, future, prefetched_for = entry
+        self._prefetch_taken = max(self._prefetch_taken, rank)
+        if future.done():
+            self.prefetch_stats["ready"] += 1
+        else:
+            self.prefetch_stats["waited"] += 1
+        started = time.perf_counter()
+        try:
+            prefetched = future.result()
+            if self.executor is not None and prefetched[0] is not None and prefetched_for == task_id:
+                # Only for the task it was prefetched for; template instances
+                # sharing the estimate have other parameters
+                self._prefetched_circuits[task_id] = (key[1], prefetched[0])
+        except Exception as e:
+            # Estimated again in this process, which reports real estimation errors
+            logger.debug(f"Prefetch of {key} failed: {e!r}")
+            self.prefetch_stats["failed"] += 1
+            prefetched = None
+        self.prefetch_stats["wait_time"] += time.perf_counter() - started
+        self._fill_prefetch()
+        return prefetched
+
     def _run_task(self, task: QuantumTask, qnode: QuantumNode):
         # Wait until task arrival
         yield self.env.timeout(task.arrival_time)
+
+        # A workflow task is released once all its predecessors have finished;
+        # its arrival time is the release time
+        predecessors = []
+        for pred in task.predecessors:
+            if pred in self._done:
+                predecessors.append(self._done[pred])
+            else:
+                logger.warning(f"Task {task.id} depends on unknown task {pred}, ignoring it")
+        if predecessors:
+            yield self.env.all_of(predecessors)
         arrival = self.env.now
+        self._trace("arrival", task)
+
+        if any(event.value != "success" for event in predecessors):
+            self._record_failure(task, arrival, "predecessor failed")
+            return None
+
+        if self._decider is not None:
+            # The task is dispatched once the scheduler has decided on it
+            with self._decider.request() as req:
+                yield req
+                yield self.env.timeout(self._decision_times.get(task.id, 0.0))
+            self._overheads[task.id] = self.env.now - arrival
 
         if not qnode:
-            self.results.append(
-                {
-                    "task_id": task.id,
-                    "backend": "",
-                    "status": "failed",
-                    "message": "error_message",
-                    "arrival_time": arrival,
-                    "start_time": -1,
-                    "finish_time": -1,
-                    "waiting_time": -1,
-                    "turnaround_time": -1,
-                    "fidelity": -1,
-                    "exec_time_est": -1,
-                    "swap_count": -1,
-                }
-            )
+            self._record_failure(task, arrival, "error_message")
             return None
-        with qnode.request() as req:
-            yield req
-            start = self.env.now
-            waiting_time = start - arrival
 
-            status = "success"
-            error_message = None
+        deferrals = 0
+        if self.max_queue is not None or self.sla is not None:
+            qnode, deferrals, reason = yield from self._admit(task, qnode)
+            if qnode is None:
+                self._record_failure(task, arrival, reason, status="rejected", deferrals=deferrals)
+                return None
 
-            # Estimate exec time as service time
-            try:
-                tqc = transpile(
-                    task.circuit, backend=qnode.backend, optimization_level=3
-                )
+        if self.circuit_cutting and task.circuit.num_qubits > qnode.backend.num_qubits:
+            placement = self._plan_fragments(task, qnode)
+            if placement is not None:
+                yield from self._run_cut_task(task, *placement, arrival)
+                return None
+
+        shots = self._task_shots(task)
+        if self.split_shots and shots >= 2 * self.min_chunk_shots:
+            plan = self._plan_chunks(task, qnode, shots)
+            if len(plan) > 1:
+                yield from self._run_split_task(task, plan, arrival)
+                return None
+
+        status = "success"
+        error_message = None
+        # Estimate exec time as service time
+        try:
+            fidelity, exec_time, swaps = self._estimate(task, qnode, shots)
+            service_time = exec_time
+        except Exception as e:
+            error_message = e
+            status = "failed"
+            fidelity, exec_time, swaps = None, None, None
+            service_time = 1.0
 
-                err_map = get_gate_error_map(qnode.backend)
-                fidelity, exec_time, swaps = estimate_fidelity_and_time(
-                    tqc, qnode.backend, err_map, shots=self.shots
+        steals = 0
+        stolen_wait = 0.0
+        while True:
+            try:
+                start, waiting_time, preemptions = yield from self._occupy(
+                    qnode,
+                    task,
+                    service_time,
+                    stealable=self.work_stealing and status == "success",
+                    reserve=steals == 0,
                 )
+                waiting_time += stolen_wait
+                break
+            except _Stolen as stolen:
+                # Requeue on the idle node, which already reserved the work
+                qnode = stolen.thief
+                stolen_wait += stolen.waiting_time
+                steals += 1
+                fidelity, exec_time, swaps = self._estimate(task, qnode, shots)
                 service_time = exec_time
+
+        if self.executor is not None and status == "success":
+            self._execute(task, qnode, shots)
+
+        finish = self.env.now
+        turnaround_time = finish - arrival
+
+        self._record(
+            {
+                "task_id": task.id,
+                "backend": qnode.backend.name,
+                "status": status,
+                "message": error_message,
+                "priority": task.priority,
+                "workflow_id": task.workflow_id,
+                "tenant": task.tenant,
+                "arrival_time": arrival,
+                "start_time": start,
+                "finish_time": finish,
+                "waiting_time": waiting_time,
+                "scheduling_overhead": self._overheads.get(task.id, 0.0),
+                "turnaround_time": turnaround_time,
+                "fidelity": fidelity,
+                "exec_time_est": exec_time,
+                "swap_count": swaps,
+                "preemptions": preemptions,
+                "steals": steals,
+                "deferrals": deferrals,
+                "cuts": 0,
+                "chunks": None,
+            }
+        )
+
+    def _decision_costs(self, tasks: list[QuantumTask], result: dict, elapsed: float) -> dict[int, float]:
+        """Simulated cost of the scheduling decision of every task."""
+        if callable(self.decision_latency):
+            return {task.id: float(self.decision_latency(task, self.qnodes)) for task in tasks}
+        if self.decision_latency == "measured":
+            measured = result.get("metadata", {}).get("decision_times")
+            if measured is None:
+                measured = {i: elapsed / len(tasks) for i in range(len(tasks))} if tasks else {}
+            return {tasks[i].id: seconds * self.decision_time_scale for i, seconds in measured.items()}
+        return {task.id: float(self.decision_latency) for task in tasks}
+
+    def _record_failure(
+        self, task: QuantumTask, arrival: float, message: str, status: str = "failed", deferrals: int = 0
+    ):
+        self._record(
+            {
+                "task_id": task.id,
+                "backend": "",
+                "status": status,
+                "message": message,
+                "priority": task.priority,
+                "workflow_id": task.workflow_id,
+                "tenant": task.tenant,
+                "arrival_time": arrival,
+                "start_time": -1,
+                "finish_time": -1,
+                "waiting_time": -1,
+                "scheduling_overhead": self._overheads.get(task.id, 0.0),
+                "turnaround_time": -1,
+                "fidelity": -1,
+                "exec_time_est": -1,
+                "swap_count": -1,
+                "preemptions": 0,
+                "steals": 0,
+                "deferrals": deferrals,
+                "cuts": 0,
+                "chunks": None,
+            }
+        )
+
+    def _occupy(
+        self,
+        qnode: QuantumNode,
+        task: QuantumTask,
+        service_time: float,
+        stealable: bool = False,
+        reserve: bool = True,
+    ):
+        """
+        Queue on ``qnode`` and hold it for ``service_time``, requeueing with the
+        remaining time whenever preempted.
+
+        Returns (start, waiting_time, preemptions), where waiting_time is all
+        time spent queued, including after preemptions. If ``stealable``, an
+        idle node may take the task over before it starts, which raises
+        ``_Stolen`` after the request on ``qnode`` has been withdrawn.
+        """
+        if reserve:
+            self._reserve(qnode, service_time)
+        start = None
+        remaining = service_time
+        preemptions = 0
+        waiting_time = 0.0
+        finished = False
+        fair_queue = self._fair_queues.get(id(qnode))
+        # The fair-share tag is taken once; a preempted task keeps its place
+        tag = fair_queue.tag(task.tenant, service_time) if fair_queue is not None else None
+        priority = self._queue_priority(task, tag)
+        while not finished:
+            queued_at = self.env.now
+            with qnode.request(priority=priority, preempt=self._preempts(task, qnode)) as req:
+                self._trace("queue_enter", task, qnode)
+                if stealable and start is None and not req.triggered:
+                    steal = self.env.event()
+                    self._waiting[task.id] = (task, qnode, steal, priority)
+                    self._offer(task, qnode)
+                    yield req | steal
+                    self._waiting.pop(task.id, None)
+                    if steal.triggered:
+                        self._release(qnode, service_time)
+                        self._trace("steal", task, qnode)
+                        raise _Stolen(steal.value, waiting_time + self.env.now - queued_at)
+                else:
+                    yield req
+                waiting_time += self.env.now - queued_at
+                if start is None:
+                    start = self.env.now
+
+                if fair_queue is not None:
+                    fair_queue.start(tag)
+
+                # This line is where the execution is simulated in time
+                run_start = self.env.now
+                self._trace("start", task, qnode)
+                try:
+                    yield self.env.timeout(remaining)
+                    self._trace("finish", task, qnode)
+                    finished = True
+                except simpy.Interrupt:
+                    # Preempted by a more urgent task: requeue with the rest
+                    remaining -= self.env.now - run_start
+                    preemptions += 1
+                    self._trace("preempt", task, qnode)
+                    logger.debug(
+                        f"Task {task.id} preempted on {qnode.name} at {self.env.now}, {remaining} left"
+                    )
+        # The node has been released; if nothing is queued on it, look for
+        # work to take over from busier nodes
+        if self.work_stealing and self._is_idle(qnode):
+            self._steal_for(qnode)
+        return start, waiting_time, preemptions
+
+    def _admit(self, task: QuantumTask, qnode: QuantumNode):
+        """
+        Apply the admission policy to ``task`` on its assigned ``qnode``.
+
+        Returns (node to queue on, deferrals, reason), where the node is None
+        if the task was rejected.
+        """
+        deferrals = 0
+        while True:
+            reason = self._overload(qnode)
+            if reason is None:
+                return qnode, deferrals, None
+            if self.admission == "redirect":
+                target = self._redirect_target(task, qnode)
+                if target is not None:
+                    logger.debug(f"Task {task.id} redirected from {qnode.name} to {target.name}: {reason}")
+                    self.counters["redirected"] += 1
+                    return target, deferrals, None
+            elif self.admission == "defer" and deferrals < self.max_deferrals:
+                deferrals += 1
+                self.counters["deferred"] += 1
+                yield self.env.timeout(self._defer_delay(qnode))
+                continue
+            logger.debug(f"Task {task.id} rejected at {self.env.now}: {reason}")
+            self.counters["rejected"] += 1
+            self._trace("reject", task, qnode)
+            return None, deferrals, reason
+
+    def _overload(self, qnode: QuantumNode) -> str | None:
+        """Why ``qnode`` does not admit another task, or None if it does."""
+        if self.max_queue is not None and len(qnode.queue) >= self.max_queue:
+            return f"queue of {qnode.name} is full"
+        if self.sla is not None and self._predicted_wait(qnode) > self.sla:
+            return f"predicted wait on {qnode.name} exceeds the SLA"
+        return None
+
+    def _redirect_target(self, task: QuantumTask, assigned: QuantumNode) -> QuantumNode | None:
+        """The admitting node expected to finish ``task`` earliest, if any."""
+        shots = self._task_shots(task)
+        best = None
+        for qnode in self.qnodes:
+            if qnode is assigned or qnode.backend.num_qubits < task.circuit.num_qubits:
+                continue
+            if self._overload(qnode) is not None:
+                continue
+            try:
+                _, exec_time, _ = self._estimate(task, qnode, shots)
+            except Exception as e:
+                logger.debug(f"Task {task.id} cannot run on {qnode.name}: {e}")
+                continue
+            finish = self._predicted_wait(qnode) + exec_time
+            if best is None or finish < best[0]:
+                best = (finish, qnode)
+        return best[1] if best is not None else None
+
+    def _defer_delay(self, qnode: QuantumNode) -> float:
+        if self.defer_interval is not None:
+            return self.defer_interval
+        wait = self._predicted_wait(qnode)
+        if self.sla is not None and wait > self.sla:
+            return wait - self.sla
+        # Queue full: about one task's worth of service
+        return wait / max(len(qnode.queue), 1)
+
+    def _predicted_wait(self, qnode: QuantumNode) -> float:
+        return max(0.0, self._busy_until.get(id(qnode), 0.0) - self.env.now)
+
+    def _is_idle(self, qnode: QuantumNode) -> bool:
+        # Work already reserved for a node counts, so two tasks are never
+        # handed to the same idle node at once (with slack for rounding in
+        # the accumulated reservations)
+        return qnode.count == 0 and not qnode.queue and self._predicted_wait(qnode) <= 1e-9 * max(1.0, self.env.now)
+
+    def _offer(self, task: QuantumTask, qnode: QuantumNode):
+        """Hand a task just queued on a busy ``qnode`` to an idle node that finishes it sooner."""
+        best = None
+        for candidate in self.qnodes:
+            if candidate is qnode or not self._is_idle(candidate):
+                continue
+            exec_time = self._steal_estimate(task, candidate)
+            if exec_time is not None and (best is None or exec_time < best[0]):
+                best = (exec_time, candidate)
+        if best is not None and self.env.now + best[0] < self._busy_until.get(id(qnode), 0.0):
+            self._steal(task.id, best[1], best[0])
+
+    def _steal_for(self, idle: QuantumNode):
+        """Let ``idle`` take over the queued task of the most backed-up node that it finishes sooner."""
+        best = None
+        for task_id, (task, victim, _, priority) in self._waiting.items():
+            exec_time = self._steal_estimate(task, idle)
+            if exec_time is None:
+                continue
+            victim_until = self._busy_until.get(id(victim), 0.0)
+            if self.env.now + exec_time >= victim_until:
+                continue
+            # Most backed-up victim first, then the task it would serve first
+            key = (-victim_until, priority)
+            if best is None or key < best[0]:
+                best = (key, task_id, exec_time)
+        if best is not None:
+            self._steal(best[1], idle, best[2])
+
+    def _steal_estimate(self, task: QuantumTask, qnode: QuantumNode) -> float | None:
+        if qnode.backend.num_qubits < task.circuit.num_qubits:
+            return None
+        try:
+            _, exec_time, _ = self._estimate(task, qnode, self._task_shots(task))
+        except Exception as e:
+            logger.debug(f"Task {task.id} cannot be stolen by {qnode.name}: {e}")
+            return None
+        return exec_time
+
+    def _steal(self, task_id: int, thief: QuantumNode, exec_time: float):
+        task, victim, steal, _ = self._waiting.pop(task_id)
+        logger.debug(f"Task {task_id} stolen from {victim.name} by {thief.name} at {self.env.now}")
+        self.counters["steals"] += 1
+        self._reserve(thief, exec_time)
+        steal.succeed(thief)
+
+    def _run_split_task(self, task: QuantumTask, plan: list[tuple[QuantumNode, int]], arrival: float):
+        """Run the chunks of a split task in parallel and merge them into one result row."""
+        chunk_procs = [
+            self.env.process(self._run_chunk(task, qnode, chunk_shots))
+            for qnode, chunk_shots in plan
+        ]
+        yield self.env.all_of(chunk_procs)
+        chunks = [proc.value for proc in chunk_procs]
+
+        start = min(c["start_time"] for c in chunks)
+        finish = self.env.now
+        total_shots = sum(c["shots"] for c in chunks)
+        logger.debug(f"Task {task.id} ran as {len(chunks)} chunks: {[(c['backend'], c['shots']) for c in chunks]}")
+
+        self._record(
+            {
+                "task_id": task.id,
+                "backend": "+".join(dict.fromkeys(c["backend"] for c in chunks)),
+                "status": "success",
+                "message": None,
+                "priority": task.priority,
+                "workflow_id": task.workflow_id,
+                "tenant": task.tenant,
+                "arrival_time": arrival,
+                "start_time": start,
+                "finish_time": finish,
+                "waiting_time": start - arrival,
+                "scheduling_overhead": self._overheads.get(task.id, 0.0),
+                "turnaround_time": finish - arrival,
+                # Shot-weighted: the merged counts mix all chunks
+                "fidelity": sum(c["fidelity"] * c["shots"] for c in chunks) / total_shots,
+                # Total device time used by all chunks
+                "exec_time_est": sum(c["exec_time_est"] for c in chunks),
+                "swap_count": max(c["swap_count"] for c in chunks),
+                "preemptions": sum(c["preemptions"] for c in chunks),
+                "steals": 0,
+                "deferrals": 0,
+                "cuts": 0,
+                "chunks": chunks,
+            }
+        )
+
+    def _run_cut_task(self, task: QuantumTask, cut: CutPlan, shots: int, placement: list[tuple[int, QuantumNode]], arrival: float):
+        """Run the fragments of a cut task in parallel and merge them into one result row."""
+        fragment_procs = [
+            self.env.process(self._run_fragment(task, cut, i, qnode, shots))
+            for i, qnode in placement
+        ]
+        yield self.env.all_of(fragment_procs)
+        fragments = [proc.value for proc in fragment_procs]
+
+        start = min(f["start_time"] for f in fragments)
+        finish = self.env.now
+        logger.debug(
+            f"Task {task.id} ran as {len(fragments)} fragments with {cut.num_cuts} cuts: "
+            f"{[(f['backend'], len(f['qubits'])) for f in fragments]}"
+        )
+
+        self._record(
+            {
+                "task_id": task.id,
+                "backend": "+".join(dict.fromkeys(f["backend"] for f in fragments)),
+                "status": "success",
+                "message": None,
+                "priority": task.priority,
+                "workflow_id": task.workflow_id,
+                "tenant": task.tenant,
+                "arrival_time": arrival,
+                "start_time": start,
+                "finish_time": finish,
+                "waiting_time": start - arrival,
+                "scheduling_overhead": self._overheads.get(task.id, 0.0),
+                "turnaround_time": finish - arrival,
+                # Every fragment has to succeed for the reconstruction to hold
+                "fidelity": math.prod(f["fidelity"] for f in fragments),
+                # Total device time used by all fragments, sampling overhead included
+                "exec_time_est": sum(f["exec_time_est"] for f in fragments),
+                "swap_count": sum(f["swap_count"] for f in fragments),
+                "preemptions": sum(f["preemptions"] for f in fragments),
+                "steals": 0,
+                "deferrals": 0,
+                "cuts": cut.num_cuts,
+                "chunks": fragments,
+            }
+        )
+
+    def _run_fragment(self, task: QuantumTask, cut: CutPlan, index: int, qnode: QuantumNode, shots: int):
+        fidelity, exec_time, swaps = self._estimate_circuit((task.id, index), cut.fragments[index], qnode, shots)
+        start, waiting_time, preemptions = yield from self._occupy(qnode, task, exec_time)
+        return {
+            "backend": qnode.backend.name,
+            "fragment": index,
+            "qubits": cut.fragment_qubits[index],
+            "shots": shots,
+            "start_time": start,
+            "finish_time": self.env.now,
+            "waiting_time": waiting_time,
+            "fidelity": fidelity,
+            "exec_time_est": exec_time,
+            "swap_count": swaps,
+            "preemptions": preemptions,
+        }
+
+    def _plan_fragments(self, task: QuantumTask, assigned: QuantumNode):
+        """
+        Cut ``task`` to the width of its assigned node and place each fragment,
+        widest first, on the node expected to finish it earliest.
+
+        Returns (cut, shots per fragment, [(fragment index, node)]), or None if
+        the circuit cannot be cut or some fragment fits nowhere.
+        """
+        try:
+            cut = cut_circuit(task.circuit, assigned.backend.num_qubits, self.max_cuts)
+        except Exception as e:
+            logger.debug(f"Task {task.id} cannot be cut: {e}")
+            return None
+        if cut is None:
+            logger.debug(f"Task {task.id} needs more than {self.max_cuts} cuts for {assigned.name}")
+            return None
+
+        # Each fragment needs the task's shots times the sampling overhead
+        shots = math.ceil(self._task_shots(task) * cut.sampling_overhead)
+        candidates = [assigned] + [q for q in self.qnodes if q is not assigned]
+        ready = {id(q): max(self.env.now, self._busy_until.get(id(q), 0.0)) for q in candidates}
+        placement = []
+        for i in sorted(range(len(cut.fragments)), key=lambda i: -cut.fragments[i].num_qubits):
+            best = None
+            for qnode in candidates:
+                if qnode.backend.num_qubits < cut.fragments[i].num_qubits:
+                    continue
+                try:
+                    _, exec_time, _ = self._estimate_circuit((task.id, i), cut.fragments[i], qnode, shots)
+                except Exception as e:
+                    logger.debug(f"Fragment {i} of task {task.id} cannot run on {qnode.name}: {e}")
+                    continue
+                finish = ready[id(qnode)] + exec_time
+                if best is None or finish < best[0]:
+                    best = (finish, qnode)
+            if best is None:
+                return None
+            ready[id(best[1])] = best[0]
+            placement.append((i, best[1]))
+        return cut, shots, sorted(placement, key=lambda item: item[0])
+
+    def _run_chunk(self, task: QuantumTask, qnode: QuantumNode, shots: int):
+        fidelity, exec_time, swaps = self._estimate(task, qnode, shots)
+        start, waiting_time, preemptions = yield from self._occupy(qnode, task, exec_time)
+        return {
+            "backend": qnode.backend.name,
+            "shots": shots,
+            "start_time": start,
+            "finish_time": self.env.now,
+            "waiting_time": waiting_time,
+            "fidelity": fidelity,
+            "exec_time_est": exec_time,
+            "swap_count": swaps,
+            "preemptions": preemptions,
+        }
+
+    def _plan_chunks(self, task: QuantumTask, assigned: QuantumNode, shots: int) -> list[tuple[QuantumNode, int]]:
+        """
+        Choose chunk sizes over all nodes the task fits on, the scheduler's
+        choice first, from each node's per-shot time and expected free time.
+        """
+        candidates = [assigned] + [q for q in self.qnodes if q is not assigned]
+        feasible, per_shot, ready = [], [], []
+        for qnode in candidates:
+            if qnode.backend.num_qubits < task.circuit.num_qubits:
+                continue
+            try:
+                _, shot_time, _ = self._estimate(task, qnode, 1)
+            except Exception as e:
+                logger.debug(f"Task {task.id} cannot run on {qnode.name}: {e}")
+                continue
+            feasible.append(qnode)
+            per_shot.append(shot_time)
+            ready.append(max(self.env.now, self._busy_until.get(id(qnode), 0.0)))
+
+        plan = plan_shot_chunks(shots, per_shot, ready, self.min_chunk_shots, self.max_chunks)
+        return [(feasible[i], n) for i, n in plan]
+
+    def _estimate(self, task: QuantumTask, qnode: QuantumNode, shots: int):
+        """
+        Return (fidelity, exec_time, swaps) of ``task`` on ``qnode`` for
+        ``shots`` shots. The circuit is transpiled once per node; execution
+        time scales linearly with shots. Estimation errors are re-raised.
+        """
+        return self._estimate_circuit(self._circuit_key(task), task.circuit, qnode, shots, task.id)
+
+    def _circuit_key(self, task: QuantumTask):
+        circuit_key = self._circuit_keys.get(task.id)
+        if circuit_key is None:
+            circuit_key = self._circuit_keys[task.id] = template_key(task.circuit) or task.id
+        return circuit_key
+
+    def _estimate_circuit(self, circuit_key, circuit, qnode: QuantumNode, shots: int, task_id=None):
+        node_key = qnode.name or id(qnode)
+        key = (circuit_key, node_key)
+        estimate = self._estimates.get(key)
+        if estimate is None:
+            prefetched = self._take_prefetched(key, task_id) if self._prefetched else None
+            try:
+                if prefetched is not None:
+                    tqc, estimate = prefetched
+                else:
+                    tqc = transpile_for_backend(circuit, qnode.backend)
+                # Prefetch workers use the base calibration; a recalibrated
+                # node is estimated here with its current tables
+                if estimate is None or qnode.calibration is not None:
+                    err_map = node_calibration(qnode).err_map
+                    estimate = estimate_fidelity_and_time(tqc, qnode.backend, err_map, shots=1)
+                estimate = tuple(estimate)
+                if self._track_calibration:
+                    self._node_estimates.setdefault(node_key, set()).add(key)
+                    self._estimate_qubits[key] = used_qubits(tqc)
             except Exception as e:
-                error_message = e
-                status = "failed"
-                fidelity, exec_time, swaps = None, None, None
-                service_time = 1.0
-
-            # This line is where the execution is simulated in time
-            yield self.env.timeout(service_time)
-
-            finish = self.env.now
-            turnaround_time = finish - arrival
-
-            self.results.append(
-                {
-                    "task_id": task.id,
-                    "backend": qnode.backend.name,
-                    "status": status,
-                    "message": error_message,
-                    "arrival_time": arrival,
-                    "start_time": start,
-                    "finish_time": finish,
-                    "waiting_time": waiting_time,
-                    "turnaround_time": turnaround_time,
-                    "fidelity": fidelity,
-                    "exec_time_est": exec_time,
-                    "swap_count": swaps,
-                }
+                estimate = e
+            self._estimates[key] = estimate
+        if isinstance(estimate, Exception):
+            raise estimate
+        fidelity, shot_time, swaps = estimate
+        return fidelity, shot_time * shots, swaps
+
+    def _apply_calibrations(self, snapshots: list[CalibrationSnapshot]):
+        """Process applying each snapshot at its time."""
+        for snapshot in snapshots:
+            if snapshot.time > self.env.now:
+                yield self.env.timeout(snapshot.time - self.env.now)
+            targets = [q for q in self.qnodes if q.name == snapshot.node]
+            if not targets:
+                targets = [q for q in self.qnodes if q.backend.name == snapshot.node]
+            if not targets:
+                logger.warning(f"Calibration snapshot at {snapshot.time} names unknown node {snapshot.node}")
+                continue
+            for qnode in targets:
+                self._recalibrate(qnode, snapshot)
+            self.calibration_stats["snapshots"] += 1
+
+    def _recalibrate(self, qnode: QuantumNode, snapshot: CalibrationSnapshot):
+        versioned = qnode.calibration
+        if versioned is None:
+            versioned = qnode.calibration = VersionedCalibration(get_calibration(qnode.backend))
+        affected = versioned.apply(snapshot)
+        self.scheduler.update_calibration(qnode, affected)
+
+        invalidated = 0
+        cached = self._node_estimates.get(qnode.name or id(qnode), set())
+        for key in list(cached):
+            qubits = self._estimate_qubits.get(key)
+            # Failed estimates have no qubits and are kept
+            if qubits is not None and not qubits.isdisjoint(affected):
+                self._estimates.pop(key, None)
+                self._estimate_qubits.pop(key, None)
+                cached.discard(key)
+                invalidated += 1
+        self.calibration_stats["invalidated"] += invalidated
+        self.calibration_stats["kept"] += len(cached)
+        logger.debug(
+            f"Calibration v{versioned.version} of {qnode.name} at {self.env.now}: "
+            f"{len(affected)} qubits changed, {invalidated} cached estimates invalidated"
+        )
+
+    def _execute(self, task: QuantumTask, qnode: QuantumNode, shots: int):
+        """Submit the task's transpiled circuit to the noisy-simulation pool."""
+        node_key, tqc = self._prefetched_circuits.pop(task.id, (None, None))
+        try:
+            if tqc is None or node_key != (qnode.name or id(qnode)):
+                tqc = transpile_for_backend(task.circuit, qnode.backend)
+            future = self.executor.submit(tqc, qnode.backend, shots)
+        except Exception as e:
+            logger.warning(f"Could not submit task {task.id} for noisy simulation: {e}")
+            return
+        if future is not None:
+            self._executions[task.id] = future
+
+    def _collect_executions(self):
+        """Wait for submitted simulations and add their results to the rows."""
+        for row in self.results:
+            if "measured_fidelity" in row:
+                continue
+            measured, counts = None, None
+            future = self._executions.pop(row["task_id"], None)
+            if future is not None:
+                try:
+                    execution = future.result()
+                    measured, counts = execution["hellinger_fidelity"], execution["counts"]
+                except Exception as e:
+                    logger.warning(f"Noisy simulation of task {row['task_id']} failed: {e}")
+            row["measured_fidelity"] = measured
+            row["counts"] = counts
+
+    def _reserve(self, qnode: QuantumNode, service_time: float):
+        """Account ``service_time`` of queued work on ``qnode``."""
+        key = id(qnode)
+        self._busy_until[key] = max(self.env.now, self._busy_until.get(key, 0.0)) + service_time
+        self.scheduler.update_node(qnode, self._busy_until[key])
+
+    def _release(self, qnode: QuantumNode, service_time: float):
+        """Take back ``service_time`` of queued work that left ``qnode``."""
+        key = id(qnode)
+        self._busy_until[key] = max(self.env.now, self._busy_until.get(key, 0.0) - service_time)
+        self.scheduler.update_node(qnode, self._busy_until[key])
+
+    def _trace(self, kind: str, task: QuantumTask, qnode: QuantumNode | None = None):
+        if self.trace is not None:
+            self.trace.record(
+                self.env.now,
+                kind,
+                task.id,
+                (qnode.name or qnode.backend.name) if qnode is not None else None,
+                len(qnode.queue) if qnode is not None else 0,
             )
 
+    def _queue_priority(self, task: QuantumTask, tag: float | None = None):
+        """
+        Request priority of ``task``: its priority class, then its fair-share
+        tag and its scheduler queue rank when those are in use.
+        """
+        key = (task.priority,)
+        if tag is not None:
+            key += (tag,)
+        if self._queue_ranks:
+            key += (self._queue_ranks.get(task.id, 0),)
+        return key if len(key) > 1 else task.priority
+
+    def _preempts(self, task: QuantumTask, qnode: QuantumNode) -> bool:
+        """
+        Whether the request of ``task`` may preempt: only a more urgent
+        priority class does, never a better tag or rank within a class.
+        """
+        if not self.preemption:
+            return False
+        return any(_priority_class(user.priority) > task.priority for user in qnode.users)
+
+    def _record(self, row: dict):
+        # Rejected, failed, split and cut tasks never reach _execute
+        self._prefetched_circuits.pop(row["task_id"], None)
+        self.results.append(row)
+        self.metrics.record(self.scheduler.__class__.__name__, row)
+        done = self._done.get(row["task_id"])
+        if done is not None and not done.triggered:
+            done.succeed(row["status"])
+
+    def _task_shots(self, task: QuantumTask) -> int:
+        return task.shots if task.shots is not None else self.shots
+
     def get_results(self):
+        if self.executor is not None:
+            self._collect_executions()
         return self.results
+
+    def get_node_loads(self):
+        """Predicted wait of every node (time until it has worked off its queue)."""
+        return {q.name or q.backend.name: self._predicted_wait(q) for q in self.qnodes}
+
+    def get_calibration_stats(self):
+        """Applied snapshots and cached estimates invalidated or kept by them."""
+        return {
+            **self.calibration_stats,
+            "versions": {
+                q.name or q.backend.name: q.calibration.version
+                for q in self.qnodes
+                if q.calibration is not None
+            },
+        }
+
+    def get_prefetch_stats(self):
+        """Prefetched results used ready or waited for, evicted or failed, and total wait."""
+        return dict(self.prefetch_stats)
+
+    def get_admission_stats(self):
+        """Counts of rejected, redirected and deferred admissions and of work steals."""
+        return dict(self.counters)
+
+    def get_tenant_stats(self):
+        """Latency, throughput and service share per tenant."""
+        return latency_by_tenant(self.results, self.tenant_weights)
+
+    def get_priority_stats(self):
+        """Waiting and turnaround statistics per priority class."""
+        return latency_by_priority(self.results)
+
+    def get_latency_summary(self):
+        """p50/p95/p99/max waiting and turnaround time per scheduler and backend."""
+        return self.metrics.summary()
+
+    def get_workflow_stats(self):
+        """End-to-end makespan of every workflow (tasks with a workflow_id)."""
+        return workflow_makespans(self.results)
+
+
+def _priority_class(priority) -> int:
+    return priority[0] if isinstance(priority, tuple) else priority
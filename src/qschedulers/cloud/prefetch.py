@@ -0,0 +1,126 @@
+"""
+Transpile Prefetch
+------------------
+Transpiles and estimates upcoming tasks in a pool of worker processes while
+the simulation runs.
+
+Without prefetching, a task is transpiled when ``Orchestrator._run_task``
+estimates it, right after admission and before it queues for its node, so
+the wall time of a run is the sum of every transpile. With a
+``TranspilePrefetcher``, the orchestrator hands the pool the (task, assigned
+node) pairs in arrival order, keeping at most ``window`` results in flight or
+waiting to be used, and a task picks up its finished result when it is
+estimated (waiting for it if it is still running). Compilation of later
+arrivals overlaps with the simulation of earlier ones, and memory is bounded
+by the window. When the orchestrator has a noisy-simulation executor, the
+workers also send back the transpiled circuit, which is submitted for
+simulation without transpiling it again; the orchestrator holds it only
+while its task is in the system, and drops it when the task's result is
+recorded, whether the task ran, was rejected or failed.
+
+A task that ends up on another node than the one it was assigned (redirected,
+stolen, split or cut) is estimated in the main process as before, and so is
+any task whose prefetch failed.
+
+Workers are fresh interpreters ("spawn"), since forking after Qiskit has
+started its thread pools can deadlock the children. They receive the nodes'
+backends once, when the pool starts, and use the configured transpile cache
+directory, so results written there are shared with the main process.
+"""
+
+import logging
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PREFETCH_WINDOW = 32
+
+# Per-process backends of the pool's nodes: backend name -> backend
+_backends: dict[str, Any] = {}
+
+
+def _init_worker(backends: dict[str, Any], transpile_cache: str | None):
+    from src.qschedulers.scenario import configure_worker
+
+    configure_worker(transpile_cache, None)
+    _backends.update(backends)
+
+
+def transpile_and_estimate(backend_name: str, circuit: Any, keep_circuit: bool = False) -> tuple[Any, tuple]:
+    """
+    Transpile ``circuit`` for the worker's backend ``backend_name`` and
+    estimate it for one shot with the backend's calibration.
+
+    Returns:
+        (transpiled circuit or None, (fidelity, per-shot time, swaps)); the
+        circuit is only sent back when ``keep_circuit`` is set.
+    """
+    from src.qschedulers.cloud.backends import get_calibration
+    from src.qschedulers.evaluation.metrics import estimate_fidelity_and_time
+    from src.qschedulers.utils.transpilation import transpile_for_backend
+
+    backend = _backends[backend_name]
+    tqc = transpile_for_backend(circuit, backend)
+    estimate = estimate_fidelity_and_time(tqc, backend, get_calibration(backend).err_map, shots=1)
+    return (tqc if keep_circuit else None), estimate
+
+
+class TranspilePrefetcher:
+    """
+    Pool of worker processes transpiling and estimating tasks ahead of their
+    admission.
+    """
+
+    def __init__(
+        self,
+        window: int = DEFAULT_PREFETCH_WINDOW,
+        max_workers: int | None = None,
+        transpile_cache: str | None = None,
+    ):
+        if window < 1:
+            raise ValueError(f"Prefetch window must be at least 1, got {window}")
+        # Results in flight or waiting to be used, at most
+        self.window = window
+        self.max_workers = max_workers
+        # Transpile cache directory of the workers (None: in memory only)
+        self.transpile_cache = transpile_cache
+        self._pool: ProcessPoolExecutor | None = None
+        self._backends: dict[str, Any] = {}
+
+    def start(self, backends: list[Any]):
+        """
+        Start the pool for ``backends`` (restarted when new backends are added).
+        """
+        new = {b.name: b for b in backends if b.name not in self._backends}
+        if not new and self._pool is not None:
+            return
+        self._backends.update(new)
+        self.shutdown(wait=False)
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self._backends, self.transpile_cache),
+        )
+
+    def submit(self, circuit: Any, backend: Any, keep_circuit: bool = False) -> Future | None:
+        """
+        Schedule the transpile and estimate of ``circuit`` on ``backend``.
+        Returns None when the backend is not known to the pool.
+        """
+        if self._pool is None or backend.name not in self._backends:
+            return None
+        return self._pool.submit(transpile_and_estimate, backend.name, circuit, keep_circuit)
+
+    def shutdown(self, wait: bool = True):
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
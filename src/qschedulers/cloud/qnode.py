@@ -1,11 +1,84 @@
 # from external.qsimpy.qsimpy import QNode
+import heapq
+import itertools
+
 import simpy as sp
 
-class QuantumNode(sp.Resource):
+
+class HeapQueue:
+    """
+    Put queue of a QuantumNode: pending requests in a binary heap ordered by
+    their key (FIFO among equal keys), so enqueueing a request and granting
+    the most urgent one are O(log n). SimPy's default ``SortedQueue`` re-sorts
+    a list on every request and pops from its front, which costs O(n) per
+    operation under a burst. Withdrawn requests are deleted lazily.
+    """
+
+    def __init__(self):
+        self._heap = []
+        # id(request) -> its heap entry [key, seq, request]
+        self._entries = {}
+        self._seq = itertools.count()
+
+    def append(self, request):
+        entry = [request.key, next(self._seq), request]
+        self._entries[id(request)] = entry
+        heapq.heappush(self._heap, entry)
+
+    def remove(self, request):
+        entry = self._entries.pop(id(request), None)
+        if entry is None:
+            raise ValueError(f"{request!r} is not queued")
+        entry[-1] = None
+        self._prune()
+
+    def pop(self, index: int = 0):
+        if index != 0:
+            request = self[index]
+            self.remove(request)
+            return request
+        self._prune()
+        if not self._heap:
+            raise IndexError("pop from an empty queue")
+        request = heapq.heappop(self._heap)[-1]
+        del self._entries[id(request)]
+        self._prune()
+        return request
+
+    def __getitem__(self, index: int):
+        if index == 0 and self._heap:
+            return self._heap[0][-1]
+        # Only the head is needed to grant requests; other positions sort
+        return [entry[-1] for entry in sorted(self._entries.values())][index]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self):
+        return (entry[-1] for entry in sorted(self._entries.values()))
+
+    def _prune(self):
+        while self._heap and self._heap[0][-1] is None:
+            heapq.heappop(self._heap)
+
+
+class QuantumNode(sp.PreemptiveResource):
     """
     Wraps a quantum backend as a qsimpy Resource (with a queue).
+
+    Requests are served by priority (smaller value first, FIFO within a
+    priority) and may preempt the running task when made with
+    ``preempt=True``.
     """
-    def __init__(self, env: sp.Environment, backend, name=None):
+
+    PutQueue = HeapQueue
+
+    def __init__(self, env: sp.Environment, backend, name=None, region=None):
         super().__init__(env, capacity=1)
         self.backend = backend
         self.name = name
+        # Site the node belongs to (federated simulation, grouping by region)
+        self.region = region
+        # Node's own VersionedCalibration once a calibration timeline has
+        # recalibrated it (None: the backend's shared tables)
+        self.calibration = None
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any
 
 
@@ -7,4 +7,15 @@ class QuantumTask:
     id: int
     circuit: Any
     arrival_time: float = 0.0
-    priority: int = 0
\ No newline at end of file
+    # Smaller value = more urgent (SimPy PriorityResource convention)
+    priority: int = 0
+    # None uses the orchestrator's default number of shots
+    shots: int | None = None
+    # Ids of tasks that must finish before this one is released
+    predecessors: list[int] = field(default_factory=list)
+    # Tasks sharing a workflow id form one job (e.g. the iterations of a VQE)
+    workflow_id: int | None = None
+    # Team or user the task is billed to, for fair sharing between tenants
+    tenant: str | None = None
+    # Region the task is submitted to in a federated simulation
+    region: str | None = None
@@ -0,0 +1,73 @@
+"""
+Shot Splitting
+--------------
+Plans how to split one task's shots into chunks that run on several qnodes
+in parallel.
+
+Each candidate node ``i`` is described by the time it is expected to become
+free (``ready_time``) and its estimated time per shot. Shots are assigned by
+water-filling so that all used nodes are expected to finish at the same time
+``T``; a node that only becomes free after ``T`` gets no shots.
+"""
+
+import math
+
+
+def plan_shot_chunks(
+    shots: int,
+    per_shot_times: list[float],
+    ready_times: list[float],
+    min_chunk_shots: int = 1,
+    max_chunks: int | None = None,
+) -> list[tuple[int, int]]:
+    """
+    Split ``shots`` across candidate nodes to minimise the expected finish time.
+
+    Args:
+        shots: Total number of shots of the task.
+        per_shot_times: Estimated execution time of one shot on each node.
+        ready_times: Expected time each node becomes free.
+        min_chunk_shots: Chunks smaller than this are not worth dispatching;
+            the node with the smallest chunk is dropped and the plan recomputed.
+        max_chunks: Upper bound on the number of chunks.
+
+    Returns:
+        List of (node_index, chunk_shots), chunk_shots > 0, summing to ``shots``.
+    """
+    candidates = [i for i, t in enumerate(per_shot_times) if t is not None and t > 0]
+    if not candidates or shots <= 0:
+        return []
+
+    while True:
+        plan = _water_fill(shots, candidates, per_shot_times, ready_times)
+        too_many = max_chunks is not None and len(plan) > max_chunks
+        smallest = min(plan, key=lambda item: item[1])
+        if len(plan) > 1 and (too_many or smallest[1] < min_chunk_shots):
+            candidates = [i for i, _ in plan if i != smallest[0]]
+            continue
+        return plan
+
+
+def _water_fill(shots, candidates, per_shot_times, ready_times):
+    order = sorted(candidates, key=lambda i: ready_times[i])
+
+    # Add nodes in order of readiness while they can still help finish earlier
+    active = []
+    finish = math.inf
+    for i in order:
+        if ready_times[i] >= finish:
+            break
+        active.append(i)
+        rate = sum(1.0 / per_shot_times[j] for j in active)
+        finish = (shots + sum(ready_times[j] / per_shot_times[j] for j in active)) / rate
+
+    allocation = {i: int((finish - ready_times[i]) / per_shot_times[i]) for i in active}
+
+    # Hand out shots lost to rounding to the nodes that finish them earliest
+    leftover = shots - sum(allocation.values())
+    while leftover > 0:
+        i = min(active, key=lambda j: ready_times[j] + (allocation[j] + 1) * per_shot_times[j])
+        allocation[i] += 1
+        leftover -= 1
+
+    return [(i, n) for i, n in allocation.items() if n > 0]
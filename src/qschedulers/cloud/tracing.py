@@ -0,0 +1,179 @@
+"""
+Tracing
+-------
+Records a compact timeline of a simulation run and exports it for inspection.
+
+Events (task arrival, queue enter, start, preemption, finish) are stored with
+the node's queue length at that moment in a preallocated NumPy structured
+array that doubles in size when full, so recording stays cheap in large runs.
+
+Exports:
+    - Chrome Trace / Perfetto JSON (open in https://ui.perfetto.dev or
+      chrome://tracing): one track per node with a slice per execution, queue
+      length counters, and arrival markers.
+    - A per-node utilization time series (busy fraction and peak queue length
+      per time bin).
+"""
+
+import json
+from typing import Any
+
+EVENT_KINDS = ("arrival", "queue_enter", "start", "preempt", "finish", "steal", "reject")
+_KIND_CODE = {kind: code for code, kind in enumerate(EVENT_KINDS)}
+
+
+class TimelineRecorder:
+    def __init__(self, capacity: int = 4096):
+        import numpy as np
+
+        self._dtype = np.dtype(
+            [("time", "f8"), ("kind", "u1"), ("task", "i8"), ("node", "i4"), ("queue", "i4")]
+        )
+        self._events = np.empty(capacity, dtype=self._dtype)
+        self._size = 0
+        # Node index -> name; index -1 is used for events without a node
+        self.node_names: list[str] = []
+        self._node_index: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def record(self, time: float, kind: str, task_id: int, node: str | None = None, queue_length: int = 0):
+        if self._size == len(self._events):
+            self._grow()
+        self._events[self._size] = (time, _KIND_CODE[kind], task_id, self._index_of(node), queue_length)
+        self._size += 1
+
+    def events(self):
+        """Structured array view of the recorded events, in recording order."""
+        return self._events[: self._size]
+
+    def to_chrome_trace(self, time_scale: float = 1e6) -> dict[str, Any]:
+        """
+        Build a Chrome Trace Event document. ``time_scale`` converts simulation
+        time to trace microseconds (default: simulation time is in seconds).
+        """
+        trace = [
+            {"name": "process_name", "ph": "M", "pid": 0, "args": {"name": "cluster"}},
+            {"name": "thread_name", "ph": "M", "pid": 0, "tid": 0, "args": {"name": "arrivals"}},
+        ]
+        for index, name in enumerate(self.node_names):
+            trace.append({"name": "thread_name", "ph": "M", "pid": 0, "tid": index + 1, "args": {"name": name}})
+
+        for start, end, task, node in self._busy_intervals():
+            trace.append(
+                {
+                    "name": f"task {task}",
+                    "cat": "exec",
+                    "ph": "X",
+                    "pid": 0,
+                    "tid": node + 1,
+                    "ts": start * time_scale,
+                    "dur": (end - start) * time_scale,
+                    "args": {"task_id": task},
+                }
+            )
+
+        for event in self.events():
+            kind = EVENT_KINDS[event["kind"]]
+            ts = float(event["time"]) * time_scale
+            if kind == "arrival":
+                trace.append(
+                    {"name": f"arrival {int(event['task'])}", "ph": "i", "s": "t", "pid": 0, "tid": 0, "ts": ts}
+                )
+            elif event["node"] >= 0:
+                trace.append(
+                    {
+                        "name": f"queue {self.node_names[event['node']]}",
+                        "ph": "C",
+                        "pid": 0,
+                        "ts": ts,
+                        "args": {"length": int(event["queue"])},
+                    }
+                )
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def save_chrome_trace(self, path: str, time_scale: float = 1e6) -> str:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(time_scale), f)
+        return path
+
+    def utilization(self, bin_width: float, end: float | None = None) -> list[dict[str, Any]]:
+        """
+        Per-node busy fraction and peak queue length in consecutive time bins.
+
+        Returns:
+            Rows of {"node", "bin_start", "bin_end", "utilization", "max_queue_length"}.
+        """
+        import numpy as np
+
+        events = self.events()
+        if not len(events) or bin_width <= 0:
+            return []
+        if end is None:
+            end = float(events["time"].max())
+        num_bins = max(1, int(np.ceil(end / bin_width)))
+        edges = np.arange(num_bins + 1) * bin_width
+
+        busy = np.zeros((len(self.node_names), num_bins))
+        for start, stop, _, node in self._busy_intervals():
+            # Overlap of [start, stop) with every bin
+            overlap = np.minimum(edges[1:], stop) - np.maximum(edges[:-1], start)
+            busy[node] += np.clip(overlap, 0.0, None)
+
+        peak_queue = np.zeros((len(self.node_names), num_bins), dtype=int)
+        for node in range(len(self.node_names)):
+            node_events = events[events["node"] == node]
+            bins = np.minimum((node_events["time"] / bin_width).astype(int), num_bins - 1)
+            np.maximum.at(peak_queue[node], bins, node_events["queue"])
+            # A queue length holds until the node's next event, so carry the
+            # last recorded length into the following bins
+            last = np.searchsorted(node_events["time"], edges[:-1], side="right") - 1
+            carried = np.where(last >= 0, node_events["queue"][np.maximum(last, 0)], 0)
+            peak_queue[node] = np.maximum(peak_queue[node], carried)
+
+        rows = []
+        for index, name in enumerate(self.node_names):
+            for b in range(num_bins):
+                rows.append(
+                    {
+                        "node": name,
+                        "bin_start": float(edges[b]),
+                        "bin_end": float(edges[b + 1]),
+                        "utilization": float(busy[index, b] / bin_width),
+                        "max_queue_length": int(peak_queue[index, b]),
+                    }
+                )
+        return rows
+
+    def save_utilization(self, path: str, bin_width: float, fmt: str = "csv") -> str:
+        from src.qschedulers.evaluation.sinks import write_results
+
+        return write_results(self.utilization(bin_width), path, fmt)
+
+    def _busy_intervals(self):
+        """Yield (start, end, task, node) for every uninterrupted execution."""
+        running: dict[tuple[int, int], float] = {}
+        for event in self.events():
+            kind = EVENT_KINDS[event["kind"]]
+            key = (int(event["node"]), int(event["task"]))
+            if kind == "start":
+                running[key] = float(event["time"])
+            elif kind in ("preempt", "finish") and key in running:
+                yield running.pop(key), float(event["time"]), key[1], key[0]
+
+    def _index_of(self, node: str | None) -> int:
+        if node is None:
+            return -1
+        index = self._node_index.get(node)
+        if index is None:
+            index = self._node_index[node] = len(self.node_names)
+            self.node_names.append(node)
+        return index
+
+    def _grow(self):
+        import numpy as np
+
+        grown = np.empty(max(1, 2 * len(self._events)), dtype=self._dtype)
+        grown[: self._size] = self._events[: self._size]
+        self._events = grown
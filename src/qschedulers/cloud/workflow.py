@@ -0,0 +1,55 @@
+"""
+Workflow
+--------
+Dependency helpers for workflow tasks: tasks that declare predecessors
+(by task id) and are only released once those have finished.
+"""
+
+from typing import Any
+
+
+def topological_order(tasks: list[Any]) -> list[int]:
+    """
+    Indices of ``tasks`` ordered so that every task comes after its
+    predecessors. Predecessor ids not in ``tasks`` are ignored.
+
+    Raises:
+        ValueError: if the dependencies contain a cycle.
+    """
+    index_of = {task.id: i for i, task in enumerate(tasks)}
+    successors = {i: [] for i in range(len(tasks))}
+    indegree = [0] * len(tasks)
+    for i, task in enumerate(tasks):
+        for pred in getattr(task, "predecessors", ()):
+            if pred in index_of:
+                successors[index_of[pred]].append(i)
+                indegree[i] += 1
+
+    order = [i for i in range(len(tasks)) if indegree[i] == 0]
+    for i in order:
+        for s in successors[i]:
+            indegree[s] -= 1
+            if indegree[s] == 0:
+                order.append(s)
+    if len(order) != len(tasks):
+        cyclic = [tasks[i].id for i in range(len(tasks)) if indegree[i] > 0]
+        raise ValueError(f"Task dependencies contain a cycle among tasks {cyclic}")
+    return order
+
+
+def upward_ranks(tasks: list[Any], weights: list[float]) -> list[float]:
+    """
+    HEFT upward rank of every task: its own weight (e.g. mean estimated
+    execution time) plus the largest rank among its successors, i.e. the
+    length of the critical path from the task to the end of its workflow.
+    """
+    index_of = {task.id: i for i, task in enumerate(tasks)}
+    ranks = [0.0] * len(tasks)
+    successors = {i: [] for i in range(len(tasks))}
+    for i, task in enumerate(tasks):
+        for pred in getattr(task, "predecessors", ()):
+            if pred in index_of:
+                successors[index_of[pred]].append(i)
+    for i in reversed(topological_order(tasks)):
+        ranks[i] = weights[i] + max((ranks[s] for s in successors[i]), default=0.0)
+    return ranks
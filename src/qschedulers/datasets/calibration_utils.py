@@ -6,11 +6,15 @@ Helpers to extract error rates and gate times from Qiskit backends.
 
 from typing import Dict, Tuple, Any
 
+# Gate lengths in backend properties carry a unit; the error map uses seconds
+_TIME_UNITS = {"": 1.0, "s": 1.0, "ms": 1e-3, "us": 1e-6, "µs": 1e-6, "ns": 1e-9, "dt": None}
 
 
 def get_gate_error_map(backend: Any) -> dict[tuple[str, tuple[int, ...]], dict[str, float]]:
     """
    Build a mapping from (gate_name, qubits) to error and duration.
+   Backends without ``properties()`` (e.g. GenericBackendV2) are read from
+   their Target instead.
 
    Args:
        backend: A Qiskit backend (real, or fake like FakeHanoiV2).
@@ -22,7 +26,9 @@ def get_gate_error_map(backend: Any) -> dict[tuple[str, tuple[int, ...]], dict[s
     try:
         props = backend.properties()
         for g in props.gates:
-            name = g.name
+            # g.name is the per-instance label (e.g. "cx16_19"); g.gate is
+            # the instruction name that circuits use
+            name = getattr(g, "gate", None) or g.name
             qtuple = tuple(g.qubits)
             err = None
             length = None
@@ -32,9 +38,52 @@ def get_gate_error_map(backend: Any) -> dict[tuple[str, tuple[int, ...]], dict[s
                 if "gate_error" in pname:
                     err = pval
                 if "gate_length" in pname or "gate_time" in pname:
-                    length = pval
+                    scale = _TIME_UNITS.get(getattr(p, "unit", "") or "")
+                    length = pval * scale if scale is not None else None
             err_map[(name.lower(), qtuple)] = {"error": err, "length": length}
     except Exception as e:
         pass
 
+    if not err_map:
+        try:
+            for name, qargs_props in backend.target.items():
+                for qargs, inst_props in (qargs_props or {}).items():
+                    if qargs is None or inst_props is None or name == "measure":
+                        continue
+                    err_map[(name.lower(), tuple(qargs))] = {
+                        "error": inst_props.error,
+                        "length": inst_props.duration,
+                    }
+        except Exception as e:
+            pass
+
     return err_map
+
+
+def get_readout_error_map(backend: Any) -> dict[int, float]:
+    """
+    Build a mapping from qubit index to readout (measurement) error.
+
+    Args:
+        backend: A Qiskit backend (real, or fake like FakeHanoiV2).
+
+    Returns:
+        Dictionary of {qubit: readout_error}
+    """
+    readout_map = {}
+    try:
+        props = backend.properties()
+        for q in range(len(props.qubits)):
+            readout_map[q] = props.readout_error(q)
+    except Exception as e:
+        pass
+
+    if not readout_map:
+        try:
+            for qargs, inst_props in backend.target["measure"].items():
+                if qargs is not None and inst_props is not None and inst_props.error is not None:
+                    readout_map[qargs[0]] = inst_props.error
+        except Exception as e:
+            pass
+
+    return readout_map
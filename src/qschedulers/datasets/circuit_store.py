@@ -0,0 +1,290 @@
+"""
+Circuit Store
+-------------
+Memory-mapped task sets with random access to individual circuits.
+
+A circuit store is one file holding a workload's circuits as concatenated
+QPY blobs, an offset index and per-task metadata columns:
+
+    header    magic "QSCS", format version, task count, index offset,
+              fields offset, lookup offset, metadata offset (little endian)
+    blobs     one QPY serialisation per task
+    index     (offset, length, format) of every blob; the format is QPY, or
+              pickle for the few circuits QPY cannot load back
+    fields    (id, arrival_time, priority, shots) of every task, fixed
+              width; shots is -1 for the orchestrator's default
+    lookup    (id, position) of every task, sorted by id
+    metadata  JSON {"columns": {"predecessors": [...], "tenant": [...], ...}}
+              with the ragged columns
+
+``CircuitStore`` opens the file with ``mmap`` and views the index, fields
+and lookup tables in place, so opening reads only the header whatever the
+number of tasks. A task id is found by binary search in the lookup table.
+The JSON columns are parsed the first time a task is built. A circuit is
+deserialised only when it is asked for, by task id or position. A small
+LRU cache keeps recently used circuits. ``tasks()`` returns ``StoredTask``
+objects whose ``circuit`` attribute loads on access, so the Orchestrator
+and the schedulers use them like any other ``QuantumTask``.
+
+The file is only read, so sweep worker processes that open the same store
+share its pages through the OS page cache instead of each holding a copy.
+Pickling a store (or a ``StoredTask``) sends only its path, and the
+receiving process maps the file again.
+"""
+
+import io
+import json
+import logging
+import mmap
+import os
+import pickle
+import struct
+from collections import OrderedDict
+from typing import Any
+
+from src.qschedulers.cloud.qtask import QuantumTask
+
+logger = logging.getLogger(__name__)
+
+STORE_MAGIC = b"QSCS"
+STORE_VERSION = 3
+_PREAMBLE = struct.Struct("<4sI")
+_HEADER = struct.Struct("<4sIQQQQQ")
+_INDEX_DTYPE = [("offset", "<u8"), ("length", "<u4"), ("format", "<u4")]
+_FIELDS_DTYPE = [
+    ("id", "<i8"),
+    ("arrival_time", "<f8"),
+    ("priority", "<i8"),
+    ("shots", "<i8"),
+]
+_LOOKUP_DTYPE = [("id", "<i8"), ("position", "<u8")]
+FORMAT_QPY = 0
+FORMAT_PICKLE = 1
+# Task fields of variable size, kept as JSON columns
+METADATA_COLUMNS = (
+    "predecessors",
+    "workflow_id",
+    "tenant",
+    "region",
+)
+
+
+def write_circuit_store(tasks: list[QuantumTask], path: str) -> str:
+    """Write ``tasks`` to a circuit store file at ``path`` (replaced atomically)."""
+    import numpy as np
+
+    columns = {name: [] for name in METADATA_COLUMNS}
+    index = np.zeros(len(tasks), dtype=_INDEX_DTYPE)
+    fields = np.zeros(len(tasks), dtype=_FIELDS_DTYPE)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(b"\0" * _HEADER.size)
+            for i, task in enumerate(tasks):
+                blob, blob_format = _serialise(task.circuit)
+                index[i] = (f.tell(), len(blob), blob_format)
+                f.write(blob)
+                shots = -1 if task.shots is None else task.shots
+                fields[i] = (task.id, task.arrival_time, task.priority, shots)
+                for name in METADATA_COLUMNS:
+                    columns[name].append(getattr(task, name))
+            order = np.argsort(fields["id"], kind="stable")
+            lookup = np.zeros(len(tasks), dtype=_LOOKUP_DTYPE)
+            lookup["id"] = fields["id"][order]
+            lookup["position"] = order
+            index_offset = f.tell()
+            f.write(index.tobytes())
+            fields_offset = f.tell()
+            f.write(fields.tobytes())
+            lookup_offset = f.tell()
+            f.write(lookup.tobytes())
+            metadata_offset = f.tell()
+            f.write(json.dumps({"columns": columns}).encode())
+            f.seek(0)
+            f.write(
+                _HEADER.pack(
+                    STORE_MAGIC,
+                    STORE_VERSION,
+                    len(tasks),
+                    index_offset,
+                    fields_offset,
+                    lookup_offset,
+                    metadata_offset,
+                )
+            )
+        os.replace(tmp_path, path)
+    except BaseException:
+        # Leave no partial file behind
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    logger.info(f"Wrote {len(tasks)} tasks to circuit store {path}")
+    return path
+
+
+def _serialise(circuit: Any) -> tuple[bytes, int]:
+    from qiskit import qpy
+
+    buf = io.BytesIO()
+    try:
+        qpy.dump(circuit, buf)
+        # Some library gates (e.g. MultiplierGate) are written but cannot be read back
+        qpy.load(io.BytesIO(buf.getvalue()))
+        return buf.getvalue(), FORMAT_QPY
+    except Exception as e:
+        logger.debug(f"Storing circuit {circuit.name} as pickle, QPY round trip failed: {e}")
+        return pickle.dumps(circuit, protocol=pickle.HIGHEST_PROTOCOL), FORMAT_PICKLE
+
+
+class CircuitStore:
+    """
+    Read-only, memory-mapped view of a circuit store file.
+    """
+
+    def __init__(self, path: str, cache_size: int = 256):
+        self.path = path
+        self.cache_size = cache_size
+        self._open()
+
+    def _open(self):
+        import numpy as np
+
+        self._file = open(self.path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.index = self.fields = self._lookup = None
+        self._columns: dict[str, list[Any]] | None = None
+        self._cache: OrderedDict[int, Any] = OrderedDict()
+        magic, version = _PREAMBLE.unpack_from(self._mmap, 0)
+        if magic != STORE_MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not a circuit store")
+        if version != STORE_VERSION:
+            self.close()
+            raise ValueError(
+                f"{self.path} has circuit store version {version}; this reader supports {STORE_VERSION}, "
+                "write the store again with write_circuit_store"
+            )
+        _, _, count, index_offset, fields_offset, lookup_offset, self._metadata_offset = _HEADER.unpack_from(
+            self._mmap, 0
+        )
+        # Views into the mapping, no copy
+        self.index = np.frombuffer(self._mmap, dtype=_INDEX_DTYPE, count=count, offset=index_offset)
+        self.fields = np.frombuffer(self._mmap, dtype=_FIELDS_DTYPE, count=count, offset=fields_offset)
+        self._lookup = np.frombuffer(self._mmap, dtype=_LOOKUP_DTYPE, count=count, offset=lookup_offset)
+        self.loads = 0
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __enter__(self) -> "CircuitStore":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {"path": self.path, "cache_size": self.cache_size}
+
+    def __setstate__(self, state: dict[str, Any]):
+        self.path = state["path"]
+        self.cache_size = state["cache_size"]
+        self._open()
+
+    def close(self):
+        # Drop the numpy views first, the mapping cannot close while exported
+        self.index = self.fields = self._lookup = None
+        self._cache.clear()
+        self._mmap.close()
+        self._file.close()
+
+    @property
+    def columns(self) -> dict[str, list[Any]]:
+        """The JSON metadata columns, parsed on first use."""
+        if self._columns is None:
+            self._columns = json.loads(self._mmap[self._metadata_offset :].decode())["columns"]
+        return self._columns
+
+    def position(self, task_id: int) -> int:
+        import numpy as np
+
+        ids = self._lookup["id"]
+        i = int(np.searchsorted(ids, task_id))
+        if i == len(ids) or ids[i] != task_id:
+            raise KeyError(f"Task {task_id} is not in circuit store {self.path}")
+        return int(self._lookup["position"][i])
+
+    def circuit(self, task_id: int) -> Any:
+        """The circuit of task ``task_id``, deserialised on first use."""
+        return self.circuit_at(self.position(task_id))
+
+    def circuit_at(self, position: int) -> Any:
+        circuit = self._cache.get(position)
+        if circuit is not None:
+            self._cache.move_to_end(position)
+            return circuit
+        from qiskit import qpy
+
+        offset, length, blob_format = (int(v) for v in self.index[position])
+        with memoryview(self._mmap)[offset : offset + length] as blob:
+            circuit = pickle.loads(blob) if blob_format == FORMAT_PICKLE else qpy.load(io.BytesIO(blob))[0]
+        self.loads += 1
+        self._cache[position] = circuit
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return circuit
+
+    def task(self, position: int) -> "StoredTask":
+        c = self.columns
+        task_id, arrival_time, priority, shots = self.fields[position].tolist()
+        return StoredTask(
+            id=task_id,
+            circuit=None,
+            arrival_time=arrival_time,
+            priority=priority,
+            shots=None if shots < 0 else shots,
+            predecessors=list(c["predecessors"][position] or []),
+            workflow_id=c["workflow_id"][position],
+            tenant=c["tenant"][position],
+            region=c["region"][position],
+            store=self,
+            position=position,
+        )
+
+    def tasks(self) -> list["StoredTask"]:
+        """Every task of the store, with circuits loaded on access."""
+        return [self.task(i) for i in range(len(self))]
+
+
+class StoredTask(QuantumTask):
+    """
+    QuantumTask whose circuit is read from a CircuitStore when accessed.
+
+    Setting ``circuit`` (as ``dataclasses.replace`` does) pins that circuit
+    on the task instead.
+    """
+
+    def __init__(self, *args: Any, store: CircuitStore | None = None, position: int | None = None, **kwargs: Any):
+        self._store = store
+        self._position = position
+        super().__init__(*args, **kwargs)
+
+    @property
+    def cache_key(self) -> tuple[str, int] | None:
+        """
+        (store path, position) identifying the task's circuit while it is
+        read from the store, so caches need not keep the circuit alive; None
+        once a circuit is pinned on the task.
+        """
+        if self._circuit is None and self._store is not None:
+            return (self._store.path, self._position)
+        return None
+
+    @property
+    def circuit(self) -> Any:
+        if self._circuit is None and self._store is not None:
+            return self._store.circuit_at(self._position)
+        return self._circuit
+
+    @circuit.setter
+    def circuit(self, value: Any):
+        self._circuit = value
@@ -0,0 +1,224 @@
+"""
+Layout Index
+------------
+Precomputed, calibration-ranked qubit subgraphs used to seed ``initial_layout``.
+
+For every width ``k`` the index keeps a few connected sets of ``k`` physical
+qubits with the lowest aggregate error (readout + single-qubit error of each
+qubit, plus the two-qubit error of the coupler used to reach it). The index is
+built once per backend from calibration data (the backend registry keeps one
+per backend) and then reused by every transpilation against that backend, which skips the expensive layout search of
+level-3 transpilation and makes the chosen qubits deterministic across runs.
+Within a chosen subgraph the circuit is placed with a small VF2 search, so
+circuits whose interaction graph embeds into the subgraph need no routing.
+"""
+
+import heapq
+from typing import Any
+
+from src.qschedulers.datasets.calibration_utils import (
+    get_gate_error_map,
+    get_readout_error_map,
+)
+
+DEFAULT_QUBIT_ERROR = 1e-3
+DEFAULT_EDGE_ERROR = 1e-2
+SINGLE_QUBIT_REFERENCE_GATES = ("sx", "x")
+
+
+class LayoutIndex:
+    """
+    Ranked connected qubit subsets of a backend, grouped by width.
+    """
+
+    def __init__(
+        self,
+        num_qubits: int,
+        candidates: dict[int, list[tuple[float, list[int]]]],
+        adjacency: dict[int, dict[int, float]],
+    ):
+        self.num_qubits = num_qubits
+        self.candidates = candidates
+        self.adjacency = adjacency
+
+    @classmethod
+    def from_backend(cls, backend: Any, max_candidates: int = 8) -> "LayoutIndex":
+        """
+        Build the index from a backend's calibration data.
+
+        Args:
+            backend: A Qiskit backend (real, or fake like FakeHanoiV2).
+            max_candidates: Number of subgraphs kept per width.
+
+        Returns:
+            A LayoutIndex covering widths 1..num_qubits of the backend.
+        """
+        return cls.from_calibration(
+            get_gate_error_map(backend),
+            get_readout_error_map(backend),
+            getattr(backend, "num_qubits", None),
+            max_candidates=max_candidates,
+        )
+
+    @classmethod
+    def from_calibration(
+        cls,
+        err_map: dict,
+        readout_map: dict[int, float],
+        num_qubits: int | None = None,
+        max_candidates: int = 8,
+    ) -> "LayoutIndex":
+        """
+        Build the index from already extracted calibration tables (see
+        ``get_gate_error_map`` and ``get_readout_error_map``).
+        """
+        qubit_cost, adjacency = _calibration_graph(err_map, readout_map)
+
+        candidates: dict[int, list[tuple[float, list[int]]]] = {}
+        seen: dict[int, set[frozenset]] = {}
+        for seed in adjacency:
+            for width, score, layout in _grow_from(seed, qubit_cost, adjacency):
+                _keep_best(candidates, seen, width, score, layout, max_candidates)
+
+        return cls(num_qubits or len(qubit_cost), candidates, adjacency)
+
+    def layouts(self, width: int) -> list[tuple[float, list[int]]]:
+        """Return the ranked (score, layout) candidates for a circuit width."""
+        return self.candidates.get(width, [])
+
+    def best_layout(self, width: int) -> list[int] | None:
+        """
+        Return the best physical qubits for a circuit of ``width`` qubits.
+
+        The returned list maps virtual qubit ``i`` to physical qubit
+        ``layout[i]``. ``None`` is returned when no connected subgraph of that
+        width is known (e.g. the circuit is wider than the device).
+        """
+        ranked = self.layouts(width)
+        if not ranked:
+            return None
+        return list(ranked[0][1])
+
+    def layout_for(self, circuit: Any, call_limit: int = 10_000) -> list[int] | None:
+        """
+        Return an ``initial_layout`` for a specific circuit.
+
+        The ranked subgraphs of the circuit's width are tried in order and the
+        first one the circuit's interaction graph embeds into is used with
+        that embedding. ``None`` is returned when no candidate fits, leaving
+        layout and routing to the transpiler.
+        """
+        from qiskit.converters import circuit_to_dag
+
+        ranked = self.layouts(circuit.num_qubits)
+        if not ranked:
+            return None
+        dag = circuit_to_dag(circuit)
+        for _, qubits in ranked:
+            layout = self._embed(dag, circuit, qubits, call_limit)
+            if layout is not None:
+                return layout
+        return None
+
+    def _embed(self, dag: Any, circuit: Any, qubits: list[int], call_limit: int) -> list[int] | None:
+        from qiskit.transpiler import CouplingMap
+        from qiskit.transpiler.passes import VF2Layout
+
+        position = {q: i for i, q in enumerate(qubits)}
+        edges = [
+            (position[u], position[v])
+            for u in qubits
+            for v in self.adjacency.get(u, {})
+            if v in position
+        ]
+        if not edges:
+            return None
+        vf2 = VF2Layout(coupling_map=CouplingMap(edges), seed=0, call_limit=call_limit)
+        try:
+            vf2.run(dag)
+        except Exception:
+            return None
+        layout = vf2.property_set["layout"]
+        if layout is None:
+            return None
+        return [qubits[layout[bit]] for bit in circuit.qubits]
+
+
+def _calibration_graph(err_map: dict, readout_map: dict[int, float]):
+    """Derive per-qubit costs and an undirected, error-weighted coupling graph."""
+    qubit_cost: dict[int, float] = {}
+    adjacency: dict[int, dict[int, float]] = {}
+
+    for (name, qubits), values in err_map.items():
+        err = values.get("error")
+        if len(qubits) == 1 and name in SINGLE_QUBIT_REFERENCE_GATES:
+            q = qubits[0]
+            qubit_cost[q] = max(qubit_cost.get(q, 0.0), err if err is not None else DEFAULT_QUBIT_ERROR)
+        elif len(qubits) == 2:
+            a, b = qubits
+            err = err if err is not None else DEFAULT_EDGE_ERROR
+            for u, v in ((a, b), (b, a)):
+                neighbours = adjacency.setdefault(u, {})
+                neighbours[v] = min(neighbours.get(v, err), err)
+
+    for q in set(qubit_cost) | set(adjacency) | set(readout_map):
+        qubit_cost[q] = qubit_cost.get(q, DEFAULT_QUBIT_ERROR) + readout_map.get(q, DEFAULT_QUBIT_ERROR)
+        adjacency.setdefault(q, {})
+
+    return qubit_cost, adjacency
+
+
+def _grow_from(seed: int, qubit_cost: dict[int, float], adjacency: dict[int, dict[int, float]]):
+    """
+    Greedily grow a connected subgraph from ``seed``. The walk prefers the
+    cheapest unvisited neighbour of the qubit added last, so consecutive
+    virtual qubits land on coupled physical qubits (chain-like circuits need
+    no routing), and falls back to the cheapest qubit on the whole frontier
+    at dead ends. Every prefix of the growth order is itself a connected
+    subgraph, so one pass yields a candidate for every width.
+    """
+    layout = [seed]
+    visited = {seed}
+    score = qubit_cost[seed]
+    yield 1, score, layout
+
+    frontier = []
+    last = seed
+    while True:
+        step = [
+            (edge_err + qubit_cost[nbr], nbr)
+            for nbr, edge_err in adjacency[last].items()
+            if nbr not in visited
+        ]
+        for item in step:
+            heapq.heappush(frontier, item)
+        if step:
+            cost, q = min(step)
+        else:
+            while frontier and frontier[0][1] in visited:
+                heapq.heappop(frontier)
+            if not frontier:
+                return
+            cost, q = heapq.heappop(frontier)
+        visited.add(q)
+        layout.append(q)
+        score += cost
+        last = q
+        yield len(layout), score, layout
+
+
+def _keep_best(candidates, seen, width, score, layout, max_candidates):
+    """Insert a candidate into the per-width top list, skipping duplicate qubit sets."""
+    ranked = candidates.setdefault(width, [])
+    if len(ranked) >= max_candidates and score >= ranked[-1][0]:
+        return
+    qubit_set = frozenset(layout)
+    width_seen = seen.setdefault(width, set())
+    if qubit_set in width_seen:
+        return
+    width_seen.add(qubit_set)
+    ranked.append((score, list(layout)))
+    ranked.sort(key=lambda item: item[0])
+    if len(ranked) > max_candidates:
+        _, dropped = ranked.pop()
+        width_seen.discard(frozenset(dropped))
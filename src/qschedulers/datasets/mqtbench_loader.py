@@ -2,10 +2,68 @@
 MQTBench Loader
 ---------------
 Utility functions to fetch benchmark quantum circuits from MQTBench.
+
+Generated circuits can be cached on disk as QPY files (``set_benchmark_cache_dir``
+or the ``QSCHED_BENCHMARK_CACHE`` environment variable), so regenerating large
+arithmetic benchmarks is paid once per machine rather than once per run.
 """
 
+import logging
+import os
 from typing import Any
-from mqt.bench import get_benchmark, BenchmarkLevel
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_CACHE_ENV_VAR = "QSCHED_BENCHMARK_CACHE"
+
+_benchmark_cache_dir = os.environ.get(BENCHMARK_CACHE_ENV_VAR)
+
+
+def set_benchmark_cache_dir(cache_dir: str | None):
+    """Set (or disable with None) the on-disk cache used by ``get_benchmark_circuit``."""
+    global _benchmark_cache_dir
+    _benchmark_cache_dir = cache_dir
+
+
+def get_benchmark_circuit(name: str, circuit_size: int, level: str = "ALG") -> Any:
+    """
+    Return an MQTBench circuit, served from the benchmark cache when enabled.
+
+    A fresh circuit object is returned on every call, so callers may modify it.
+
+    Args:
+        name: Benchmark name (e.g. "qft", "ghz").
+        circuit_size: Number of qubits.
+        level: Name of a ``mqt.bench.BenchmarkLevel`` member.
+
+    Returns:
+        A Qiskit QuantumCircuit.
+    """
+    from mqt.bench import get_benchmark, BenchmarkLevel
+
+    path = None
+    if _benchmark_cache_dir:
+        path = os.path.join(_benchmark_cache_dir, f"{name}_{level.lower()}_{circuit_size}.qpy")
+        if os.path.exists(path):
+            from qiskit import qpy
+
+            try:
+                with open(path, "rb") as f:
+                    return qpy.load(f)[0]
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable benchmark cache entry {path}: {e}")
+
+    circuit = get_benchmark(name, level=BenchmarkLevel[level], circuit_size=circuit_size)
+
+    if path:
+        from qiskit import qpy
+
+        os.makedirs(_benchmark_cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            qpy.dump(circuit, f)
+        os.replace(tmp_path, path)
+    return circuit
 
 
 def load_mqtbench_circuits(benchmarks: list[dict[str, Any]]) -> list[Any]:
@@ -31,7 +89,7 @@ def load_mqtbench_circuits(benchmarks: list[dict[str, Any]]) -> list[Any]:
         name = b["name"]
         nq = b["qubits"]
         try:
-            qc = get_benchmark(benchmark=name, level=BenchmarkLevel.ALG, circuit_size=nq)
+            qc = get_benchmark_circuit(name, nq)
             circuits.append(qc)
         except Exception as e:
             print(f"[WARN] Failed to load {name}-{nq}: {e}")
@@ -0,0 +1,91 @@
+"""
+Task Specs
+----------
+Build QuantumTask objects from plain task descriptions and task trace files.
+
+A task spec is the dict format used in ``src/examples/example_config.json``:
+
+    {
+        "id": 0,
+        "circuit": {"name": "ghz", "level": "ALG", "circuit_size": 5},
+        "arrival_time": 0,
+        "priority": 0,
+        "shots": 1024,
+        "predecessors": [],
+        "workflow_id": null,
+        "tenant": "team-a"
+    }
+
+``predecessors`` and ``workflow_id`` are optional and describe workflow tasks;
+``tenant`` and ``region`` (submission region of a federated run) are optional.
+
+Traces are JSON-lines files with one spec per line, or CSV files with the
+columns ``id, name, circuit_size, level, arrival_time, priority, shots`` and
+optionally ``predecessors`` (space-separated task ids), ``workflow_id``,
+``tenant`` and ``region``.
+"""
+
+import csv
+import json
+from typing import Any
+
+from src.qschedulers.cloud.qtask import QuantumTask
+from src.qschedulers.datasets.mqtbench_loader import get_benchmark_circuit
+
+
+def task_from_spec(spec: dict[str, Any], default_id: int = 0) -> QuantumTask:
+    circuit_spec = spec["circuit"]
+    circuit = get_benchmark_circuit(
+        circuit_spec["name"],
+        int(circuit_spec["circuit_size"]),
+        level=circuit_spec.get("level", "ALG"),
+    )
+    return QuantumTask(
+        id=int(spec.get("id", default_id)),
+        circuit=circuit,
+        arrival_time=float(spec.get("arrival_time", 0.0)),
+        priority=int(spec.get("priority", 0)),
+        shots=int(spec["shots"]) if spec.get("shots") is not None else None,
+        predecessors=[int(p) for p in spec.get("predecessors") or []],
+        workflow_id=int(spec["workflow_id"]) if spec.get("workflow_id") is not None else None,
+        tenant=str(spec["tenant"]) if spec.get("tenant") is not None else None,
+        region=str(spec["region"]) if spec.get("region") is not None else None,
+    )
+
+
+def tasks_from_specs(specs: list[dict[str, Any]]) -> list[QuantumTask]:
+    return [task_from_spec(spec, default_id=i) for i, spec in enumerate(specs)]
+
+
+def load_task_trace(path: str) -> list[QuantumTask]:
+    """
+    Load a task trace (``.jsonl``/``.json`` or ``.csv``) into QuantumTasks.
+    """
+    specs = []
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                specs.append(
+                    {
+                        "id": row["id"],
+                        "circuit": {
+                            "name": row["name"],
+                            "circuit_size": row["circuit_size"],
+                            "level": row.get("level") or "ALG",
+                        },
+                        "arrival_time": row.get("arrival_time") or 0.0,
+                        "priority": row.get("priority") or 0,
+                        "shots": row.get("shots") or None,
+                        "predecessors": (row.get("predecessors") or "").split(),
+                        "workflow_id": row.get("workflow_id") or None,
+                        "tenant": row.get("tenant") or None,
+                        "region": row.get("region") or None,
+                    }
+                )
+    else:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    specs.append(json.loads(line))
+    return tasks_from_specs(specs)
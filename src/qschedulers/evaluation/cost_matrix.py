@@ -0,0 +1,58 @@
+"""
+Cost Matrix
+-----------
+Precomputed task x node estimates for schedulers that search over many
+assignments.
+
+Every task is transpiled for every node once (through the shared transpile
+cache) and its fidelity and execution time estimated. Search-based
+schedulers then score candidate assignments with array lookups instead of
+re-estimating.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Any
+
+from src.qschedulers.cloud.backends import node_calibration
+from src.qschedulers.evaluation.metrics import estimate_fidelity_and_time
+from src.qschedulers.utils.transpilation import transpile_for_backend
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CostMatrix:
+    # (tasks, nodes) estimated execution time; inf where the task cannot run
+    exec_time: Any
+    # (tasks, nodes) estimated fidelity; 0 where the task cannot run
+    fidelity: Any
+    # (tasks, nodes) bool, True where the estimate succeeded
+    feasible: Any
+
+
+def build_cost_matrix(tasks: list[Any], qnodes: list[Any], shots: int = 1024) -> CostMatrix:
+    """
+    Estimate every task on every node. A task's own ``shots`` take precedence
+    over ``shots``.
+    """
+    import numpy as np
+
+    exec_time = np.full((len(tasks), len(qnodes)), np.inf)
+    fidelity = np.zeros((len(tasks), len(qnodes)))
+    for j, qnode in enumerate(qnodes):
+        backend = qnode.backend
+        err_map = node_calibration(qnode).err_map
+        for i, task in enumerate(tasks):
+            if task.circuit.num_qubits > backend.num_qubits:
+                continue
+            task_shots = getattr(task, "shots", None) or shots
+            try:
+                tqc = transpile_for_backend(task.circuit, backend)
+                fid, exec_t, _ = estimate_fidelity_and_time(tqc, backend, err_map, shots=task_shots)
+            except Exception as e:
+                logger.debug(f"Task {i} cannot run on {getattr(qnode, 'name', qnode)}: {e}")
+                continue
+            exec_time[i, j] = exec_t
+            fidelity[i, j] = fid
+    return CostMatrix(exec_time=exec_time, fidelity=fidelity, feasible=np.isfinite(exec_time))
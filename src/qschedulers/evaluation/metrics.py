@@ -6,11 +6,8 @@ Functions to estimate fidelity, execution time, and swaps for transpiled circuit
 
 from typing import Any, Tuple
 import logging
-from src.logger_config import setup_logger
-from qiskit.converters import circuit_to_dag
-from qiskit.dagcircuit import DAGOpNode
 
-logger = setup_logger()
+logger = logging.getLogger(__name__)
 
 
 def estimate_fidelity_and_time(
@@ -19,6 +16,9 @@ def estimate_fidelity_and_time(
     """
     Estimate fidelity and execution time for a transpiled circuit.
     """
+    from qiskit.converters import circuit_to_dag
+    from qiskit.dagcircuit import DAGOpNode
+
     logger.debug(
         f"Estimating fidelity and time for circuit on backend {getattr(backend, 'name', backend)} with {shots} shots."
     )
@@ -83,3 +83,114 @@ def _lookup_length(err_map: dict, opname: str, qargs: tuple):
     if key in err_map and err_map[key].get("length") is not None:
         return err_map[key]["length"]
     return None
+
+
+def latency_by_priority(results: list[dict]) -> dict[int, dict[str, float]]:
+    """
+    Summarise waiting and turnaround time per priority class.
+
+    Args:
+        results: Orchestrator result rows (failed tasks are ignored).
+
+    Returns:
+        {priority: {"count", "mean/p95/max_waiting_time", "mean/p95/max_turnaround_time", "preemptions"}}
+    """
+    groups: dict[int, list[dict]] = {}
+    for r in results:
+        if r.get("status") == "success":
+            groups.setdefault(r.get("priority", 0), []).append(r)
+
+    stats = {}
+    for priority in sorted(groups):
+        rows = groups[priority]
+        entry = {"count": len(rows), "preemptions": sum(r.get("preemptions", 0) for r in rows)}
+        for metric in ("waiting_time", "turnaround_time"):
+            values = sorted(r[metric] for r in rows)
+            entry[f"mean_{metric}"] = sum(values) / len(values)
+            entry[f"p95_{metric}"] = percentile(values, 0.95)
+            entry[f"max_{metric}"] = values[-1]
+        stats[priority] = entry
+    return stats
+
+
+def latency_by_tenant(results: list[dict], weights: dict[str, float] | None = None) -> dict[Any, dict[str, float]]:
+    """
+    Summarise every tenant's latency, throughput and share of device time.
+
+    Args:
+        results: Orchestrator result rows.
+        weights: Fair-share weights per tenant (default 1); each tenant's
+            ``entitled_share`` is its weight over the weights of all tenants.
+
+    Returns:
+        {tenant: {"count", "failed", "mean/p95/max_waiting_time",
+        "mean/p95/max_turnaround_time", "throughput", "service_share",
+        "entitled_share"}}, where throughput is completed tasks per unit of
+        simulated time between the tenant's first arrival and last finish.
+    """
+    weights = weights or {}
+    groups: dict[Any, list[dict]] = {}
+    for r in results:
+        groups.setdefault(r.get("tenant"), []).append(r)
+
+    service = {
+        tenant: sum(r["exec_time_est"] for r in rows if r.get("status") == "success")
+        for tenant, rows in groups.items()
+    }
+    total_service = sum(service.values())
+    total_weight = sum(weights.get(tenant, 1.0) for tenant in groups)
+
+    stats = {}
+    for tenant in sorted(groups, key=str):
+        rows = groups[tenant]
+        ok = [r for r in rows if r.get("status") == "success"]
+        entry = {"count": len(ok), "failed": len(rows) - len(ok)}
+        for metric in ("waiting_time", "turnaround_time"):
+            values = sorted(r[metric] for r in ok)
+            entry[f"mean_{metric}"] = sum(values) / len(values) if values else float("nan")
+            entry[f"p95_{metric}"] = percentile(values, 0.95)
+            entry[f"max_{metric}"] = values[-1] if values else float("nan")
+        span = max((r["finish_time"] for r in ok), default=0.0) - min((r["arrival_time"] for r in rows), default=0.0)
+        entry["throughput"] = len(ok) / span if span > 0 else float("nan")
+        entry["service_share"] = service[tenant] / total_service if total_service > 0 else float("nan")
+        entry["entitled_share"] = weights.get(tenant, 1.0) / total_weight
+        stats[tenant] = entry
+    return stats
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return float("nan")
+    pos = q * (len(sorted_values) - 1)
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def workflow_makespans(results: list[dict]) -> dict[Any, dict[str, float]]:
+    """
+    End-to-end latency of every workflow: from the release of its first task
+    to the finish of its last one.
+
+    Returns:
+        {workflow_id: {"tasks", "failed", "start_time", "finish_time", "makespan"}}
+    """
+    groups: dict[Any, list[dict]] = {}
+    for r in results:
+        if r.get("workflow_id") is not None:
+            groups.setdefault(r["workflow_id"], []).append(r)
+
+    stats = {}
+    for workflow_id, rows in groups.items():
+        ran = [r for r in rows if r["finish_time"] >= 0]
+        start = min((r["arrival_time"] for r in rows), default=float("nan"))
+        finish = max((r["finish_time"] for r in ran), default=float("nan"))
+        stats[workflow_id] = {
+            "tasks": len(rows),
+            "failed": sum(1 for r in rows if r.get("status") != "success"),
+            "start_time": start,
+            "finish_time": finish,
+            "makespan": finish - start,
+        }
+    return stats
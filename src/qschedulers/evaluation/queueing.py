@@ -0,0 +1,370 @@
+"""
+Queueing
+--------
+Analytic what-if predictions of node utilization and waiting times.
+
+A full orchestrated simulation is needed to evaluate a scheduler exactly,
+but a configuration can be screened in milliseconds from the cost matrix.
+Tasks arrive in a Poisson stream of rate ``lam``, and each arrival is a
+task drawn uniformly from the workload mix. The assignment policy turns
+this into a routing matrix: ``routing[i, j]`` is the probability that
+task ``i`` is sent to node ``j``. Every node is then a single-server FIFO
+queue, with arrival rate ``lam_j = lam * mean_i(routing[i, j])``. Its
+service times are the ``exec_time`` entries of the tasks routed to it.
+
+The mean wait is the Allen-Cunneen approximation
+
+    W_q = (c_a^2 + c_s^2) / 2 * rho / (1 - rho) * E[S]
+
+with the Kraemer/Langenbach-Belz correction factor for ``c_a^2 != 1``. For
+Poisson arrivals (``c_a^2 = 1``) it is the exact Pollaczek-Khinchine formula
+``lam E[S^2] / (2 (1 - rho))``. Round robin sends every n-th arrival to a
+node, so its arrivals are Erlang-n with ``c_a^2 = 1 / n``. A task waits
+at all with probability ``rho``, and a positive wait is taken as
+exponential with mean ``W_q / rho``. This gives closed-form percentiles.
+Nodes with ``rho >= 1`` are unstable and their waits are infinite.
+
+``compare_with_simulation`` puts a prediction next to the Orchestrator
+result rows of the same workload, and ``screen`` ranks many (policy, rate)
+configurations by predicted mean wait. ``simulation_report`` does both for a
+finished run, predicting it from its own assignments; ``qsched`` writes it
+next to a cell's results when the config has a "screen" section.
+"""
+
+import math
+from typing import Any
+
+from src.qschedulers.evaluation.cost_matrix import CostMatrix
+from src.qschedulers.evaluation.metrics import percentile
+from src.qschedulers.evaluation.streaming import QUANTILES
+
+POLICIES = ("round_robin", "random", "fastest", "fidelity")
+
+
+def routing_matrix(costs: CostMatrix, policy: str | list[int]) -> tuple[Any, list[float]]:
+    """
+    Routing probabilities of ``policy`` and the squared coefficient of
+    variation of every node's inter-arrival times.
+
+    Args:
+        costs: Cost matrix of the workload mix.
+        policy: "round_robin" (rotate over all nodes, as RoundRobinScheduler
+            does, including nodes a task does not fit on), "random" (uniform
+            over the feasible nodes), "fastest" (shortest execution time),
+            "fidelity" (best fidelity per unit of time, as FANScheduler), or
+            an explicit node index per task in arrival order, e.g. taken
+            from a scheduler's assignments (-1 for unassigned). Explicit
+            assignments give the most faithful comparison with a simulation
+            of the same tasks.
+
+    Returns:
+        (routing, c_a^2): a (tasks, nodes) array and one value per node.
+    """
+    import numpy as np
+
+    n_tasks, n_nodes = costs.exec_time.shape
+    routing = np.zeros((n_tasks, n_nodes))
+    arrival_scv = [1.0] * n_nodes
+    if not isinstance(policy, str):
+        if len(policy) != n_tasks:
+            raise ValueError(f"Assignment has {len(policy)} entries for {n_tasks} tasks")
+        for i, j in enumerate(policy):
+            if j is not None and j >= 0:
+                routing[i, j] = 1.0
+        arrival_scv = [_gap_scv(np.flatnonzero(routing[:, j])) for j in range(n_nodes)]
+    elif policy == "round_robin":
+        routing[:] = 1.0 / n_nodes
+        arrival_scv = [1.0 / n_nodes] * n_nodes
+    elif policy == "random":
+        counts = costs.feasible.sum(axis=1, keepdims=True)
+        routing = np.divide(costs.feasible, counts, out=routing, where=counts > 0)
+    elif policy in ("fastest", "fidelity"):
+        score = -costs.exec_time if policy == "fastest" else costs.fidelity / (costs.exec_time + 1e-9)
+        score = np.where(costs.feasible, score, -np.inf)
+        for i in range(n_tasks):
+            if costs.feasible[i].any():
+                routing[i, int(np.argmax(score[i]))] = 1.0
+    else:
+        raise ValueError(f"Unknown policy {policy!r}; choose from {POLICIES} or pass an assignment")
+    # Tasks routed to a node they cannot run on fail and leave no work behind
+    return np.where(costs.feasible, routing, 0.0), arrival_scv
+
+
+def _gap_scv(indices: Any) -> float:
+    """
+    c_a^2 of a node that receives the tasks at ``indices`` of a Poisson
+    stream in task order: an inter-arrival time is the sum of k exponential
+    gaps, with k the index gap, so c_a^2 = (E[k] + Var[k]) / E[k]^2 (1/n for
+    every n-th task, 1 for random thinning).
+    """
+    if len(indices) < 3:
+        return 1.0
+    gaps = indices[1:] - indices[:-1]
+    mean = float(gaps.mean())
+    return (mean + float(gaps.var())) / mean**2
+
+
+def predict(
+    costs: CostMatrix,
+    lam: float,
+    policy: str | list[int] = "round_robin",
+    node_names: list[str] | None = None,
+) -> dict[str, Any]:
+    """
+    Predict every node's utilization and waiting times under Poisson
+    arrivals of rate ``lam``.
+
+    Returns:
+        {"nodes": [{"node", "arrival_rate", "utilization", "mean_service",
+        "mean_wait", "p50/p95/p99_wait", "stable"}], "mean_wait",
+        "p50/p95/p99_wait", "max_utilization", "stable", "failed_fraction"}, where
+        the overall figures are weighted by each node's share of the arrivals.
+    """
+    import numpy as np
+
+    routing, arrival_scv = routing_matrix(costs, policy)
+    n_tasks, n_nodes = routing.shape
+    names = node_names or [str(j) for j in range(n_nodes)]
+    service = np.where(costs.feasible, costs.exec_time, 0.0)
+
+    nodes = []
+    for j in range(n_nodes):
+        share = float(routing[:, j].sum()) / n_tasks if n_tasks else 0.0
+        rate = lam * share
+        entry = {"node": names[j], "arrival_rate": rate}
+        if share > 0:
+            weights = routing[:, j] / routing[:, j].sum()
+            mean_service = float(weights @ service[:, j])
+            second_moment = float(weights @ service[:, j] ** 2)
+        else:
+            mean_service = second_moment = 0.0
+        rho = rate * mean_service
+        entry["utilization"] = rho
+        entry["mean_service"] = mean_service
+        entry["stable"] = rho < 1.0
+        if rho <= 0:
+            mean_wait = 0.0
+        elif rho >= 1.0:
+            mean_wait = math.inf
+        else:
+            service_scv = second_moment / mean_service**2 - 1.0
+            mean_wait = (
+                (arrival_scv[j] + service_scv) / 2.0 * rho / (1.0 - rho) * mean_service
+                * _klb_correction(rho, arrival_scv[j], service_scv)
+            )
+        entry["mean_wait"] = mean_wait
+        for q in QUANTILES:
+            entry[f"p{round(q * 100)}_wait"] = _wait_quantile(q, rho, mean_wait)
+        nodes.append(entry)
+
+    served = sum(n["arrival_rate"] for n in nodes)
+    prediction = {
+        "policy": policy if isinstance(policy, str) else "assignment",
+        "arrival_rate": lam,
+        "nodes": nodes,
+        "max_utilization": max((n["utilization"] for n in nodes), default=0.0),
+        "stable": all(n["stable"] for n in nodes),
+        "failed_fraction": max(0.0, 1.0 - served / lam) if lam > 0 else 0.0,
+        "mean_wait": (
+            sum(n["arrival_rate"] * n["mean_wait"] for n in nodes if n["arrival_rate"] > 0) / served
+            if served > 0
+            else 0.0
+        ),
+    }
+    for q in QUANTILES:
+        prediction[f"p{round(q * 100)}_wait"] = _mixture_quantile(q, nodes, served)
+    return prediction
+
+
+def _klb_correction(rho: float, arrival_scv: float, service_scv: float) -> float:
+    """Kraemer/Langenbach-Belz factor for non-Poisson arrivals (1 for c_a^2 = 1)."""
+    total = arrival_scv + service_scv
+    if total <= 0:
+        return 1.0
+    if arrival_scv < 1.0:
+        return math.exp(-2.0 * (1.0 - rho) * (1.0 - arrival_scv) ** 2 / (3.0 * rho * total))
+    return math.exp(-(1.0 - rho) * (arrival_scv - 1.0) / (arrival_scv + 4.0 * service_scv))
+
+
+def _wait_quantile(q: float, rho: float, mean_wait: float) -> float:
+    if rho >= 1.0:
+        return math.inf
+    if rho <= 0 or q <= 1.0 - rho:
+        return 0.0
+    return mean_wait / rho * math.log(rho / (1.0 - q))
+
+
+def _mixture_quantile(q: float, nodes: list[dict[str, Any]], served: float) -> float:
+    """Quantile of the wait of a random served task, by bisection on the mixture CDF."""
+    active = [n for n in nodes if n["arrival_rate"] > 0]
+    if not active:
+        return 0.0
+    if any(not n["stable"] for n in active):
+        return math.inf
+
+    def exceeds(t: float) -> float:
+        # P(W > t) over all served tasks
+        return sum(
+            n["arrival_rate"] / served * n["utilization"] * math.exp(-t * n["utilization"] / n["mean_wait"])
+            for n in active
+            if n["mean_wait"] > 0
+        )
+
+    if exceeds(0.0) <= 1.0 - q:
+        return 0.0
+    lo, hi = 0.0, max(n["p99_wait"] for n in active) or 1.0
+    while exceeds(hi) > 1.0 - q:
+        hi *= 2.0
+    for _ in range(60):
+        mid = (lo + hi) / 2.0
+        if exceeds(mid) > 1.0 - q:
+            lo = mid
+        else:
+            hi = mid
+    return hi
+
+
+def compare_with_simulation(
+    prediction: dict[str, Any], results: list[dict[str, Any]], node_backends: list[str] | None = None
+) -> dict[str, Any]:
+    """
+    Measured figures of a simulation of the same workload next to the
+    prediction, matched by backend name since result rows carry no node name.
+
+    Args:
+        prediction: Output of ``predict``.
+        results: Orchestrator result rows.
+        node_backends: Backend name of each predicted node (default: the
+            predicted node names).
+
+    Returns:
+        {"nodes": [{"backend", "predicted/measured_utilization",
+        "predicted/measured_mean_wait", "predicted/measured_p95_wait"}],
+        "predicted/measured_mean_wait", "predicted/measured_p95_wait",
+        "mean_wait_error"}, where utilization is measured as estimated busy
+        time over the span from first arrival to last finish, and the error
+        is relative to the measured mean wait.
+    """
+    ok = [r for r in results if r.get("status") == "success"]
+    span = max((r["finish_time"] for r in ok), default=0.0) - min((r["arrival_time"] for r in results), default=0.0)
+    backends = node_backends or [n["node"] for n in prediction["nodes"]]
+
+    grouped: dict[str, list[dict[str, Any]]] = {}
+    for backend, node in zip(backends, prediction["nodes"]):
+        grouped.setdefault(backend, []).append(node)
+
+    nodes = []
+    for backend, predicted in grouped.items():
+        rows = [r for r in ok if r["backend"] == backend]
+        rate = sum(n["arrival_rate"] for n in predicted)
+        waits = sorted(r["waiting_time"] for r in rows)
+        nodes.append(
+            {
+                "backend": backend,
+                "predicted_utilization": sum(n["utilization"] for n in predicted) / len(predicted),
+                "measured_utilization": (
+                    sum(r["exec_time_est"] for r in rows) / (span * len(predicted)) if span > 0 else float("nan")
+                ),
+                "predicted_mean_wait": (
+                    sum(n["arrival_rate"] * n["mean_wait"] for n in predicted) / rate if rate > 0 else 0.0
+                ),
+                "measured_mean_wait": sum(waits) / len(waits) if waits else float("nan"),
+                "predicted_p95_wait": max(n["p95_wait"] for n in predicted),
+                "measured_p95_wait": percentile(waits, 0.95),
+            }
+        )
+
+    waits = sorted(r["waiting_time"] for r in ok)
+    measured = sum(waits) / len(waits) if waits else float("nan")
+    return {
+        "nodes": nodes,
+        "predicted_mean_wait": prediction["mean_wait"],
+        "measured_mean_wait": measured,
+        "predicted_p95_wait": prediction["p95_wait"],
+        "measured_p95_wait": percentile(waits, 0.95),
+        "mean_wait_error": (prediction["mean_wait"] - measured) / measured if measured > 0 else float("nan"),
+    }
+
+
+def screen(
+    costs: CostMatrix,
+    arrival_rates: list[float],
+    policies: list[str | list[int]] = POLICIES,
+    node_names: list[str] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Predict every (policy, arrival rate) configuration and rank them by
+    predicted mean wait, unstable ones last.
+
+    Returns:
+        One summary row per configuration: policy, arrival_rate,
+        max_utilization, mean_wait, p95_wait, failed_fraction, stable.
+    """
+    rows = []
+    for policy in policies:
+        for lam in arrival_rates:
+            prediction = predict(costs, lam, policy, node_names)
+            rows.append(
+                {
+                    key: prediction[key]
+                    for key in ("policy", "arrival_rate", "max_utilization", "mean_wait", "p95_wait", "failed_fraction", "stable")
+                }
+            )
+    return sorted(rows, key=lambda r: (not r["stable"], r["failed_fraction"], r["mean_wait"]))
+
+
+def simulation_report(
+    tasks: list[Any],
+    qnodes: list[Any],
+    results: list[dict[str, Any]],
+    shots: int = 1024,
+    arrival_rate: float | None = None,
+    arrival_rates: list[float] | None = None,
+    policies: list[str] = POLICIES,
+) -> dict[str, Any]:
+    """
+    Predict a simulated run from its own assignments and compare the
+    prediction with its result rows (the "screen" section of a ``qsched``
+    config).
+
+    Every task is routed to the node its result row names. Rows name a
+    backend, so a backend shared by several nodes takes turns among them.
+    ``arrival_rate`` defaults to the workload's mean rate. With
+    ``arrival_rates``, ``policies`` are also screened at those rates.
+
+    Returns:
+        {"prediction", "comparison", "screen"}; "screen" is None without
+        ``arrival_rates``.
+    """
+    from src.qschedulers.evaluation.cost_matrix import build_cost_matrix
+
+    ordered = sorted(tasks, key=lambda t: t.arrival_time)
+    if arrival_rate is None:
+        span = ordered[-1].arrival_time - ordered[0].arrival_time if ordered else 0.0
+        if span <= 0:
+            raise ValueError("Tasks arrive at once; give the screen an arrival_rate")
+        arrival_rate = (len(ordered) - 1) / span
+
+    by_backend: dict[str, list[int]] = {}
+    for j, qnode in enumerate(qnodes):
+        by_backend.setdefault(qnode.backend.name, []).append(j)
+    placed = {r["task_id"]: r["backend"] for r in results if r.get("status") == "success"}
+    turns = dict.fromkeys(by_backend, 0)
+    assignment = []
+    for task in ordered:
+        candidates = by_backend.get(placed.get(task.id), [])
+        if not candidates:
+            assignment.append(-1)
+            continue
+        backend = placed[task.id]
+        assignment.append(candidates[turns[backend] % len(candidates)])
+        turns[backend] += 1
+
+    costs = build_cost_matrix(ordered, qnodes, shots)
+    names = [qnode.name or qnode.backend.name for qnode in qnodes]
+    prediction = predict(costs, arrival_rate, assignment, names)
+    return {
+        "prediction": prediction,
+        "comparison": compare_with_simulation(prediction, results, [qnode.backend.name for qnode in qnodes]),
+        "screen": screen(costs, arrival_rates, policies, names) if arrival_rates else None,
+    }
@@ -0,0 +1,52 @@
+"""
+Result Sinks
+------------
+Writers for orchestrator result rows (list of dicts).
+"""
+
+import csv
+import json
+from typing import Any
+
+SINK_FORMATS = ("csv", "jsonl")
+
+
+def write_results(results: list[dict[str, Any]], path: str, fmt: str = "csv") -> str:
+    """
+    Write result rows to ``path`` in the given format.
+
+    Args:
+        results: Rows as returned by ``Orchestrator.get_results()``.
+        path: Output file path.
+        fmt: One of ``SINK_FORMATS``.
+
+    Returns:
+        The path written.
+    """
+    if fmt == "csv":
+        fieldnames = list(results[0].keys()) if results else []
+        with open(path, mode="w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(results)
+    elif fmt == "jsonl":
+        with open(path, mode="w", encoding="utf-8") as f:
+            for row in results:
+                f.write(json.dumps(row, default=str) + "\n")
+    else:
+        raise ValueError(f"Unknown result sink format: {fmt}")
+    return path
+
+
+def read_results(path: str, fmt: str = "jsonl") -> list[dict[str, Any]]:
+    """
+    Read result rows written by ``write_results``. CSV values come back as
+    strings; use ``jsonl`` where rows must round-trip with their types.
+    """
+    if fmt == "csv":
+        with open(path, newline="", encoding="utf-8") as f:
+            return list(csv.DictReader(f))
+    if fmt == "jsonl":
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    raise ValueError(f"Unknown result sink format: {fmt}")
@@ -0,0 +1,179 @@
+"""
+Streaming Metrics
+-----------------
+Constant-memory, mergeable latency percentiles.
+
+``QuantileSketch`` is a log-bucketed histogram in the style of DDSketch: a
+value ``x`` goes to bucket ``ceil(log_gamma(x))`` with
+``gamma = (1 + a) / (1 - a)``, so every reported quantile is within relative
+error ``a`` of the exact one. Memory grows with the logarithm of the value
+range, not with the number of samples, and two sketches with the same
+accuracy merge by adding bucket counts, which is how results from parallel
+sweep workers are combined.
+
+``MetricsAggregator`` keeps one sketch per (scheduler, backend, metric) and is
+updated by the Orchestrator for every finished task.
+"""
+
+import math
+from typing import Any
+
+TRACKED_METRICS = ("waiting_time", "turnaround_time")
+QUANTILES = (0.5, 0.95, 0.99)
+# Backend key under which every task of a scheduler is aggregated
+ALL_BACKENDS = "*"
+
+
+class QuantileSketch:
+    def __init__(self, relative_accuracy: float = 0.01, min_value: float = 1e-12):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+        self.relative_accuracy = relative_accuracy
+        # Values at or below min_value (e.g. zero waiting time) share one bucket
+        self.min_value = min_value
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.buckets: dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float):
+        value = float(value)
+        if value <= self.min_value:
+            self.zero_count += 1
+        else:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "QuantileSketch"):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for index, n in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + n
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        """Value at quantile ``q`` in [0, 1], within the sketch's relative accuracy."""
+        if self.count == 0:
+            return float("nan")
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return max(self.min, 0.0)
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                # Midpoint of (gamma^(i-1), gamma^i] in relative terms
+                value = 2 * self._gamma ** index / (1 + self._gamma)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else float("nan")
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "min_value": self.min_value,
+            "buckets": {str(i): n for i, n in self.buckets.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "QuantileSketch":
+        sketch = cls(data["relative_accuracy"], data["min_value"])
+        sketch.buckets = {int(i): n for i, n in data["buckets"].items()}
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        sketch.total = data["total"]
+        if sketch.count:
+            sketch.min = data["min"]
+            sketch.max = data["max"]
+        return sketch
+
+
+class MetricsAggregator:
+    """
+    Per-scheduler and per-backend latency sketches, fed one result row at a time.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        # (scheduler, backend, metric) -> QuantileSketch
+        self.sketches: dict[tuple[str, str, str], QuantileSketch] = {}
+
+    def record(self, scheduler: str, row: dict[str, Any]):
+        """Add a finished task's result row; failed tasks are ignored."""
+        if row.get("status") != "success":
+            return
+        for backend in (ALL_BACKENDS, row["backend"]):
+            for metric in TRACKED_METRICS:
+                key = (scheduler, backend, metric)
+                sketch = self.sketches.get(key)
+                if sketch is None:
+                    sketch = self.sketches[key] = QuantileSketch(self.relative_accuracy)
+                sketch.add(row[metric])
+
+    def merge(self, other: "MetricsAggregator"):
+        for key, sketch in other.sketches.items():
+            if key in self.sketches:
+                self.sketches[key].merge(sketch)
+            else:
+                self.sketches[key] = QuantileSketch.from_dict(sketch.to_dict())
+
+    def summary(self) -> list[dict[str, Any]]:
+        """
+        One row per (scheduler, backend, metric) with count, mean, p50, p95,
+        p99 and max. The backend is ``ALL_BACKENDS`` for a scheduler's totals.
+        """
+        rows = []
+        for (scheduler, backend, metric), sketch in sorted(self.sketches.items()):
+            row = {
+                "scheduler": scheduler,
+                "backend": backend,
+                "metric": metric,
+                "count": sketch.count,
+                "mean": sketch.mean,
+            }
+            for q in QUANTILES:
+                row[f"p{round(q * 100)}"] = sketch.quantile(q)
+            row["max"] = sketch.max
+            rows.append(row)
+        return rows
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "sketches": [
+                {"scheduler": s, "backend": b, "metric": m, "sketch": sketch.to_dict()}
+                for (s, b, m), sketch in self.sketches.items()
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "MetricsAggregator":
+        aggregator = cls(data["relative_accuracy"])
+        for entry in data["sketches"]:
+            key = (entry["scheduler"], entry["backend"], entry["metric"])
+            aggregator.sketches[key] = QuantileSketch.from_dict(entry["sketch"])
+        return aggregator
@@ -0,0 +1,83 @@
+"""
+Scenario
+--------
+Builders for the scenario config formats (schedulers, clusters, workloads)
+and the per-process setup, shared by the command-line runner, the
+scheduling service, federated regions and worker pools. See
+``src/qschedulers/cli.py`` for the config formats.
+"""
+
+from typing import Any
+
+from src.logger_config import setup_logger
+
+
+def build_scheduler(spec: Any):
+    from src.qschedulers import schedulers
+
+    if isinstance(spec, str):
+        name, kwargs = spec, {}
+    else:
+        kwargs = dict(spec)
+        name = kwargs.pop("name")
+    try:
+        scheduler_cls = getattr(schedulers, name)
+    except AttributeError:
+        raise ValueError(f"Unknown scheduler: {name}") from None
+    return scheduler_cls(**kwargs)
+
+
+def build_cluster(exp, spec: Any):
+    from src.qschedulers.cloud.backends import get_backend
+    from src.qschedulers.cloud.qnode import QuantumNode
+
+    if spec == "test":
+        return exp.get_test_QNodes()
+    if spec in (None, "five_node"):
+        return exp.create_cluster_of_5_different_quantum_nodes_27_to_127_qubit()
+    if isinstance(spec, dict) and "fleet" in spec:
+        from src.qschedulers.cloud.fleet import generate_fleet
+
+        return generate_fleet(exp.env, **spec["fleet"])
+    if isinstance(spec, list):
+        return [
+            QuantumNode(exp.env, get_backend(node.get("backend", node["name"])), name=node["name"])
+            for node in spec
+        ]
+    raise ValueError(f"Unknown cluster spec: {spec!r}")
+
+
+def build_workload(exp, config: dict[str, Any], seed: int):
+    from src.qschedulers.datasets.task_specs import load_task_trace, tasks_from_specs
+
+    spec = dict(config.get("workload") or {})
+    if "tasks" in config and not spec:
+        spec = {"type": "tasks", "tasks": config["tasks"]}
+    kind = spec.pop("type", "random")
+    if kind == "random":
+        return exp.create_quantum_task_with_different_quantum_benchmark_algorithm(seed=seed, **spec)
+    if kind == "test":
+        return exp.get_test_ready_tasks()
+    if kind == "workflows":
+        return exp.create_hybrid_workflow_tasks(seed=seed, **spec)
+    if kind == "tenants":
+        return exp.create_multi_tenant_tasks(seed=seed, **spec)
+    if kind == "tasks":
+        return tasks_from_specs(spec["tasks"])
+    if kind == "trace":
+        return load_task_trace(spec["path"])
+    if kind == "store":
+        from src.qschedulers.datasets.circuit_store import CircuitStore
+
+        return CircuitStore(**spec).tasks()
+    raise ValueError(f"Unknown workload type: {kind}")
+
+
+def configure_worker(transpile_cache: str | None, benchmark_cache: str | None):
+    """Per-process setup shared by the main process and pool workers."""
+    from src.qschedulers.datasets.mqtbench_loader import set_benchmark_cache_dir
+    from src.qschedulers.utils.transpilation import configure_transpile_cache
+
+    setup_logger()
+    configure_transpile_cache(transpile_cache)
+    set_benchmark_cache_dir(benchmark_cache)
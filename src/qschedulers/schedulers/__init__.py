@@ -1,3 +1,23 @@
+from importlib import import_module
+
 from .base import Scheduler
-from .round_robin import RoundRobinScheduler
-from .fan import FANScheduler
\ No newline at end of file
+
+# Scheduler classes are imported on first access, so importing the package
+# does not pull in qiskit for policies that never transpile.
+_LAZY_SCHEDULERS = {
+    "RoundRobinScheduler": ".round_robin",
+    "FANScheduler": ".fan",
+    "FDFScheduler": ".fdf",
+    "SEFScheduler": ".sef",
+    "MetaheuristicScheduler": ".metaheuristic",
+    "HEFTScheduler": ".heft",
+    "HierarchicalScheduler": ".hierarchical",
+}
+
+__all__ = ["Scheduler", *_LAZY_SCHEDULERS]
+
+
+def __getattr__(name):
+    if name in _LAZY_SCHEDULERS:
+        return getattr(import_module(_LAZY_SCHEDULERS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
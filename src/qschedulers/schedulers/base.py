@@ -20,6 +20,25 @@ class Scheduler(ABC):
         Returns:
             A dictionary mapping:
                 - "assignments": list of (task_id, backend_id) pairs
-                - "metadata": any additional info (logs, statistics, etc.)
+                - "metadata": any additional info (logs, statistics, etc.);
+                  "decision_times" ({task index: seconds}) reports the
+                  compute time of each task's decision, if measured
         """
-        pass
\ No newline at end of file
+        pass
+
+    def update_node(self, qnode: Any, free_at: float) -> None:
+        """
+        Feedback from the orchestrator: ``qnode`` is now expected to have
+        worked off its queue at simulation time ``free_at``. Schedulers that
+        keep per-node load state override this; the default ignores it.
+        """
+        return None
+
+    def update_calibration(self, qnode: Any, qubits: set[int]) -> None:
+        """
+        Feedback from the orchestrator: ``qnode`` was recalibrated and the
+        errors of physical ``qubits`` changed (see ``node_calibration``).
+        Schedulers that cache estimates drop the entries using those qubits;
+        the default ignores it.
+        """
+        return None
\ No newline at end of file
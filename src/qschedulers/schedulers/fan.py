@@ -1,11 +1,13 @@
+import logging
+import time
 from typing import Any
-from src.logger_config import setup_logger
-from qiskit import transpile
-from src.qschedulers.datasets.calibration_utils import get_gate_error_map
+from src.qschedulers.cloud.backends import node_calibration
+from src.qschedulers.cloud.calibration_timeline import used_qubits
 from src.qschedulers.evaluation.metrics import estimate_fidelity_and_time
+from src.qschedulers.utils.transpilation import template_key, transpile_for_backend
 from .base import Scheduler
 
-logger = setup_logger()
+logger = logging.getLogger(__name__)
 
 class FANScheduler(Scheduler):
     """
@@ -15,6 +17,10 @@ class FANScheduler(Scheduler):
 
     def __init__(self, shots: int = 1024):
         self.shots = shots
+        # (variational template key, node key) -> (fidelity, exec_time, swaps),
+        # and the physical qubits each cached estimate uses
+        self._estimates = {}
+        self._estimate_qubits = {}
         logger.info(f"Initialized FANScheduler with shots={shots}.")
 
     def schedule(self, tasks: list[Any], qnodes: list[Any]) -> dict[str, Any]:
@@ -24,21 +30,32 @@ class FANScheduler(Scheduler):
             raise ValueError("No backends provided for scheduling.")
 
         assignments = []
+        decision_times = {}
 
         for task_id, task in enumerate(tasks):
+            started = time.perf_counter()
             best_qnode = None
             best_score = -float("inf")
             best_meta = None
+            # Instances of one variational template share their estimates
+            structure = template_key(task.circuit)
             logger.debug(f"Evaluating task {task_id} for best qnode assignment.")
 
             for qnode in qnodes:
                 try:
                     backend = qnode.backend
-                    tqc = transpile(task.circuit, backend, optimization_level=3)
-                    err_map = get_gate_error_map(backend)
-                    fidelity, exec_time, swaps = estimate_fidelity_and_time(
-                        tqc, backend, err_map, shots=self.shots
-                    )
+                    key = (structure, qnode.name or id(qnode))
+                    if structure is not None and key in self._estimates:
+                        fidelity, exec_time, swaps = self._estimates[key]
+                    else:
+                        tqc = transpile_for_backend(task.circuit, backend)
+                        err_map = node_calibration(qnode).err_map
+                        fidelity, exec_time, swaps = estimate_fidelity_and_time(
+                            tqc, backend, err_map, shots=self.shots
+                        )
+                        if structure is not None:
+                            self._estimates[key] = (fidelity, exec_time, swaps)
+                            self._estimate_qubits[key] = used_qubits(tqc)
                     score = fidelity / (exec_time + 1e-9)
                     logger.debug(f"Task {task_id} on backend {getattr(backend, 'name', backend)}: fidelity={fidelity}, exec_time={exec_time}, score={score}")
                     if score > best_score:
@@ -54,6 +71,7 @@ class FANScheduler(Scheduler):
                 ...
 
             assignments.append((task_id, best_qnode))
+            decision_times[task_id] = time.perf_counter() - started
 
         logger.info(f"Completed scheduling. Assignments: {assignments}")
         return {
@@ -62,5 +80,18 @@ class FANScheduler(Scheduler):
                 "policy": "fidelity_aware_network",
                 "num_tasks": len(tasks),
                 "num_backends": len(qnodes),
+                "decision_times": decision_times,
             },
         }
+
+    def update_calibration(self, qnode: Any, qubits: set[int]) -> None:
+        node_key = qnode.name or id(qnode)
+        stale = [
+            key
+            for key, used in self._estimate_qubits.items()
+            if key[1] == node_key and not used.isdisjoint(qubits)
+        ]
+        for key in stale:
+            self._estimates.pop(key, None)
+            self._estimate_qubits.pop(key, None)
+        logger.debug(f"Dropped {len(stale)} cached estimates of {node_key} after recalibration")
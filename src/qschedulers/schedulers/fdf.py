@@ -1,5 +1,5 @@
 from typing import Any
-from src.qschedulers.datasets.calibration_utils import get_gate_error_map
+from src.qschedulers.cloud.backends import node_calibration
 from .base import Scheduler
 
 class FDFScheduler(Scheduler):
@@ -17,8 +17,7 @@ class FDFScheduler(Scheduler):
         # Precompute average gate duration for each qnode
         qnode_avg_durations = []
         for qnode in qnodes:
-            backend = qnode.backend
-            err_map = get_gate_error_map(backend)
+            err_map = node_calibration(qnode).err_map
             durations = [v.get("length", 300e-9) for v in err_map.values() if v.get("length") is not None]
             avg_duration = sum(durations) / len(durations) if durations else 300e-9
             qnode_avg_durations.append(avg_duration)
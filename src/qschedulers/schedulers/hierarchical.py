@@ -0,0 +1,243 @@
+import heapq
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+from src.qschedulers.cloud.backends import node_calibration
+from src.qschedulers.cloud.calibration_timeline import used_qubits
+from src.qschedulers.evaluation.metrics import estimate_fidelity_and_time
+from src.qschedulers.utils.transpilation import template_key, transpile_for_backend
+from .base import Scheduler
+
+logger = logging.getLogger(__name__)
+
+GROUPINGS = ("backend", "width", "region")
+DEFAULT_MAX_ESTIMATES = 4096
+
+
+class NodeGroup:
+    """
+    Nodes of one class and one backend profile plus an incrementally
+    maintained load summary: a heap of (expected free time, version, node
+    index) with lazy deletion, so the least-loaded node is found in O(log n)
+    instead of scanning the group.
+    """
+
+    def __init__(self, key: Any, nodes: list[Any]):
+        self.key = key
+        self.nodes = nodes
+        # Every node runs the same backend profile, so any of them stands in
+        # for the group's estimates and its width is the group's width
+        self.representative = nodes[0]
+        self.profile = self.representative.backend.name
+        self.num_qubits = self.representative.backend.num_qubits
+        self.free_at = [0.0] * len(nodes)
+        self._version = [0] * len(nodes)
+        self._heap = [(0.0, 0, i) for i in range(len(nodes))]
+        self._index = {id(node): i for i, node in enumerate(nodes)}
+
+    def earliest(self) -> tuple[float, int]:
+        """(expected free time, node index) of the least-loaded node."""
+        while True:
+            free_at, version, i = self._heap[0]
+            if version == self._version[i]:
+                return free_at, i
+            heapq.heappop(self._heap)
+
+    def update(self, node: Any, free_at: float):
+        i = self._index[id(node)]
+        self.free_at[i] = free_at
+        self._version[i] += 1
+        heapq.heappush(self._heap, (free_at, self._version[i], i))
+        # Keep stale entries from piling up under heavy update traffic
+        if len(self._heap) > 4 * len(self.nodes):
+            self._heap = [(f, self._version[j], j) for j, f in enumerate(self.free_at)]
+            heapq.heapify(self._heap)
+
+
+class HierarchicalScheduler(Scheduler):
+    """
+    Hierarchical Scheduler.
+    Groups qnodes by class (backend profile, width, or region), picks the
+    group where the task is expected to finish earliest, then the
+    least-loaded node in that group. A class mixing backend profiles is split
+    into one group per profile, so every node of a group can hold what its
+    representative holds. Tasks are estimated once per group on its
+    representative node, with that node's current calibration; groups of one
+    profile share their estimates until their representative is
+    recalibrated. Each group's load summary is a heap updated
+    incrementally as tasks are placed and as the orchestrator reports node
+    queues, so scheduling a task costs O(groups + log(group size)) rather
+    than a pass (or a transpile) over every node.
+    """
+
+    def __init__(
+        self,
+        shots: int = 1024,
+        group_by: str | Callable[[Any], Any] = "backend",
+        min_fidelity: float = 0.0,
+        max_estimates: int = DEFAULT_MAX_ESTIMATES,
+    ):
+        if isinstance(group_by, str) and group_by not in GROUPINGS:
+            raise ValueError(f"Unknown grouping {group_by!r}, expected one of {GROUPINGS} or a callable")
+        self.shots = shots
+        self.group_by = group_by
+        # Groups whose estimated fidelity is lower are skipped if another fits
+        self.min_fidelity = min_fidelity
+        self.groups: list[NodeGroup] = []
+        self._group_of: dict[int, NodeGroup] = {}
+        self._node_ids: tuple[int, ...] = ()
+        # LRU of (circuit key, profile or group key) -> (circuit or None,
+        # (fidelity, per-shot time) or None). Keyed by id, the circuit is kept
+        # to guard against id reuse; template structures and circuit store
+        # positions need no circuit
+        self.max_estimates = max_estimates
+        self._estimates: OrderedDict[tuple[Any, Any], tuple[Any, tuple[float, float] | None]] = OrderedDict()
+        # Estimate key -> physical qubits the transpiled circuit uses
+        self._estimate_qubits: dict[tuple[Any, Any], frozenset[int]] = {}
+        self._estimated = 0
+        logger.info(f"Initialized HierarchicalScheduler with shots={shots}, group_by={group_by}.")
+
+    def schedule(self, tasks: list[Any], qnodes: list[Any]) -> dict[str, Any]:
+        logger.info(f"Scheduling {len(tasks)} tasks across {len(qnodes)} qnodes using hierarchical policy.")
+        if not qnodes:
+            logger.error("No backends provided for scheduling.")
+            raise ValueError("No backends provided for scheduling.")
+
+        if tuple(id(q) for q in qnodes) != self._node_ids:
+            self._build_groups(qnodes)
+
+        assignments = []
+        decision_times = {}
+        estimated = self._estimated
+        for task_id, task in enumerate(tasks):
+            started = time.perf_counter()
+            shots = getattr(task, "shots", None) or self.shots
+            best = None
+            fallback = None
+            for group in self.groups:
+                if group.num_qubits < task.circuit.num_qubits:
+                    continue
+                estimate = self._estimate(task, group)
+                if estimate is None:
+                    continue
+                fidelity, shot_time = estimate
+                free_at, node_index = group.earliest()
+                finish = max(free_at, task.arrival_time) + shot_time * shots
+                candidate = (finish, -fidelity, group, node_index)
+                if fidelity >= self.min_fidelity and (best is None or candidate[:2] < best[:2]):
+                    best = candidate
+                if fallback is None or candidate[:2] < fallback[:2]:
+                    fallback = candidate
+            best = best or fallback
+
+            if best is None:
+                logger.error(f"No suitable qnode found for task {task_id}.")
+                assignments.append((task_id, None))
+                decision_times[task_id] = time.perf_counter() - started
+                continue
+            finish, _, group, node_index = best
+            node = group.nodes[node_index]
+            group.update(node, finish)
+            assignments.append((task_id, node))
+            decision_times[task_id] = time.perf_counter() - started
+
+        return {
+            "assignments": assignments,
+            "metadata": {
+                "policy": "hierarchical",
+                "num_tasks": len(tasks),
+                "num_backends": len(qnodes),
+                "num_groups": len(self.groups),
+                "estimates": self._estimated - estimated,
+                "decision_times": decision_times,
+            },
+        }
+
+    def update_node(self, qnode: Any, free_at: float) -> None:
+        group = self._group_of.get(id(qnode))
+        if group is not None:
+            group.update(qnode, free_at)
+
+    def update_calibration(self, qnode: Any, qubits: set[int]) -> None:
+        # Groups are estimated on their representative; other members' drift
+        # does not change the group's estimates. A recalibrated representative
+        # has its own entries under the group key, the profile's stay valid
+        # for the other groups
+        group = self._group_of.get(id(qnode))
+        if group is None or group.representative is not qnode:
+            return
+        stale = [
+            key
+            for key, used in self._estimate_qubits.items()
+            if key[1] == group.key and not used.isdisjoint(qubits)
+        ]
+        for key in stale:
+            self._estimates.pop(key, None)
+            self._estimate_qubits.pop(key, None)
+        logger.debug(f"Dropped {len(stale)} cached estimates of group {group.key} after recalibration")
+
+    def _build_groups(self, qnodes: list[Any]):
+        members: dict[Any, list[Any]] = {}
+        for node in qnodes:
+            key = self._group_key(node)
+            if self.group_by != "backend":
+                key = (key, node.backend.name)
+            members.setdefault(key, []).append(node)
+        # Narrow groups first, so ties go to the smallest device class that fits
+        self.groups = sorted(
+            (NodeGroup(key, nodes) for key, nodes in members.items()),
+            key=lambda g: (g.num_qubits, str(g.key)),
+        )
+        self._group_of = {id(node): group for group in self.groups for node in group.nodes}
+        self._node_ids = tuple(id(q) for q in qnodes)
+        logger.info(f"Grouped {len(qnodes)} qnodes into {len(self.groups)} groups by {self.group_by}.")
+
+    def _group_key(self, node: Any) -> Any:
+        if callable(self.group_by):
+            return self.group_by(node)
+        if self.group_by == "width":
+            return node.backend.num_qubits
+        if self.group_by == "region":
+            return getattr(node, "region", None)
+        return node.backend.name
+
+    def _estimate(self, task: Any, group: NodeGroup) -> tuple[float, float] | None:
+        # Instances of one variational template share their estimate
+        structure = template_key(task.circuit)
+        # Tasks read from a circuit store are identified by their position,
+        # without keeping the circuit alive past the store's LRU
+        stored = getattr(task, "cache_key", None)
+        if structure is not None:
+            circuit_key, pinned = structure, None
+        elif stored is not None:
+            circuit_key, pinned = stored, None
+        else:
+            circuit_key, pinned = id(task.circuit), task.circuit
+        # Groups of one profile share estimates while their representative
+        # uses the backend's calibration
+        scope = group.key if getattr(group.representative, "calibration", None) is not None else group.profile
+        key = (circuit_key, scope)
+        cached = self._estimates.get(key)
+        if cached is not None and cached[0] is pinned:
+            self._estimates.move_to_end(key)
+            return cached[1]
+        backend = group.representative.backend
+        try:
+            tqc = transpile_for_backend(task.circuit, backend)
+            err_map = node_calibration(group.representative).err_map
+            fidelity, shot_time, _ = estimate_fidelity_and_time(tqc, backend, err_map, shots=1)
+            estimate = (fidelity, shot_time)
+            self._estimate_qubits[key] = used_qubits(tqc)
+        except Exception as e:
+            logger.debug(f"Task {task.id} cannot run on {group.profile} (group {group.key}): {e}")
+            estimate = None
+        self._estimated += 1
+        self._estimates[key] = (pinned, estimate)
+        self._estimates.move_to_end(key)
+        while len(self._estimates) > self.max_estimates:
+            evicted, _ = self._estimates.popitem(last=False)
+            self._estimate_qubits.pop(evicted, None)
+        return estimate
@@ -0,0 +1,259 @@
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from src.qschedulers.evaluation.cost_matrix import build_cost_matrix
+from .base import Scheduler
+
+logger = logging.getLogger(__name__)
+
+METHODS = ("ga", "sa")
+
+
+class MetaheuristicScheduler(Scheduler):
+    """
+    Metaheuristic batch scheduler.
+    Searches task -> qnode assignments with a genetic algorithm ("ga") or
+    simulated annealing ("sa"), minimising
+
+        makespan / reference_makespan + fidelity_weight * (1 - mean fidelity)
+
+    where a node's finish time is the sum of its tasks' estimated execution
+    times (offline batch view) and the reference is the makespan of a
+    longest-processing-time-first greedy plan. Candidates are scored a whole
+    population at a time with NumPy over a precomputed task x node cost
+    matrix. The search starts from the greedy plan and a fidelity/time
+    (FAN-style) plan, so it never returns anything worse than either.
+    """
+
+    def __init__(
+        self,
+        shots: int = 1024,
+        method: str = "ga",
+        fidelity_weight: float = 1.0,
+        population_size: int = 64,
+        time_budget: float | None = 2.0,
+        max_generations: int | None = None,
+        islands: int = 1,
+        seed: int = 1234,
+    ):
+        if method not in METHODS:
+            raise ValueError(f"Unknown metaheuristic method {method!r}, expected one of {METHODS}")
+        if time_budget is None and max_generations is None:
+            raise ValueError("Set time_budget, max_generations or both.")
+        self.shots = shots
+        self.method = method
+        self.fidelity_weight = fidelity_weight
+        self.population_size = population_size
+        # Wall-clock seconds per search (per island)
+        self.time_budget = time_budget
+        self.max_generations = max_generations
+        # Independent populations searched in parallel processes
+        self.islands = islands
+        self.seed = seed
+        logger.info(f"Initialized MetaheuristicScheduler with method={method}, time_budget={time_budget}, islands={islands}.")
+
+    def schedule(self, tasks: list[Any], qnodes: list[Any]) -> dict[str, Any]:
+        import numpy as np
+
+        logger.info(f"Scheduling {len(tasks)} tasks across {len(qnodes)} qnodes using {self.method.upper()} search.")
+        if not qnodes:
+            logger.error("No backends provided for scheduling.")
+            raise ValueError("No backends provided for scheduling.")
+
+        costs = build_cost_matrix(tasks, qnodes, self.shots)
+        runnable = np.flatnonzero(costs.feasible.any(axis=1))
+        for task_id in np.flatnonzero(~costs.feasible.any(axis=1)):
+            logger.error(f"No suitable qnode found for task {task_id}.")
+
+        plan = np.full(len(tasks), -1)
+        stats = {"generations": 0, "evaluations": 0, "best_cost": None, "makespan_est": None, "mean_fidelity_est": None}
+        if runnable.size:
+            exec_time = costs.exec_time[runnable]
+            fidelity = costs.fidelity[runnable]
+            feasible = costs.feasible[runnable]
+            args = (exec_time, fidelity, feasible, self.method, self.population_size,
+                    self.time_budget, self.max_generations, self.fidelity_weight)
+            if self.islands > 1:
+                with ProcessPoolExecutor(max_workers=self.islands) as pool:
+                    futures = [pool.submit(search_assignment, *args, self.seed + i) for i in range(self.islands)]
+                    results = [f.result() for f in futures]
+            else:
+                results = [search_assignment(*args, self.seed)]
+            best = min(results, key=lambda r: r["best_cost"])
+            plan[runnable] = best["assignment"]
+            stats = {
+                "generations": sum(r["generations"] for r in results),
+                "evaluations": sum(r["evaluations"] for r in results),
+                "best_cost": best["best_cost"],
+                "makespan_est": best["makespan"],
+                "mean_fidelity_est": best["mean_fidelity"],
+            }
+
+        assignments = [(task_id, qnodes[j] if j >= 0 else None) for task_id, j in enumerate(plan.tolist())]
+        logger.info(f"Completed scheduling. Estimated makespan {stats['makespan_est']} after {stats['generations']} generations.")
+        return {
+            "assignments": assignments,
+            "metadata": {
+                "policy": "metaheuristic",
+                "method": self.method,
+                "islands": self.islands,
+                "num_tasks": len(tasks),
+                "num_backends": len(qnodes),
+                **stats,
+            },
+        }
+
+
+def search_assignment(
+    exec_time,
+    fidelity,
+    feasible,
+    method: str = "ga",
+    population_size: int = 64,
+    time_budget: float | None = 2.0,
+    max_generations: int | None = None,
+    fidelity_weight: float = 1.0,
+    seed: int = 1234,
+) -> dict[str, Any]:
+    """
+    Search one population over the (tasks, nodes) cost arrays. Every task must
+    have at least one feasible node.
+
+    Returns:
+        {"assignment": node index per task, "best_cost", "makespan",
+         "mean_fidelity", "generations", "evaluations"}
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    num_tasks, num_nodes = exec_time.shape
+    population_size = max(2, population_size)
+
+    # Feasible node indices per task, left-aligned, for vectorised sampling
+    counts = feasible.sum(axis=1)
+    options = np.argsort(~feasible, axis=1, kind="stable")
+
+    def sample(shape):
+        picks = (rng.random(shape) * counts).astype(int)
+        return options[np.arange(num_tasks), picks]
+
+    lpt = _lpt_plan(exec_time, feasible)
+    reference = max(_evaluate(lpt[None, :], exec_time, fidelity, num_nodes)[0][0], 1e-12)
+
+    def fitness(pop):
+        makespan, mean_fidelity, loads = _evaluate(pop, exec_time, fidelity, num_nodes)
+        return makespan / reference + fidelity_weight * (1.0 - mean_fidelity), makespan, mean_fidelity, loads
+
+    def rebalance(pop, loads):
+        # Move a random task off each candidate's busiest node
+        busiest = loads.argmax(axis=1)
+        on_busiest = rng.random(pop.shape) * (pop == busiest[:, None])
+        task = on_busiest.argmax(axis=1)
+        pop[np.arange(len(pop)), task] = sample((len(pop), num_tasks))[np.arange(len(pop)), task]
+        return pop
+
+    ratio = np.where(feasible, fidelity / np.where(feasible, exec_time, 1.0), -np.inf)
+    pop = sample((population_size, num_tasks))
+    pop[0] = lpt
+    pop[1] = ratio.argmax(axis=1)
+    cost, _, _, loads = fitness(pop)
+    evaluations = population_size
+    best_index = int(cost.argmin())
+    best, best_cost = pop[best_index].copy(), float(cost[best_index])
+
+    mutation_rate = 1.0 / num_tasks
+    start_temp, end_temp = 0.05, 1e-4
+    start = time.perf_counter()
+    generation = 0
+    while True:
+        elapsed = time.perf_counter() - start
+        progress = 0.0
+        if time_budget is not None:
+            if elapsed >= time_budget:
+                break
+            progress = elapsed / time_budget if time_budget > 0 else 1.0
+        if max_generations is not None:
+            if generation >= max_generations:
+                break
+            progress = max(progress, generation / max_generations)
+        generation += 1
+
+        if method == "ga":
+            # Binary tournaments, uniform crossover, random and rebalancing mutation
+            a, b = rng.integers(population_size, size=(2, population_size, 2))
+            mothers = np.where(cost[a[:, 0]] < cost[a[:, 1]], a[:, 0], a[:, 1])
+            fathers = np.where(cost[b[:, 0]] < cost[b[:, 1]], b[:, 0], b[:, 1])
+            children = np.where(rng.random((population_size, num_tasks)) < 0.5, pop[mothers], pop[fathers])
+            mutate = rng.random((population_size, num_tasks)) < mutation_rate
+            children[mutate] = sample((population_size, num_tasks))[mutate]
+            half = population_size // 2
+            _, _, _, child_loads = fitness(children[:half])
+            children[:half] = rebalance(children[:half], child_loads)
+            child_cost, _, _, child_loads = fitness(children)
+            evaluations += population_size + half
+
+            # (mu + lambda) survival keeps the best candidates found so far
+            merged = np.concatenate([pop, children])
+            merged_cost = np.concatenate([cost, child_cost])
+            merged_loads = np.concatenate([loads, child_loads])
+            keep = np.argsort(merged_cost, kind="stable")[:population_size]
+            pop, cost, loads = merged[keep], merged_cost[keep], merged_loads[keep]
+        else:
+            # One move per chain: half random reassignments, half rebalancing
+            proposal = pop.copy()
+            rows = np.arange(population_size)
+            task = rng.integers(num_tasks, size=population_size)
+            proposal[rows, task] = sample((population_size, num_tasks))[rows, task]
+            half = population_size // 2
+            proposal[:half] = rebalance(proposal[:half], loads[:half])
+            proposal_cost, _, _, proposal_loads = fitness(proposal)
+            evaluations += population_size
+
+            temperature = start_temp * (end_temp / start_temp) ** progress
+            accept = (proposal_cost <= cost) | (
+                rng.random(population_size) < np.exp(-np.maximum(proposal_cost - cost, 0.0) / temperature)
+            )
+            pop[accept], cost[accept], loads[accept] = proposal[accept], proposal_cost[accept], proposal_loads[accept]
+
+        index = int(cost.argmin())
+        if cost[index] < best_cost:
+            best, best_cost = pop[index].copy(), float(cost[index])
+
+    _, makespan, mean_fidelity, _ = fitness(best[None, :])
+    return {
+        "assignment": best,
+        "best_cost": best_cost,
+        "makespan": float(makespan[0]),
+        "mean_fidelity": float(mean_fidelity[0]),
+        "generations": generation,
+        "evaluations": evaluations,
+    }
+
+
+def _evaluate(pop, exec_time, fidelity, num_nodes):
+    """Makespan, mean fidelity and per-node load of every candidate (rows of ``pop``)."""
+    import numpy as np
+
+    size, num_tasks = pop.shape
+    tasks = np.arange(num_tasks)
+    slots = (pop + num_nodes * np.arange(size)[:, None]).ravel()
+    loads = np.bincount(slots, weights=exec_time[tasks, pop].ravel(), minlength=size * num_nodes)
+    loads = loads.reshape(size, num_nodes)
+    return loads.max(axis=1), fidelity[tasks, pop].mean(axis=1), loads
+
+
+def _lpt_plan(exec_time, feasible):
+    """Longest task first onto the feasible node that finishes it earliest."""
+    import numpy as np
+
+    num_tasks, num_nodes = exec_time.shape
+    loads = np.zeros(num_nodes)
+    plan = np.zeros(num_tasks, dtype=int)
+    longest = np.where(feasible, exec_time, 0.0).max(axis=1)
+    for t in np.argsort(-longest, kind="stable"):
+        finish = np.where(feasible[t], loads + exec_time[t], np.inf)
+        plan[t] = int(finish.argmin())
+        loads[plan[t]] = finish[plan[t]]
+    return plan
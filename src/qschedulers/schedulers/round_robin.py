@@ -1,8 +1,8 @@
+import logging
 from typing import Any
-from src.logger_config import setup_logger
 from .base import Scheduler
 
-logger = setup_logger()
+logger = logging.getLogger(__name__)
 
 
 class RoundRobinScheduler(Scheduler):
@@ -1,5 +1,5 @@
 from typing import Any
-from src.qschedulers.datasets.calibration_utils import get_gate_error_map
+from src.qschedulers.cloud.backends import node_calibration
 from .base import Scheduler
 
 
@@ -18,8 +18,7 @@ class SEFScheduler(Scheduler):
         # Precompute average error for each qnode
         qnode_avg_errors = []
         for qnode in qnodes:
-            backend = qnode.backend
-            err_map = get_gate_error_map(backend)
+            err_map = node_calibration(qnode).err_map
             errors = [
                 v.get("error", 1e-3)
                 for v in err_map.values()
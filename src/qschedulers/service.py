@@ -0,0 +1,257 @@
+"""
+Scheduling Service
+------------------
+A long-lived local scheduling service (``qsched serve``).
+
+Clients connect over TCP and send JSON lines. A line is either a task spec
+in the format of ``task_specs`` / ``requests.jsonl`` traces, answered with one
+assignment line
+
+    {"id": 0, "node": "FakeHanoiV2", "backend": "fake_hanoi",
+     "fidelity": 0.93, "exec_time_est": 0.012, "batch": 7, "latency": 0.051}
+
+(``node`` is None and ``error`` is set when the task cannot be placed), or
+``{"op": "stats"}``, answered with the service counters. Answers are streamed
+back as soon as their batch is scheduled, so they need not arrive in
+submission order.
+
+Submissions are buffered into micro-batches of at most ``max_batch_size``
+tasks or ``max_delay`` seconds, whichever comes first. Each batch is
+scheduled, and the cost of every assignment estimated, in a process pool
+whose workers build the cluster and scheduler once and keep backends,
+calibration tables and transpilation caches warm across batches. Every
+worker holds its own scheduler state; with one worker (the default) the
+scheduler sees the whole request stream.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from src.qschedulers.evaluation.streaming import QUANTILES, QuantileSketch
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8765
+
+# Per-process state of a pool worker, set up by _init_worker
+_worker: dict[str, Any] = {}
+
+
+def _init_worker(config: dict[str, Any], transpile_cache: str | None, benchmark_cache: str | None):
+    from src.Experiments.ExperimentsHandler import ExperimentsHandler
+    from src.qschedulers.scenario import build_cluster, build_scheduler, configure_worker
+
+    configure_worker(transpile_cache, benchmark_cache)
+    exp = ExperimentsHandler()
+    schedulers = config.get("schedulers") or ["RoundRobinScheduler"]
+    _worker["nodes"] = build_cluster(exp, config.get("cluster"))
+    _worker["scheduler"] = build_scheduler(schedulers[0])
+    _worker["shots"] = config.get("shots", 1024)
+    # (circuit spec, node name) -> (fidelity, per-shot time)
+    _worker["estimates"] = {}
+
+
+def schedule_batch(specs: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Schedule one micro-batch of task specs in a pool worker.
+
+    Returns one assignment dict per spec, in order.
+    """
+    from src.qschedulers.cloud.backends import node_calibration
+    from src.qschedulers.datasets.task_specs import task_from_spec
+    from src.qschedulers.evaluation.metrics import estimate_fidelity_and_time
+    from src.qschedulers.utils.transpilation import transpile_for_backend
+
+    answers = [None] * len(specs)
+    tasks, positions = [], []
+    for i, spec in enumerate(specs):
+        try:
+            task = task_from_spec(spec, default_id=i)
+        except Exception as e:
+            answers[i] = {"id": spec.get("id"), "node": None, "error": f"invalid task spec: {e}"}
+            continue
+        positions.append(i)
+        tasks.append(task)
+
+    assignments = _worker["scheduler"].schedule(tasks, _worker["nodes"])["assignments"] if tasks else []
+    estimates = _worker["estimates"]
+    for task_index, qnode in assignments:
+        task, spec = tasks[task_index], specs[positions[task_index]]
+        answer = {"id": task.id, "node": None}
+        if qnode is None:
+            answer["error"] = "no feasible node"
+        else:
+            answer["node"] = qnode.name or qnode.backend.name
+            answer["backend"] = qnode.backend.name
+            key = (json.dumps(spec["circuit"], sort_keys=True), answer["node"])
+            try:
+                if key not in estimates:
+                    tqc = transpile_for_backend(task.circuit, qnode.backend)
+                    err_map = node_calibration(qnode).err_map
+                    fidelity, shot_time, _ = estimate_fidelity_and_time(tqc, qnode.backend, err_map, shots=1)
+                    estimates[key] = (fidelity, shot_time)
+                fidelity, shot_time = estimates[key]
+                answer["fidelity"] = fidelity
+                answer["exec_time_est"] = shot_time * (task.shots or _worker["shots"])
+            except Exception as e:
+                answer["error"] = f"estimation failed: {e}"
+        answers[positions[task_index]] = answer
+    return answers
+
+
+class SchedulingService:
+    def __init__(
+        self,
+        config: dict[str, Any],
+        max_workers: int = 1,
+        max_batch_size: int = 64,
+        max_delay: float = 0.05,
+        transpile_cache: str | None = None,
+        benchmark_cache: str | None = None,
+    ):
+        self.config = config
+        self.max_workers = max_workers
+        self.max_batch_size = max_batch_size
+        # Longest time the first task of a batch waits for more to arrive
+        self.max_delay = max_delay
+        self.transpile_cache = transpile_cache
+        self.benchmark_cache = benchmark_cache
+        self.counters = {"submitted": 0, "scheduled": 0, "failed": 0, "batches": 0, "connections": 0}
+        self.latency = QuantileSketch()
+        self.batch_sizes = QuantileSketch()
+        self._queue: asyncio.Queue | None = None
+        self._pool: ProcessPoolExecutor | None = None
+        self._batcher: asyncio.Task | None = None
+        # Batches being scheduled; referenced so the tasks are not collected
+        self._inflight: set[asyncio.Task] = set()
+        self._started_at = time.monotonic()
+
+    async def start(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> asyncio.AbstractServer:
+        """Start the worker pool, the batcher and the TCP server."""
+        self._queue = asyncio.Queue()
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(self.config, self.transpile_cache, self.benchmark_cache),
+        )
+        # Build the cluster and scheduler in every worker before the first request
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._pool, schedule_batch, []) for _ in range(self.max_workers)))
+        self._started_at = time.monotonic()
+        self._batcher = asyncio.create_task(self._batch_loop())
+        server = await asyncio.start_server(self._handle, host, port)
+        logger.info(f"Scheduling service listening on {', '.join(str(s.getsockname()) for s in server.sockets)}")
+        return server
+
+    async def serve_forever(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT):
+        server = await self.start(host, port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self):
+        if self._batcher is not None:
+            self._batcher.cancel()
+            self._batcher = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> dict[str, Any]:
+        uptime = time.monotonic() - self._started_at
+        answered = self.latency.count > 0
+        return {
+            **self.counters,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "uptime": uptime,
+            "throughput": self.counters["scheduled"] / uptime if uptime > 0 else 0.0,
+            "mean_batch_size": self.batch_sizes.mean if answered else None,
+            "latency": {
+                "mean": self.latency.mean if answered else None,
+                **{f"p{round(q * 100)}": self.latency.quantile(q) if answered else None for q in QUANTILES},
+                "max": self.latency.max if answered else None,
+            },
+        }
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.counters["connections"] += 1
+        lock = asyncio.Lock()
+        pending = set()
+
+        async def send(message: dict[str, Any]):
+            async with lock:
+                writer.write((json.dumps(message) + "\n").encode())
+                await writer.drain()
+
+        async def answer(future: asyncio.Future):
+            await send(await future)
+
+        try:
+            while line := await reader.readline():
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError as e:
+                    await send({"error": f"invalid JSON: {e}"})
+                    continue
+                if message.get("op") == "stats":
+                    await send(self.stats())
+                    continue
+                future = asyncio.get_running_loop().create_future()
+                self.counters["submitted"] += 1
+                await self._queue.put((message, future, time.monotonic()))
+                task = asyncio.create_task(answer(future))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            # Client closed its side: finish answering what it submitted
+            if pending:
+                await asyncio.gather(*pending)
+        except ConnectionError as e:
+            logger.debug(f"Client connection lost: {e}")
+        finally:
+            writer.close()
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # Dispatch without waiting, so batches overlap across pool workers
+            task = asyncio.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: list[tuple[dict[str, Any], asyncio.Future, float]]):
+        self.counters["batches"] += 1
+        self.batch_sizes.add(len(batch))
+        specs = [spec for spec, _, _ in batch]
+        try:
+            answers = await asyncio.get_running_loop().run_in_executor(self._pool, schedule_batch, specs)
+        except Exception as e:
+            logger.error(f"Scheduling a batch of {len(batch)} tasks failed: {e}")
+            answers = [{"id": spec.get("id"), "node": None, "error": str(e)} for spec in specs]
+
+        now = time.monotonic()
+        for (_, future, received_at), answer in zip(batch, answers):
+            self.counters["failed" if answer.get("node") is None else "scheduled"] += 1
+            self.latency.add(now - received_at)
+            answer["batch"] = len(batch)
+            answer["latency"] = now - received_at
+            if not future.done():
+                future.set_result(answer)
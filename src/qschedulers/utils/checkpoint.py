@@ -0,0 +1,80 @@
+"""
+Checkpointing
+-------------
+Manifest of completed experiment cells, so an interrupted sweep resumes where
+it stopped.
+
+A cell is identified by a hash of everything that determines its results
+(scheduler spec, workload, cluster, shots, orchestrator options and seed).
+``manifest.json`` in the checkpoint directory maps each completed cell key to
+its summary and result file. The manifest is rewritten atomically after every
+cell, so a crash at any point leaves either the previous or the new manifest
+on disk, never a partial one.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "manifest.json"
+
+
+def cell_key(**spec: Any) -> str:
+    """Stable key of an experiment cell from its JSON-serialisable description."""
+    canonical = json.dumps(spec, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+
+class CheckpointManifest:
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.path = os.path.join(directory, MANIFEST_FILENAME)
+        self.cells: dict[str, dict[str, Any]] = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    self.cells = json.load(f)["cells"]
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable checkpoint manifest {self.path}: {e}")
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """
+        Entry of a completed cell, or None if the cell has not completed or
+        its result file has since disappeared.
+        """
+        entry = self.cells.get(key)
+        if entry is None:
+            return None
+        if entry.get("path") and not os.path.exists(entry["path"]):
+            logger.info(f"Result file {entry['path']} of checkpointed cell {key} is missing, rerunning")
+            return None
+        return entry
+
+    def mark_complete(self, key: str, entry: dict[str, Any]):
+        self.cells[key] = entry
+        self._write()
+
+    def _write(self):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"cells": self.cells}, f, indent=2, default=str)
+        os.replace(tmp_path, self.path)
+
+
+def reuse_transpilations(directory: str) -> str:
+    """
+    Back the transpile cache with ``<directory>/transpile`` unless a cache
+    directory is already configured, so resumed cells skip their transpiles.
+    Returns the cache directory in use, for worker processes to share.
+    """
+    from src.qschedulers.utils.transpilation import configure_transpile_cache, get_transpile_cache
+
+    cache = get_transpile_cache()
+    if cache.cache_dir is None:
+        cache = configure_transpile_cache(os.path.join(directory, "transpile"))
+    return cache.cache_dir
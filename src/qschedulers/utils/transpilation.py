@@ -0,0 +1,319 @@
+"""
+Transpilation
+-------------
+Shared transpile path used by the orchestrator and the schedulers.
+
+Transpiled circuits are memoised in a process-wide cache keyed by the circuit's
+QPY serialisation, the backend and the transpile options. When a cache
+directory is configured (``configure_transpile_cache`` or the
+``QSCHED_TRANSPILE_CACHE`` environment variable) results are also stored there
+as QPY files, so reruns and other worker processes skip the transpile.
+
+Variational circuits (VQE, QAOA, QNN) differ only in their angles from one
+optimizer iteration to the next. From the second instance of a structure
+on, they are transpiled as templates: the numeric gate angles are lifted
+into parameters, the unbound template is transpiled once per backend and
+cached under a key of the circuit's structure, and every instance is bound
+from it and has its single-qubit runs merged again, which symbolic angles
+prevent during the transpile. The first instance is transpiled with its
+angles, so one-off circuits come out as without templates, and transpiling
+the same circuit again returns that first transpile. ``template_key``
+is the structural key, so estimates, which do not depend on the angles, can
+be shared between instances too.
+"""
+
+import hashlib
+import io
+import logging
+import os
+from collections import OrderedDict
+from typing import Any
+
+from src.qschedulers.cloud.backends import get_calibration
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEED_TRANSPILER = 1234
+TRANSPILE_CACHE_ENV_VAR = "QSCHED_TRANSPILE_CACHE"
+
+# Benchmarks whose circuits are transpiled as parameter templates by default
+VARIATIONAL_BENCHMARKS = frozenset({"vqe", "vqe_real_amp", "vqe_su2", "vqe_two_local", "qaoa", "qnn"})
+# Name of the parameter vector holding the angles lifted out of a circuit
+TEMPLATE_PARAMETERS = "_template"
+
+
+class TranspileCache:
+    """
+    In-memory LRU of transpiled circuits, optionally backed by a directory of
+    QPY files.
+    """
+
+    def __init__(self, cache_dir: str | None = None, max_entries: int = 2048):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, Any] = OrderedDict()
+        # Template keys of the variational structures transpiled so far
+        self._structures: OrderedDict[str, None] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, circuit: Any, backend: Any, *options: Any) -> str:
+        from qiskit import qpy
+
+        buf = io.BytesIO()
+        qpy.dump(circuit, buf)
+        digest = hashlib.sha256(buf.getvalue())
+        digest.update(repr((getattr(backend, "name", str(backend)), options)).encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Any | None:
+        tqc = self._entries.get(key)
+        if tqc is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return tqc
+        tqc = self._load(key)
+        if tqc is not None:
+            self._remember(key, tqc)
+            self.hits += 1
+            return tqc
+        self.misses += 1
+        return None
+
+    def put(self, key: str, tqc: Any):
+        self._remember(key, tqc)
+        if self.cache_dir:
+            self._store(key, tqc)
+
+    def seen(self, structure: str) -> bool:
+        """Record a template key and return whether it was recorded before."""
+        if structure in self._structures:
+            self._structures.move_to_end(structure)
+            return True
+        self._structures[structure] = None
+        while len(self._structures) > self.max_entries:
+            self._structures.popitem(last=False)
+        return False
+
+    def clear(self):
+        self._entries.clear()
+        self._structures.clear()
+
+    def _remember(self, key: str, tqc: Any):
+        self._entries[key] = tqc
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.qpy")
+
+    def _load(self, key: str) -> Any | None:
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        from qiskit import qpy
+
+        try:
+            with open(path, "rb") as f:
+                return qpy.load(f)[0]
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable transpile cache entry {path}: {e}")
+            return None
+
+    def _store(self, key: str, tqc: Any):
+        from qiskit import qpy
+
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                qpy.dump(tqc, f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not write transpile cache entry {path}: {e}")
+
+
+_cache = TranspileCache(cache_dir=os.environ.get(TRANSPILE_CACHE_ENV_VAR))
+
+
+def configure_transpile_cache(cache_dir: str | None = None, max_entries: int = 2048) -> TranspileCache:
+    """
+    Replace the process-wide transpile cache. ``cache_dir=None`` keeps results
+    in memory only.
+    """
+    global _cache
+    _cache = TranspileCache(cache_dir=cache_dir, max_entries=max_entries)
+    return _cache
+
+
+def get_transpile_cache() -> TranspileCache:
+    return _cache
+
+
+def is_variational(circuit: Any) -> bool:
+    return getattr(circuit, "name", None) in VARIATIONAL_BENCHMARKS
+
+
+def _liftable(operation: Any) -> bool:
+    from qiskit.circuit import Gate
+
+    return (
+        isinstance(operation, Gate)
+        and bool(operation.params)
+        and all(isinstance(p, (int, float)) for p in operation.params)
+    )
+
+
+def parameterize(circuit: Any) -> tuple[Any, list[float]]:
+    """
+    Lift the numeric angles of a circuit's gates into a parameter vector.
+
+    Returns:
+        (template, values): the unbound template and the lifted angles, so
+        that ``bind_template(template, values)`` gives back the circuit.
+    """
+    from qiskit.circuit import ParameterVector
+
+    values = [float(p) for inst in circuit.data if _liftable(inst.operation) for p in inst.operation.params]
+    angles = iter(ParameterVector(TEMPLATE_PARAMETERS, len(values)))
+    template = circuit.copy_empty_like(name=circuit.name)
+    for inst in circuit.data:
+        if _liftable(inst.operation):
+            operation = inst.operation.to_mutable()
+            operation.params = [next(angles) for _ in operation.params]
+            inst = inst.replace(operation=operation)
+        template._append(inst)
+    return template, values
+
+
+def bind_template(template: Any, values: list[float]) -> Any:
+    """Bind lifted angles into a (possibly transpiled) template."""
+    bindings = {
+        p: values[p.index]
+        for p in template.parameters
+        if getattr(getattr(p, "vector", None), "name", None) == TEMPLATE_PARAMETERS
+    }
+    bound = template.assign_parameters(bindings) if bindings else template.copy()
+    # Binding renames the copy; the name marks the circuit as variational
+    bound.name = template.name
+    return bound
+
+
+def template_key(circuit: Any, backend: Any = None, *options: Any) -> str | None:
+    """
+    Key of a variational circuit's structure, equal for instances that differ
+    only in their angles (None for other circuits).
+    """
+    if not is_variational(circuit):
+        return None
+    return _structure_key(circuit, backend, *options)
+
+
+def _structure_key(circuit: Any, backend: Any = None, *options: Any) -> str:
+    digest = hashlib.sha256(repr((circuit.name, circuit.num_qubits, circuit.num_clbits)).encode())
+    for inst in circuit.data:
+        operation = inst.operation
+        params = len(operation.params) if _liftable(operation) else tuple(repr(p) for p in operation.params)
+        qubits = tuple(circuit.find_bit(q).index for q in inst.qubits)
+        clbits = tuple(circuit.find_bit(c).index for c in inst.clbits)
+        digest.update(repr((operation.name, qubits, clbits, params)).encode())
+    if backend is not None:
+        digest.update(repr((getattr(backend, "name", str(backend)), options)).encode())
+    return digest.hexdigest()
+
+
+def transpile_for_backend(
+    circuit: Any,
+    backend: Any,
+    optimization_level: int = 3,
+    use_layout_index: bool = True,
+    seed_transpiler: int | None = DEFAULT_SEED_TRANSPILER,
+    template: bool | None = None,
+) -> Any:
+    """
+    Transpile a circuit for a backend, seeding ``initial_layout`` from the
+    backend's calibration-aware layout index. Results are served from the
+    transpile cache when the same circuit was already transpiled for the
+    backend with the same options.
+
+    Args:
+        circuit: The circuit to transpile.
+        backend: Target Qiskit backend.
+        optimization_level: Qiskit preset optimization level.
+        use_layout_index: Seed the layout from the precomputed index. When the
+            circuit does not embed into any ranked subgraph of its width,
+            Qiskit's own layout search is used instead.
+        seed_transpiler: Seed for the stochastic transpiler passes, so repeated
+            runs produce the same circuit and the same estimates.
+        template: Transpile the circuit's unbound template and bind its
+            angles afterwards (None: for the ``VARIATIONAL_BENCHMARKS``, from
+            the second circuit of the same structure on).
+
+    Returns:
+        The transpiled circuit.
+    """
+    options = (optimization_level, use_layout_index, seed_transpiler)
+    try:
+        key = _cache.key(circuit, backend, *options)
+    except Exception as e:
+        logger.debug(f"Circuit {getattr(circuit, 'name', '')} is not cacheable: {e}")
+        key = None
+    # A circuit transpiled before comes back as it was, so estimating and
+    # executing it use the same transpile
+    tqc = _cache.get(key) if key and template is not True else None
+    if tqc is not None:
+        return tqc
+
+    structure = None
+    if template is None:
+        if is_variational(circuit):
+            structure = _structure_key(circuit, backend, "template", *options)
+            template = _cache.seen(structure)
+        else:
+            template = False
+    if template:
+        unbound, values = parameterize(circuit)
+        key = structure or _structure_key(circuit, backend, "template", *options)
+        tqc = _cache.get(key)
+        if tqc is None:
+            tqc = _transpile(unbound, backend, *options)
+            _cache.put(key, tqc)
+        return _merge_1q_runs(bind_template(tqc, values), backend)
+
+    tqc = _transpile(circuit, backend, optimization_level, use_layout_index, seed_transpiler)
+    if key:
+        _cache.put(key, tqc)
+    return tqc
+
+
+def _merge_1q_runs(circuit: Any, backend: Any) -> Any:
+    """Resynthesise the single-qubit runs of a bound template in the backend's basis."""
+    from qiskit.transpiler import PassManager
+    from qiskit.transpiler.passes import Optimize1qGatesDecomposition
+
+    merged = PassManager([Optimize1qGatesDecomposition(target=backend.target)]).run(circuit)
+    merged.name = circuit.name
+    # A fresh pass manager drops the layout of the transpile
+    merged._layout = circuit.layout
+    return merged
+
+
+def _transpile(circuit: Any, backend: Any, optimization_level: int, use_layout_index: bool, seed_transpiler: int | None):
+    from qiskit import transpile
+
+    kwargs = {}
+    if use_layout_index:
+        layout = get_calibration(backend).layout_index.layout_for(circuit)
+        if layout is not None:
+            kwargs["initial_layout"] = layout
+    return transpile(
+        circuit,
+        backend=backend,
+        optimization_level=optimization_level,
+        seed_transpiler=seed_transpiler,
+        **kwargs,
+    )
@@ -0,0 +1,82 @@
+import simpy as sp
+from qiskit import QuantumCircuit
+
+from src.qschedulers.cloud.backends import get_backend, get_calibration
+from src.qschedulers.cloud.calibration_timeline import CalibrationSnapshot, VersionedCalibration
+from src.qschedulers.cloud.orchestrator import Orchestrator
+from src.qschedulers.cloud.qnode import QuantumNode
+from src.qschedulers.cloud.qtask import QuantumTask
+from src.qschedulers.schedulers import RoundRobinScheduler
+
+
+def _ghz(num_qubits):
+    qc = QuantumCircuit(num_qubits, name=f"ghz_{num_qubits}")
+    qc.h(0)
+    for q in range(num_qubits - 1):
+        qc.cx(q, q + 1)
+    qc.measure_all()
+    return qc
+
+
+def _orchestrator(timeline):
+    env = sp.Environment()
+    qnode = QuantumNode(env, get_backend("Hanoi"), name="Hanoi")
+    orchestrator = Orchestrator(env, RoundRobinScheduler(), [qnode], calibration_timeline=timeline)
+    return env, qnode, orchestrator
+
+
+def test_versioned_calibration_copies_on_write():
+    base = get_calibration(get_backend("Hanoi"))
+    (gate, qubits), values = next((k, v) for k, v in base.err_map.items() if len(k[1]) == 2)
+    versioned = VersionedCalibration(base)
+    snapshot = CalibrationSnapshot(time=1.0, node="Hanoi", gates={(gate, qubits): {"error": 0.3}}, readout={5: 0.2})
+
+    assert versioned.apply(snapshot) == {*qubits, 5}
+    assert versioned.version == 1
+    assert versioned.err_map[(gate, qubits)] == {**values, "error": 0.3}
+    assert versioned.readout_map[5] == 0.2
+    # The shared registry tables are untouched
+    assert base.err_map[(gate, qubits)] == values
+    assert base.readout_map[5] != 0.2
+
+
+def test_recalibration_invalidates_only_estimates_on_affected_qubits():
+    far = CalibrationSnapshot(time=1e9, node="Hanoi")
+    _, qnode, orchestrator = _orchestrator([far])
+    wide, narrow = QuantumTask(id=0, circuit=_ghz(5)), QuantumTask(id=1, circuit=_ghz(2))
+    before = orchestrator._estimate(wide, qnode, 1000)
+    orchestrator._estimate(narrow, qnode, 1000)
+    wide_key, narrow_key = (0, "Hanoi"), (1, "Hanoi")
+    affected = orchestrator._estimate_qubits[wide_key] - orchestrator._estimate_qubits[narrow_key]
+    gates = {
+        key: {"error": 0.3}
+        for key, values in get_calibration(qnode.backend).err_map.items()
+        if values.get("error") is not None and affected.issuperset(key[1])
+    }
+    assert gates
+
+    orchestrator._recalibrate(qnode, CalibrationSnapshot(time=0.0, node="Hanoi", gates=gates))
+
+    assert wide_key not in orchestrator._estimates
+    assert narrow_key in orchestrator._estimates
+    assert orchestrator.calibration_stats["invalidated"] == 1
+    assert orchestrator.calibration_stats["kept"] == 1
+    assert qnode.calibration.version == 1
+    # Estimated again with the node's new tables
+    assert orchestrator._estimate(wide, qnode, 1000)[0] < before[0]
+
+
+def test_timeline_is_applied_at_its_simulated_time():
+    snapshots = [
+        CalibrationSnapshot(time=2.0, node="Hanoi", readout={0: 0.3}),
+        CalibrationSnapshot(time=5.0, node="Hanoi", readout={1: 0.3}),
+    ]
+    env, qnode, orchestrator = _orchestrator(snapshots)
+    orchestrator.submit([])
+
+    env.run(until=3.0)
+    assert qnode.calibration.version == 1
+    env.run()
+    assert orchestrator.get_calibration_stats()["snapshots"] == 2
+    assert orchestrator.get_calibration_stats()["versions"] == {"Hanoi": 2}
+    assert qnode.calibration.readout_map[0] == qnode.calibration.readout_map[1] == 0.3
@@ -0,0 +1,103 @@
+import dataclasses
+import os
+import pickle
+import struct
+
+import pytest
+from qiskit import QuantumCircuit
+
+from src.qschedulers.cloud.qtask import QuantumTask
+from src.qschedulers.datasets.circuit_store import CircuitStore, StoredTask, write_circuit_store
+
+
+def _circuit(n, name):
+    qc = QuantumCircuit(n, name=name)
+    qc.h(0)
+    for i in range(n - 1):
+        qc.cx(i, i + 1)
+    qc.rz(0.25 * n, 0)
+    qc.measure_all()
+    return qc
+
+
+def _tasks():
+    # Ids out of order, so lookups cannot rely on positions
+    return [
+        QuantumTask(id=7, circuit=_circuit(2, "a"), arrival_time=0.5, priority=1, shots=100, tenant="x"),
+        QuantumTask(id=3, circuit=_circuit(3, "b"), arrival_time=1.25, predecessors=[7], workflow_id=1),
+        QuantumTask(id=11, circuit=_circuit(4, "c"), arrival_time=2.0, priority=-2, region="eu"),
+    ]
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    return write_circuit_store(_tasks(), str(tmp_path / "tasks.qcs"))
+
+
+def test_round_trip_keeps_fields_and_circuits(store_path):
+    tasks = _tasks()
+    with CircuitStore(store_path) as store:
+        assert len(store) == len(tasks)
+        assert store.loads == 0
+        for original, stored in zip(tasks, store.tasks()):
+            assert isinstance(stored, StoredTask)
+            for field in ("id", "arrival_time", "priority", "shots", "workflow_id", "tenant", "region"):
+                assert getattr(stored, field) == getattr(original, field)
+            assert stored.predecessors == original.predecessors
+            assert stored.circuit == original.circuit
+        assert store.loads == len(tasks)
+
+
+def test_lookup_by_task_id(store_path):
+    with CircuitStore(store_path) as store:
+        assert [store.position(task_id) for task_id in (7, 3, 11)] == [0, 1, 2]
+        assert store.circuit(11).name == "c"
+        with pytest.raises(KeyError):
+            store.position(5)
+
+
+def test_circuits_load_lazily_through_the_lru(store_path):
+    with CircuitStore(store_path, cache_size=1) as store:
+        task = store.task(2)
+        assert store.loads == 0
+        assert task.cache_key == (store_path, 2)
+        task.circuit
+        task.circuit
+        assert store.loads == 1
+        store.circuit_at(0)
+        task.circuit
+        assert store.loads == 3
+
+
+def test_replaced_task_pins_its_circuit(store_path):
+    with CircuitStore(store_path) as store:
+        task = store.task(0)
+        moved = dataclasses.replace(task, arrival_time=9.0)
+        assert moved.cache_key is None
+        assert moved.circuit == task.circuit
+
+
+def test_pickling_sends_only_the_path(store_path):
+    with CircuitStore(store_path) as store:
+        task = store.task(1)
+        copy = pickle.loads(pickle.dumps(task))
+        assert copy.cache_key == task.cache_key
+        assert copy.circuit == task.circuit
+
+
+def test_other_versions_are_rejected(store_path):
+    with open(store_path, "r+b") as f:
+        f.seek(4)
+        f.write(struct.pack("<I", 2))
+    with pytest.raises(ValueError, match="version 2"):
+        CircuitStore(store_path)
+
+
+def test_failed_write_leaves_no_file(tmp_path):
+    path = tmp_path / "broken.qcs"
+    tasks = _tasks()
+    # Neither QPY nor pickle can serialise a lambda
+    tasks[1].circuit = lambda: None
+    with pytest.raises(Exception):
+        write_circuit_store(tasks, str(path))
+    assert os.listdir(tmp_path) == []
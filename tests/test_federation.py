@@ -0,0 +1,70 @@
+from qiskit import QuantumCircuit
+
+from src.qschedulers.cloud.federation import FederatedSimulation
+from src.qschedulers.cloud.qtask import QuantumTask
+
+LATENCY = 0.05
+REGIONS = [
+    {"name": "eu", "cluster": [{"name": "Hanoi"}]},
+    {"name": "us", "cluster": [{"name": "Brisbane"}]},
+]
+
+
+def _ghz(num_qubits):
+    qc = QuantumCircuit(num_qubits, name=f"ghz_{num_qubits}")
+    qc.h(0)
+    for q in range(num_qubits - 1):
+        qc.cx(q, q + 1)
+    qc.measure_all()
+    return qc
+
+
+def _burst(n=12, spacing=0.004):
+    return [
+        QuantumTask(id=i, circuit=_ghz(6), arrival_time=i * spacing, shots=200000, region="eu") for i in range(n)
+    ]
+
+
+def _check_causal(rows, tasks):
+    arrivals = {task.id: task.arrival_time for task in tasks}
+    assert sorted(r["task_id"] for r in rows) == sorted(arrivals)
+    for row in rows:
+        assert row["status"] == "success"
+        assert row["arrival_time"] == arrivals[row["task_id"]]
+        # A forwarded task cannot start before it reaches its region
+        assert row["start_time"] >= row["arrival_time"] + row["network_delay"] - 1e-12
+        assert row["finish_time"] >= row["start_time"]
+        assert row["network_delay"] == row["hops"] * LATENCY
+
+
+def test_task_too_wide_for_its_home_region_is_forwarded():
+    tasks = [QuantumTask(id=0, circuit=_ghz(30), arrival_time=1.0, region="eu")]
+    federation = FederatedSimulation(REGIONS, latency=LATENCY, processes=False)
+    rows = federation.run(tasks)
+
+    _check_causal(rows, tasks)
+    (row,) = rows
+    assert (row["origin_region"], row["region"], row["hops"]) == ("eu", "us", 1)
+    assert federation.stats["forwarded"] == 1
+
+
+def test_burst_is_spread_without_finishing_before_arrival():
+    tasks = _burst()
+    federation = FederatedSimulation(REGIONS, latency=LATENCY, forward_threshold=0.1, processes=False)
+    rows = federation.run(tasks)
+
+    _check_causal(rows, tasks)
+    assert federation.stats["forwarded"] > 0
+    assert {r["region"] for r in rows} == {"eu", "us"}
+
+
+def test_worker_processes_give_the_same_rows():
+    tasks = _burst(n=6)
+    options = {"latency": LATENCY, "forward_threshold": 0.1}
+    in_process = FederatedSimulation(REGIONS, processes=False, **options).run(tasks)
+    in_workers = FederatedSimulation(REGIONS, processes=True, **options).run(tasks)
+
+    def key(row):
+        return row["task_id"], row["region"], round(row["start_time"], 9), round(row["finish_time"], 9)
+
+    assert sorted(map(key, in_workers)) == sorted(map(key, in_process))
@@ -0,0 +1,68 @@
+import random
+
+import pytest
+import simpy as sp
+
+from src.qschedulers.cloud.qnode import HeapQueue
+
+
+class HeapResource(sp.PreemptiveResource):
+    PutQueue = HeapQueue
+
+
+def _grant_order(resource_class, seed, preempt):
+    rng = random.Random(seed)
+    env = sp.Environment()
+    resource = resource_class(env, capacity=1)
+    granted = []
+
+    def user(i, arrival, priority, duration, patience):
+        yield env.timeout(arrival)
+        with resource.request(priority=priority, preempt=preempt) as req:
+            try:
+                result = yield req | env.timeout(patience)
+                if req not in result:
+                    # Withdrawn before being granted: the with block cancels it
+                    return
+                granted.append((env.now, i))
+                yield env.timeout(duration)
+            except sp.Interrupt:
+                granted.append((env.now, f"preempted {i}"))
+
+    for i in range(300):
+        env.process(
+            user(
+                i,
+                arrival=rng.choice([0.0, rng.uniform(0, 50)]),
+                priority=rng.randint(0, 4),
+                duration=rng.uniform(0.1, 2.0),
+                patience=rng.uniform(1, 100),
+            )
+        )
+    env.run()
+    return granted
+
+
+@pytest.mark.parametrize("preempt", [False, True])
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_grants_in_the_same_order_as_sorted_queue(seed, preempt):
+    expected = _grant_order(sp.PreemptiveResource, seed, preempt)
+    assert len(expected) > 50
+    assert _grant_order(HeapResource, seed, preempt) == expected
+
+
+def test_iterates_in_grant_order_without_removed_requests():
+    env = sp.Environment()
+    resource = HeapResource(env, capacity=1)
+    holder = resource.request(priority=0)
+    requests = [resource.request(priority=p) for p in (3, 1, 2, 1, 0)]
+    requests[1].cancel()
+
+    queue = resource.put_queue
+    assert len(queue) == 4
+    assert list(queue) == [requests[4], requests[3], requests[2], requests[0]]
+    assert queue[0] is requests[4]
+    assert queue[2] is requests[2]
+    with pytest.raises(ValueError):
+        queue.remove(requests[1])
+    assert holder.triggered
@@ -0,0 +1,29 @@
+import copy
+
+from qiskit_ibm_runtime.fake_provider import FakeHanoiV2
+
+from src.qschedulers.datasets.layout_index import LayoutIndex
+
+
+def _with_sx_error(backend, qubit, error):
+    props = copy.deepcopy(backend.properties())
+    for gate in props.gates:
+        if gate.gate == "sx" and list(gate.qubits) == [qubit]:
+            for param in gate.parameters:
+                if param.name == "gate_error":
+                    param.value = error
+    return props
+
+
+def test_high_sx_error_qubit_drops_out_of_best_layout(monkeypatch):
+    backend = FakeHanoiV2()
+    best = LayoutIndex.from_backend(backend).best_layout(3)
+    assert best is not None
+
+    noisy = best[0]
+    props = _with_sx_error(backend, noisy, 0.5)
+    monkeypatch.setattr(backend, "properties", lambda *args, **kwargs: props)
+    ranked = LayoutIndex.from_backend(backend).best_layout(3)
+
+    assert ranked is not None
+    assert noisy not in ranked
@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+from qiskit import QuantumCircuit
+from qiskit.quantum_info import Operator, Statevector
+
+from src.qschedulers.cloud.backends import get_backend
+from src.qschedulers.utils import transpilation
+from src.qschedulers.utils.transpilation import (
+    TranspileCache,
+    bind_template,
+    parameterize,
+    template_key,
+    transpile_for_backend,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(transpilation, "_cache", TranspileCache())
+
+
+def _vqe(seed, num_qubits=4, reps=2):
+    rng = np.random.default_rng(seed)
+    qc = QuantumCircuit(num_qubits, name="vqe_su2")
+    for rep in range(reps + 1):
+        for q in range(num_qubits):
+            qc.ry(rng.uniform(-np.pi, np.pi), q)
+            qc.rz(rng.uniform(-np.pi, np.pi), q)
+        if rep < reps:
+            for q in range(num_qubits - 1):
+                qc.cx(q, q + 1)
+    qc.measure_all()
+    return qc
+
+
+def _probabilities(circuit):
+    return Statevector(circuit.remove_final_measurements(inplace=False)).probabilities()
+
+
+def _transpiled_probabilities(tqc):
+    """Ideal outcome probabilities of a transpiled circuit, on its virtual qubits."""
+    active = sorted(
+        {tqc.find_bit(q).index for inst in tqc.data if inst.operation.name not in ("barrier", "measure") for q in inst.qubits}
+        | set(tqc.layout.final_index_layout())
+    )
+    position = {q: i for i, q in enumerate(active)}
+    compact = QuantumCircuit(len(active))
+    for inst in tqc.data:
+        if inst.operation.name not in ("barrier", "measure"):
+            compact.append(inst.operation, [position[tqc.find_bit(q).index] for q in inst.qubits])
+    qargs = [position[q] for q in tqc.layout.final_index_layout()]
+    return Statevector(compact).probabilities(qargs)
+
+
+def test_bound_template_is_the_circuit():
+    circuit = _vqe(seed=1)
+    template, values = parameterize(circuit)
+
+    assert template.num_parameters == len(values) == 24
+    expected = Operator(circuit.remove_final_measurements(inplace=False))
+    assert Operator(bind_template(template, values).remove_final_measurements(inplace=False)).equiv(expected)
+    assert template_key(circuit) == template_key(_vqe(seed=2)) is not None
+    assert template_key(_vqe(seed=1, reps=1)) != template_key(circuit)
+
+
+def test_first_instance_is_transpiled_directly(monkeypatch):
+    backend = get_backend("Hanoi")
+    circuit = _vqe(seed=1)
+    first = transpile_for_backend(circuit, backend)
+
+    monkeypatch.setattr(transpilation, "_cache", TranspileCache())
+    assert first == transpile_for_backend(circuit, backend, template=False)
+    assert first.num_parameters == 0
+
+
+def test_later_instances_bound_from_the_template_are_equivalent(monkeypatch):
+    backend = get_backend("Hanoi")
+    transpiled = []
+    transpile = transpilation._transpile
+    monkeypatch.setattr(
+        transpilation, "_transpile", lambda circuit, *args: transpiled.append(circuit) or transpile(circuit, *args)
+    )
+    transpile_for_backend(_vqe(seed=1), backend)
+
+    for seed in (2, 3, 4):
+        circuit = _vqe(seed=seed)
+        tqc = transpile_for_backend(circuit, backend)
+        assert tqc.num_parameters == 0
+        np.testing.assert_allclose(_transpiled_probabilities(tqc), _probabilities(circuit), atol=1e-8)
+        # Transpiling the instance again gives the same circuit
+        assert transpile_for_backend(circuit, backend) == tqc
+    # The first instance and the template, once
+    assert len(transpiled) == 2
+    assert transpiled[1].num_parameters == 24
+
+
+def test_one_off_circuits_are_never_templated():
+    backend = get_backend("Hanoi")
+    ghz = QuantumCircuit(3, name="ghz")
+    ghz.h(0)
+    ghz.cx(0, 1)
+    ghz.cx(1, 2)
+    ghz.measure_all()
+    first = transpile_for_backend(ghz, backend)
+
+    assert template_key(ghz) is None
+    assert transpile_for_backend(ghz.copy(), backend) == first